@@ -0,0 +1,144 @@
+"""Load test of the asyncpg pool: throughput and pool waits per pool size.
+
+For each pool size, --concurrency tasks loop for --duration seconds over the
+lookup the delivery path runs (undelivered requests of a user), optionally
+followed by a pg_sleep standing in for slower queries. Each task takes its
+connection through the Tortoise client the way the bot does, so the time to
+acquire one is the pool wait. The pool and statement cache come from the DB_*
+settings, overridden per run; the queries only read.
+
+Needs a Postgres with migrations applied (``make upgrade``); DATABASE_URL
+must point at it.
+
+Usage:
+    uv run python benchmarks/bench_db_pool.py --sizes 2,5,10,20
+    uv run python benchmarks/bench_db_pool.py --pgbouncer --sleep-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List
+
+from tortoise import connections
+
+from japan_name_bot.config import settings
+from japan_name_bot.db import close_db, init_db, pool_stats
+from report import percentile
+
+_PENDING_SQL = """
+SELECT "id" FROM "name_requests"
+WHERE "user_id" = $1 AND NOT "delivered"
+ORDER BY "id"
+LIMIT 10
+"""
+_SLEEP_SQL = "SELECT pg_sleep($1::float8 / 1000)"
+
+
+async def _worker(
+    client: Any,
+    deadline: float,
+    user_ids: List[int],
+    sleep_ms: float,
+    latencies: List[float],
+    waits: List[float],
+) -> None:
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with client.acquire_connection() as conn:
+            acquired = time.perf_counter()
+            await conn.fetch(_PENDING_SQL, rng.choice(user_ids))
+            if sleep_ms:
+                await conn.fetch(_SLEEP_SQL, sleep_ms)
+        waits.append(acquired - start)
+        latencies.append(time.perf_counter() - start)
+
+
+async def _watch_pool(stop: asyncio.Event, in_use: List[int]) -> None:
+    while not stop.is_set():
+        stats = pool_stats()
+        if stats is not None:
+            in_use.append(stats.in_use)
+        await asyncio.sleep(0.05)
+
+
+async def _run(size: int, args: argparse.Namespace) -> Dict[str, float]:
+    settings.DB_POOL_MIN_SIZE = size
+    settings.DB_POOL_MAX_SIZE = size
+    settings.DB_STATEMENT_CACHE_SIZE = args.statement_cache
+    settings.DB_PGBOUNCER = args.pgbouncer
+    await init_db()
+    try:
+        client = connections.get("default")
+        rows = await client.execute_query_dict(
+            'SELECT "id" FROM "users" LIMIT $1', [args.users]
+        )
+        user_ids = [row["id"] for row in rows] or [0]
+
+        latencies: List[float] = []
+        waits: List[float] = []
+        in_use: List[int] = []
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(_watch_pool(stop, in_use))
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                _worker(client, deadline, user_ids, args.sleep_ms, latencies, waits)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await watcher
+    finally:
+        await close_db()
+
+    latencies.sort()
+    waits.sort()
+    return {
+        "ops_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "wait_p50_ms": percentile(waits, 50) * 1000,
+        "wait_p99_ms": percentile(waits, 99) * 1000,
+        "peak_in_use": max(in_use, default=0),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(
+        f"concurrency {args.concurrency}, {args.duration:.0f}s per size, "
+        f"statement cache {0 if args.pgbouncer else args.statement_cache}, "
+        f"pg_sleep {args.sleep_ms}ms"
+    )
+    print(
+        f"{'pool':>5} {'ops/s':>9} {'p50':>9} {'p99':>9}"
+        f" {'wait p50':>9} {'wait p99':>9} {'in use':>7}"
+    )
+    for size in sizes:
+        r = await _run(size, args)
+        print(
+            f"{size:5d} {r['ops_per_s']:9.0f} {r['p50_ms']:7.2f}ms"
+            f" {r['p99_ms']:7.2f}ms {r['wait_p50_ms']:7.2f}ms"
+            f" {r['wait_p99_ms']:7.2f}ms {int(r['peak_in_use']):7d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,2,5,10,20")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--sleep-ms", type=float, default=0.0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--statement-cache", type=int, default=settings.DB_STATEMENT_CACHE_SIZE
+    )
+    parser.add_argument("--pgbouncer", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,187 @@
+"""Replay Telegram updates through the full bot and report latency.
+
+The dispatcher, middlewares, conversion pool and database are set up the way
+bot.main does it; only the Bot API is replaced by the in-process fake session.
+Updates are either synthetic (a /start, then names, and some channel joins
+per user) or read from a JSONL file of raw updates, one per line.
+
+Needs a Postgres database in DATABASE_URL (the services use Postgres-only
+SQL). Point it at a scratch database: --generate-schemas creates the tables
+from the models when they are missing, and the run writes users and
+name_requests rows.
+
+Outgoing calls are paced by the rate limiter as in production; run with
+RATE_LIMIT_ENABLED=false to measure the bot itself rather than Telegram's
+per-chat limits.
+
+Usage:
+    uv run python benchmarks/bench_e2e.py [--updates N] [--concurrency C]
+    uv run python benchmarks/bench_e2e.py --replay recorded.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import pathlib
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Tuple
+
+from tortoise import Tortoise
+
+from fakes import FakeSession, make_message_update
+from japan_name_bot.bot import build_dispatcher, create_bot
+from japan_name_bot.config import settings
+from japan_name_bot.db import close_db, init_db
+from japan_name_bot.services.name_conversion import (
+    drain_pending_writes,
+    shutdown_executor,
+    warm_up_conversion,
+)
+from japan_name_bot.services.name_requests import close_request_writer
+from report import compare, print_table, save, summarize
+
+CORPUS = pathlib.Path(__file__).parent / "data" / "names.txt"
+
+
+def _chat_member_update(update_id: int, user_id: int) -> Dict[str, Any]:
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+    chat: Dict[str, Any] = {"id": settings.CHANNEL_ID or -1000, "type": "channel"}
+    if settings.CHANNEL_USERNAME:
+        chat["username"] = settings.CHANNEL_USERNAME.lstrip("@")
+    return {
+        "update_id": update_id,
+        "chat_member": {
+            "chat": chat,
+            "from": user,
+            "date": int(time.time()),
+            "old_chat_member": {"status": "left", "user": user},
+            "new_chat_member": {"status": "member", "user": user},
+        },
+    }
+
+
+def synthetic_updates(
+    count: int, users: int, join_ratio: float, seed: int
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    names = [
+        line.strip()
+        for line in CORPUS.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    started: set[int] = set()
+    update_ids = itertools.count(1)
+    for _ in range(count):
+        user_id = 10_000_000 + rng.randrange(users)
+        if user_id not in started:
+            started.add(user_id)
+            yield "start", make_message_update(next(update_ids), user_id, "/start")
+        elif rng.random() < join_ratio:
+            yield "join", _chat_member_update(next(update_ids), user_id)
+        else:
+            name = rng.choice(names)
+            yield "name", make_message_update(next(update_ids), user_id, name)
+
+
+def recorded_updates(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                update = json.loads(line)
+                kind = next((k for k in update if k != "update_id"), "unknown")
+                yield kind, update
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    await init_db()
+    if args.generate_schemas:
+        await Tortoise.generate_schemas(safe=True)
+    await warm_up_conversion()
+
+    session = FakeSession(latency=args.api_latency, subscribed=not args.unsubscribed)
+    bot = create_bot(session=session)
+    dp = build_dispatcher()
+
+    if args.replay:
+        updates = list(recorded_updates(args.replay))
+    else:
+        updates = list(
+            synthetic_updates(args.updates, args.users, args.join_ratio, args.seed)
+        )
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    errors = 0
+
+    async def feed(kind: str, update: Dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await dp.feed_raw_update(bot, update)
+            except Exception:
+                errors += 1
+            elapsed = time.perf_counter() - start
+            latencies[kind].append(elapsed)
+            latencies["all"].append(elapsed)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(feed(kind, update) for kind, update in updates))
+        wall = time.perf_counter() - started
+    finally:
+        shutdown_executor()
+        await close_request_writer()
+        await drain_pending_writes()
+        await close_db()
+
+    results = {kind: summarize(samples) for kind, samples in latencies.items()}
+    print_table(results)
+    print(
+        f"{len(updates)} updates in {wall:.2f}s: {len(updates) / wall:.1f} updates/s,"
+        f" {errors} errors"
+    )
+    print("Bot API calls:", dict(session.calls.most_common()))
+    results["all"]["throughput"] = len(updates) / wall
+    results["all"]["errors"] = errors
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--join-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay", help="JSONL file of raw updates to feed instead")
+    parser.add_argument("--concurrency", type=int, default=settings.WEBHOOK_CONCURRENCY)
+    parser.add_argument(
+        "--api-latency", type=float, default=0.03, help="fake Bot API delay, seconds"
+    )
+    parser.add_argument("--unsubscribed", action="store_true")
+    parser.add_argument("--generate-schemas", action="store_true")
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        save(results, args.json)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance, metric="p95_us")
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Per-call latency of convert_name with and without backend reuse.
+
+Usage: uv run python benchmarks/bench_engine.py [rounds]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import icu
+from pykakasi import kakasi
+
+from japan_name_bot.services.name_conversion import convert_name, get_engine
+
+NAMES = ["Анна", "Дмитрий", "Екатерина", "Olga", "Владислав", "Zhanna", "Пётр"]
+
+
+def _legacy_backends_per_call(name: str) -> None:
+    # What convert_name did before the engine: build everything per request.
+    ru_latin = icu.Transliterator.createInstance("Russian-Latin/BGN")
+    latin_kata = icu.Transliterator.createInstance("Latin-Katakana")
+    kk = kakasi()
+    kk.setMode("H", "a")
+    kk.setMode("K", "a")
+    kk.setMode("J", "a")
+    conv = kk.getConverter()
+    conv.do(latin_kata.transliterate(ru_latin.transliterate(name)))
+
+
+def _engine_backends(name: str) -> None:
+    engine = get_engine()
+    engine.katakana_to_romaji(
+        engine.latin_to_katakana(engine.ru_to_latin(name)) or ""
+    )
+
+
+def _measure(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name in NAMES:
+            func(name)
+    return (time.perf_counter() - start) / (rounds * len(NAMES)) * 1000
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    convert_name(NAMES[0])  # load jamdict and build this thread's backends
+
+    legacy = _measure(_legacy_backends_per_call, rounds)
+    reused = _measure(_engine_backends, rounds)
+    full = _measure(convert_name, rounds)
+
+    print(f"backends built per call : {legacy:8.3f} ms/name")
+    print(f"backends reused (engine): {reused:8.3f} ms/name")
+    print(f"convert_name end to end : {full:8.3f} ms/name")
+    print(f"speedup on backend work : {legacy / reused:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Kana → romaji: the Hepburn table against the kakasi converter it replaced.
+
+Inputs are the katakana convert_name produces for benchmarks/data/names.txt.
+Both converters are timed per call, their memory is measured with tracemalloc
+(construction plus a first conversion, so lazily loaded tables count), and
+every input on which they disagree is listed. kakasi's known deviations from
+Hepburn (ティ as "tei", ンヤ as "nya", ー on its own as "-") show up there.
+
+Usage: uv run python benchmarks/bench_hepburn.py [--rounds N] [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from japan_name_bot.services.name_conversion import _convert_name_uncached
+from japan_name_bot.services.name_conversion.engine import _create_kakasi_converter
+from japan_name_bot.services.name_conversion.hepburn import (
+    _compile_table,
+    kana_to_romaji,
+)
+from report import print_table, save, summarize
+
+CORPUS = pathlib.Path(__file__).parent / "data" / "names.txt"
+
+
+def _katakana_inputs() -> List[str]:
+    names = [
+        line.strip()
+        for line in CORPUS.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    inputs = {_convert_name_uncached(name)[0] for name in names}
+    return sorted(kata for kata in inputs if kata)
+
+
+def _allocated(build: Callable[[], Any]) -> Tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, peak
+
+
+def _time_calls(
+    func: Callable[[str], object], inputs: List[str], rounds: int
+) -> List[float]:
+    clock = time.perf_counter
+    samples = []
+    for _ in range(rounds):
+        for value in inputs:
+            start = clock()
+            func(value)
+            samples.append(clock() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    inputs = _katakana_inputs()
+
+    def build_kakasi() -> Any:
+        converter = _create_kakasi_converter()
+        if converter is not None:
+            converter.do(inputs[0])
+        return converter
+
+    kakasi, kakasi_bytes = _allocated(build_kakasi)
+    # The module-level table already exists; a fresh compile shows its size.
+    _, table_bytes = _allocated(_compile_table)
+    print(f"memory: hepburn table {table_bytes / 1024:.1f} KiB,", end=" ")
+    results = {
+        "hepburn": summarize(_time_calls(kana_to_romaji, inputs, args.rounds))
+    }
+    if kakasi is None:
+        print("pykakasi not installed")
+    else:
+        print(f"kakasi {kakasi_bytes / 1024:.1f} KiB")
+        results["kakasi"] = summarize(_time_calls(kakasi.do, inputs, args.rounds))
+        differing = [
+            (kata, kana_to_romaji(kata), kakasi.do(kata))
+            for kata in inputs
+            if kana_to_romaji(kata) != kakasi.do(kata)
+        ]
+        print(f"{len(differing)} of {len(inputs)} inputs romanized differently:")
+        for kata, ours, theirs in differing:
+            print(f"  {kata}: {ours} (kakasi: {theirs})")
+    print_table(results)
+    if args.json:
+        save(results, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
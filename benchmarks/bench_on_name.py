@@ -0,0 +1,107 @@
+"""Check that on_name costs about its critical path rather than the sum.
+
+Bot API calls, DB writes, the conversion and the subscription check are
+replaced with fakes that just sleep for the given time. The reaction is sent
+in the background and must not delay the reply; the subscription check waits
+for the user row. Fails when the measured time strays from the critical path.
+
+Usage: uv run python benchmarks/bench_on_name.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from aiogram import Bot, types
+
+from fakes import FakeSession, make_message_update
+from japan_name_bot.handlers import name as name_handlers
+
+LATENCY = {
+    # Low priority for the rate limiter, so it can queue behind other chats.
+    "reaction": 0.300,
+    "conversion": 0.050,
+    "user": 0.020,
+    "insert": 0.020,
+    "mark": 0.010,
+    "subscription": 0.060,
+    "send": 0.040,
+}
+
+
+async def _ensure_user(user_id: int, username: str | None) -> None:
+    await asyncio.sleep(LATENCY["user"])
+
+
+async def _save_name_request(**kwargs: Any) -> datetime:
+    await asyncio.sleep(LATENCY["insert"])
+    return datetime.now(timezone.utc)
+
+
+async def _mark_delivered(user_id: int, created_at: datetime) -> None:
+    await asyncio.sleep(LATENCY["mark"])
+
+
+async def _convert(name: str) -> tuple[str, str]:
+    await asyncio.sleep(LATENCY["conversion"])
+    return "アンナ", "Anna"
+
+
+async def _subscribed(bot: Bot, channel: Any, user_id: int) -> bool:
+    await asyncio.sleep(LATENCY["subscription"])
+    return True
+
+
+async def main() -> None:
+    name_handlers.ensure_user = _ensure_user  # type: ignore[assignment]
+    name_handlers.save_name_request = _save_name_request  # type: ignore[assignment]
+    name_handlers.mark_delivered = _mark_delivered  # type: ignore[assignment]
+    name_handlers.convert_name_async = _convert  # type: ignore[assignment]
+    name_handlers.is_user_subscribed = _subscribed  # type: ignore[assignment]
+
+    session = FakeSession(
+        method_latency={
+            "setMessageReaction": LATENCY["reaction"],
+            "sendMessage": LATENCY["send"],
+        }
+    )
+    bot = Bot(token="42:fake", session=session)
+    update = make_message_update(1, 1000, "Анна")
+    message = types.Message.model_validate(update["message"], context={"bot": bot})
+
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await name_handlers.on_name(message, bot)
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+
+    await asyncio.gather(*name_handlers._pending_reactions)
+
+    # Two result messages are sent after the fan-out in both designs.
+    replies = 2 * LATENCY["send"]
+    sequential = (sum(LATENCY.values()) - LATENCY["send"] + replies) * 1000
+    critical = (
+        max(
+            max(LATENCY["conversion"], LATENCY["user"]) + LATENCY["insert"],
+            LATENCY["user"] + LATENCY["subscription"],
+        )
+        + LATENCY["mark"]
+        + replies
+    ) * 1000
+    print(f"sequential steps (sum)   : {sequential:6.1f} ms")
+    print(f"ideal concurrent (path)  : {critical:6.1f} ms")
+    print(f"on_name measured         : {elapsed:6.1f} ms")
+
+    assert session.calls["setMessageReaction"] == rounds, session.calls
+    assert session.calls["sendMessage"] == 2 * rounds, session.calls
+    # Scheduling overhead only; waiting for the reaction would exceed it.
+    assert critical <= elapsed < critical + 20, (
+        f"on_name took {elapsed:.1f} ms, critical path is {critical:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Golden check and microbenchmark for the heuristic romaji → katakana mapper.
+
+benchmarks/data/romaji_golden.tsv holds outputs of the previous
+character-scanning implementation (kept below as ``legacy``) for every corpus
+input it terminates on. The script fails if the trie-based mapper disagrees
+with any of them, then times both.
+
+Usage: uv run python benchmarks/bench_romaji.py [rounds]
+"""
+
+from __future__ import annotations
+
+import pathlib
+import sys
+import time
+
+from japan_name_bot.services.name_conversion.romaji import (
+    _BASE,
+    _SPECIAL,
+    _YOON,
+    romaji_to_katakana,
+)
+
+GOLDEN = pathlib.Path(__file__).parent / "data" / "romaji_golden.tsv"
+
+
+def _long_vowelize(kata: str) -> str:
+    result = []
+    for ch in kata:
+        if result and ch in {"ア", "イ", "ウ", "エ", "オ"} and result[-1] == ch:
+            result.append("ー")
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def legacy(token: str) -> str:
+    # Previous implementation, unchanged except for comments. It never
+    # terminates on inputs like "uta" (a special-kana check without a match
+    # skips advancing), which is why the golden file only lists inputs it
+    # finishes on.
+    s = token.lower()
+    out = []
+    i = 0
+    while i < len(s):
+        if (
+            i + 1 < len(s)
+            and s[i] == s[i + 1]
+            and s[i].isalpha()
+            and s[i] not in {"a", "i", "u", "e", "o", "n"}
+        ):
+            out.append("ッ")
+            i += 1
+            continue
+        if s[i] == "n":
+            nxt = s[i + 1] if i + 1 < len(s) else ""
+            if not nxt or nxt not in {"a", "i", "u", "e", "o", "y"}:
+                out.append("ン")
+                i += 1
+                continue
+        if i + 2 < len(s):
+            tri = s[i : i + 3]
+            if tri in _YOON:
+                out.append(_YOON[tri])
+                i += 3
+                continue
+        if i + 2 <= len(s):
+            for length in (3, 2):
+                if i + length <= len(s):
+                    seg = s[i : i + length]
+                    if seg in _SPECIAL:
+                        out.append(_SPECIAL[seg])
+                        i += length
+                        break
+            if i > 0 and out and out[-1] in _SPECIAL.values():
+                continue
+        if i < len(s) and s[i] in _BASE:
+            c = s[i]
+            if i + 1 < len(s) and s[i + 1] in {"a", "i", "u", "e", "o"}:
+                out.append(_BASE[c][s[i + 1]])
+                i += 2
+                continue
+            out.append(_BASE[c]["u"])
+            i += 1
+            continue
+        if s[i] in {"a", "i", "u", "e", "o"}:
+            out.append(_BASE[""][s[i]])
+            i += 1
+            continue
+        i += 1
+    return _long_vowelize("".join(out))
+
+
+def _measure(func, inputs: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in inputs:
+            func(token)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+
+def main() -> int:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    golden = [
+        line.split("\t")
+        for line in GOLDEN.read_text(encoding="utf-8").splitlines()
+        if line
+    ]
+    mismatches = [
+        (token, expected, romaji_to_katakana(token))
+        for token, expected in golden
+        if romaji_to_katakana(token) != expected
+    ]
+    for token, expected, actual in mismatches[:20]:
+        print(f"MISMATCH {token!r}: expected {expected!r}, got {actual!r}")
+    print(f"golden: {len(golden)} inputs, {len(mismatches)} mismatches")
+
+    inputs = [token for token, _ in golden]
+    old = _measure(legacy, inputs, rounds)
+    new = _measure(romaji_to_katakana, inputs, rounds)
+    print(f"legacy scan : {old:7.2f} µs/token")
+    print(f"trie        : {new:7.2f} µs/token  ({old / new:.1f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
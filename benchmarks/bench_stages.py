@@ -0,0 +1,113 @@
+"""Microbenchmarks for convert_name and each of its stages.
+
+Every stage is timed per call over the multilingual corpus in
+benchmarks/data/names.txt, after one untimed pass that builds the backends.
+Inputs of later stages are what the earlier stages produce for the same name,
+so each stage sees the data it sees in production.
+
+Usage:
+    uv run python benchmarks/bench_stages.py [--rounds N] [--json out.json]
+    uv run python benchmarks/bench_stages.py --compare baseline.json
+
+With --compare the script exits non-zero when a stage's p50 is slower than
+the baseline by more than --tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+from unidecode import unidecode
+
+from japan_name_bot.services.name_conversion import (
+    _convert_name_uncached,
+    _exceptions_lookup,
+    convert_name,
+    get_engine,
+)
+from japan_name_bot.services.name_conversion.romaji import romaji_to_katakana
+from report import Summary, compare, print_table, save, summarize
+
+CORPUS = pathlib.Path(__file__).parent / "data" / "names.txt"
+
+
+def _load_names() -> List[str]:
+    return [
+        line.strip()
+        for line in CORPUS.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+
+
+def _heuristic(name: str) -> str:
+    tokens = unidecode(name).replace("-", " ").split()
+    return " ".join(romaji_to_katakana(t) for t in tokens)
+
+
+def _time_calls(
+    func: Callable[[str], object], inputs: Sequence[str], rounds: int
+) -> List[float]:
+    clock = time.perf_counter
+    samples = []
+    for _ in range(rounds):
+        for value in inputs:
+            start = clock()
+            func(value)
+            samples.append(clock() - start)
+    return samples
+
+
+def run(rounds: int) -> Dict[str, Summary]:
+    names = _load_names()
+    engine = get_engine()
+    for name in names:  # build backends and open the dictionary, untimed
+        _convert_name_uncached(name)
+
+    latin = [engine.ru_to_latin(name).strip() or unidecode(name) for name in names]
+    katakana = [
+        engine.latin_to_katakana(query) or _heuristic(name)
+        for name, query in zip(names, latin)
+    ]
+
+    results = {
+        "exceptions": _time_calls(_exceptions_lookup, names, rounds),
+        "transliterate": _time_calls(engine.ru_to_latin, names, rounds),
+        "dictionary": _time_calls(engine.jamdict_reading, latin, rounds),
+        "icu": _time_calls(engine.latin_to_katakana, latin, rounds),
+        "heuristic": _time_calls(_heuristic, names, rounds),
+        "romaji": _time_calls(engine.katakana_to_romaji, katakana, rounds),
+        "convert_uncached": _time_calls(_convert_name_uncached, names, rounds),
+    }
+    for name in names:
+        convert_name(name)
+    results["convert_cached"] = _time_calls(convert_name, names, rounds)
+    return {stage: summarize(samples) for stage, samples in results.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", help="write the summary to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    print_table(results)
+    if args.json:
+        save(results, args.json)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
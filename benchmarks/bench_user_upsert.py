@@ -0,0 +1,80 @@
+"""Count DB statements per message: User.get_or_create vs ensure_user.
+
+Needs a local Postgres with migrations applied (``docker compose up db`` and
+``make upgrade``); DATABASE_URL must point at it.
+
+Usage: uv run python benchmarks/bench_user_upsert.py [messages] [users]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from asyncpg.connection import Connection
+
+from japan_name_bot.db import close_db, init_db
+from japan_name_bot.models import User
+from japan_name_bot.services.users import ensure_user
+
+statements: Counter[str] = Counter()
+
+
+def _count(name: str) -> None:
+    original = getattr(Connection, name)
+
+    async def wrapper(self: Connection, *args: Any, **kwargs: Any) -> Any:
+        statements[name] += 1
+        return await original(self, *args, **kwargs)
+
+    setattr(Connection, name, wrapper)
+
+
+for _name in ("execute", "executemany", "fetch", "fetchrow", "fetchval"):
+    _count(_name)
+
+
+async def _run(
+    label: str, step: Callable[[int, str], Awaitable[Any]], ids: list[int]
+) -> None:
+    statements.clear()
+    start = time.perf_counter()
+    for user_id in ids:
+        await step(user_id, f"user{user_id}")
+    elapsed = time.perf_counter() - start
+    total = sum(statements.values())
+    print(
+        f"{label:<22} {total / len(ids):5.2f} statements/msg "
+        f"{elapsed / len(ids) * 1000:7.3f} ms/msg  {dict(statements)}"
+    )
+
+
+async def _get_or_create(user_id: int, username: str) -> None:
+    await User.get_or_create(id=user_id, defaults={"username": username})
+
+
+async def main() -> None:
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    base = 9_000_000_000
+    rng = random.Random(1)
+    ids = [base + rng.randrange(users) for _ in range(messages)]
+
+    await init_db()
+    try:
+        await User.filter(id__gte=base).delete()
+        await _run("User.get_or_create", _get_or_create, ids)
+        await User.filter(id__gte=base).delete()
+        await _run("ensure_user (cold)", ensure_user, ids)
+        await _run("ensure_user (warm)", ensure_user, ids)
+        await User.filter(id__gte=base).delete()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
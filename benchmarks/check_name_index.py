@@ -0,0 +1,54 @@
+"""Check that the compiled name index returns the same readings as jamdict.
+
+Usage: uv run python benchmarks/check_name_index.py [index] [corpus]
+"""
+
+from __future__ import annotations
+
+import pathlib
+import sys
+import time
+
+from japan_name_bot.services.name_conversion import ConversionEngine
+from japan_name_bot.services.name_conversion.name_index import NameIndex
+
+CORPUS = pathlib.Path(__file__).parent / "data" / "names.txt"
+
+
+def main() -> int:
+    index_path = sys.argv[1] if len(sys.argv) > 1 else "data/jmnedict_names.idx"
+    corpus = pathlib.Path(sys.argv[2]) if len(sys.argv) > 2 else CORPUS
+
+    jamdict_engine = ConversionEngine()
+    index_engine = ConversionEngine(name_index=NameIndex(index_path))
+
+    queries = []
+    for line in corpus.read_text(encoding="utf-8").splitlines():
+        name = line.strip()
+        if name:
+            queries.append(jamdict_engine.ru_to_latin(name).strip())
+
+    mismatches = 0
+    jamdict_time = index_time = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        expected = jamdict_engine.jamdict_reading(query)
+        jamdict_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = index_engine.jamdict_reading(query)
+        index_time += time.perf_counter() - start
+
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {query!r}: jamdict={expected!r} index={actual!r}")
+
+    n = len(queries)
+    print(f"{n} queries, {mismatches} mismatches")
+    print(f"jamdict: {jamdict_time / n * 1000:.3f} ms/query")
+    print(f"index  : {index_time / n * 1000:.4f} ms/query")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
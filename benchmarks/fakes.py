@@ -0,0 +1,94 @@
+"""In-process fakes for the Telegram Bot API used by the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Any, AsyncGenerator, Dict
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+
+class FakeSession(BaseSession):
+    """Answers every Bot API call locally after a configurable delay."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        method_latency: Dict[str, float] | None = None,
+        subscribed: bool = True,
+    ) -> None:
+        super().__init__()
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.subscribed = subscribed
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1)
+
+    def _result(self, name: str, params: Dict[str, Any]) -> Any:
+        if name == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "bot", "username": "fake"}
+        if name == "sendMessage":
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id") or 0, "type": "private"},
+                "text": params.get("text") or "",
+            }
+        if name == "getChatMember":
+            user = {
+                "id": params.get("user_id") or 0,
+                "is_bot": False,
+                "first_name": "u",
+            }
+            status = "member" if self.subscribed else "left"
+            return {"status": status, "user": user}
+        return True
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        name = method.__api_method__
+        self.calls[name] += 1
+        delay = self.method_latency.get(name, self.latency)
+        if delay:
+            await asyncio.sleep(delay)
+        params = method.model_dump(warnings=False)
+        content = json.dumps({"ok": True, "result": self._result(name, params)})
+        response = self.check_response(bot, method, status_code=200, content=content)
+        return response.result  # type: ignore[return-value]
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: Dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def make_message_update(update_id: int, user_id: int, text: str) -> Dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text,
+        },
+    }
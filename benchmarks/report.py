@@ -0,0 +1,70 @@
+"""Latency summaries and baseline comparison shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+from typing import Dict, Iterable, List
+
+Summary = Dict[str, float]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: Iterable[float]) -> Summary:
+    """Mean and p50/p95/p99 of ``samples`` (seconds), reported in microseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0, "mean_us": 0.0, "p50_us": 0.0, "p95_us": 0.0, "p99_us": 0.0}
+    return {
+        "n": len(ordered),
+        "mean_us": sum(ordered) / len(ordered) * 1e6,
+        "p50_us": percentile(ordered, 50) * 1e6,
+        "p95_us": percentile(ordered, 95) * 1e6,
+        "p99_us": percentile(ordered, 99) * 1e6,
+    }
+
+
+def print_table(results: Dict[str, Summary]) -> None:
+    width = max((len(name) for name in results), default=4)
+    print(f"{'':{width}}  {'n':>7} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for name, s in results.items():
+        print(
+            f"{name:{width}}  {int(s['n']):7d} {s['mean_us']:8.1f}µs"
+            f" {s['p50_us']:8.1f}µs {s['p95_us']:8.1f}µs {s['p99_us']:8.1f}µs"
+        )
+
+
+def save(results: Dict[str, Summary], path: str) -> None:
+    pathlib.Path(path).write_text(json.dumps(results, indent=2, sort_keys=True))
+
+
+def compare(
+    results: Dict[str, Summary],
+    baseline_path: str,
+    tolerance: float,
+    metric: str = "p50_us",
+) -> List[str]:
+    """Names whose ``metric`` got slower than the baseline by more than ``tolerance``.
+
+    ``tolerance`` is relative (0.2 = 20% slower). Entries missing from either
+    side are ignored.
+    """
+    baseline = json.loads(pathlib.Path(baseline_path).read_text())
+    regressions = []
+    for name, summary in results.items():
+        before = baseline.get(name, {}).get(metric)
+        if not before:
+            continue
+        after = summary[metric]
+        if after > before * (1 + tolerance):
+            regressions.append(
+                f"{name}: {metric} {before:.1f} -> {after:.1f} "
+                f"(+{(after / before - 1) * 100:.0f}%)"
+            )
+    return regressions
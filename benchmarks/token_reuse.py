@@ -0,0 +1,96 @@
+"""How often the per-word memo saves a conversion on recorded traffic.
+
+Replays names through the same two caches convert_name uses (whole names,
+then single words) without converting anything, and reports hit rates and
+how many word conversions remain with and without the word memo.
+
+The sample is either a JSONL file of raw updates (the --replay format of
+bench_e2e.py; only text messages a user would send as a name are used) or a
+plain text file with one name per line.
+
+Usage:
+    uv run python benchmarks/token_reuse.py sample.jsonl
+    uv run python benchmarks/token_reuse.py names.txt --name-cache 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Iterator
+
+from japan_name_bot.config import settings
+from japan_name_bot.services.name_conversion.cache import (
+    ConversionCache,
+    normalize_key,
+)
+
+_PLACEHOLDER = ("", "")
+
+
+def _names(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            if not path.endswith(".jsonl"):
+                yield line
+                continue
+            text = (json.loads(line).get("message") or {}).get("text") or ""
+            # Same filter as on_name: no commands, at most three words.
+            if text.strip() and not text.startswith("/") and len(text.split()) <= 3:
+                yield text.strip()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sample", help="JSONL of updates or a names-per-line file")
+    parser.add_argument(
+        "--name-cache", type=int, default=settings.CONVERSION_CACHE_SIZE
+    )
+    parser.add_argument(
+        "--token-cache", type=int, default=settings.CONVERSION_TOKEN_CACHE_SIZE
+    )
+    args = parser.parse_args()
+
+    names = ConversionCache(args.name_cache, version="")
+    tokens = ConversionCache(args.token_cache, version="")
+    requests = multi_word = name_hits = 0
+    words = word_hits = 0
+    for name in _names(args.sample):
+        requests += 1
+        parts = name.split()
+        multi_word += len(parts) > 1
+        key = normalize_key(name)
+        if names.get(key) is not None:
+            name_hits += 1
+            continue
+        names.put(key, _PLACEHOLDER)
+        for part in parts:
+            words += 1
+            part_key = normalize_key(part)
+            if tokens.get(part_key) is not None:
+                word_hits += 1
+            else:
+                tokens.put(part_key, _PLACEHOLDER)
+
+    if not requests:
+        print("no names in the sample")
+        return 1
+    print(f"names:                  {requests}")
+    print(f"multi-word names:       {multi_word} ({multi_word / requests:.1%})")
+    print(f"whole-name cache hits:  {name_hits} ({name_hits / requests:.1%})")
+    if words:
+        print(f"words after name cache: {words}")
+        print(f"word memo hits:         {word_hits} ({word_hits / words:.1%})")
+    print(
+        f"word conversions:       {words - word_hits} with the memo,"
+        f" {words} without"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "name_conversions" (
+    "key" VARCHAR(255) NOT NULL PRIMARY KEY,
+    "version" VARCHAR(32) NOT NULL,
+    "katakana" VARCHAR(255) NOT NULL,
+    "romaji" VARCHAR(255) NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "name_conversions";"""
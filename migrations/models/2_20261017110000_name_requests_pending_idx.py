@@ -0,0 +1,24 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Older code never marked results as delivered: subscribers saw theirs
+    # right away and everyone else got the latest one on join, so only each
+    # user's newest row can still be owed. Of those, the ones of users known
+    # to be subscribed were shown already; the rest stay pending for the
+    # outbox. Then index what's left.
+    return """
+        UPDATE "name_requests" SET "delivered" = TRUE
+WHERE NOT "delivered" AND "id" NOT IN (
+    SELECT MAX(nr."id") FROM "name_requests" AS nr
+    JOIN "users" AS u ON u."id" = nr."user_id"
+    WHERE NOT nr."delivered" AND NOT u."is_subscribed_cached"
+    GROUP BY nr."user_id"
+);
+CREATE INDEX IF NOT EXISTS "idx_name_requests_pending"
+    ON "name_requests" ("user_id", "id") WHERE NOT "delivered";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_name_requests_pending";"""
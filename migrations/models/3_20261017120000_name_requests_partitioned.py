@@ -0,0 +1,103 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Rebuild name_requests as a table range-partitioned by month of
+    # created_at (UTC). The primary key has to include the partition key; ids
+    # keep coming from the same sequence. Partitions cover every month with
+    # rows plus the next two; later ones are created by the maintenance job,
+    # and the default partition only catches rows if that job stops running.
+    return """
+        ALTER TABLE "name_requests" RENAME TO "name_requests_unpartitioned";
+ALTER INDEX "name_requests_pkey" RENAME TO "name_requests_unpartitioned_pkey";
+ALTER INDEX IF EXISTS "idx_name_requests_pending"
+    RENAME TO "idx_name_requests_unpartitioned_pending";
+CREATE TABLE "name_requests" (
+    "id" INT NOT NULL DEFAULT nextval('name_requests_id_seq'),
+    "input_name" VARCHAR(255) NOT NULL,
+    "katakana" VARCHAR(255) NOT NULL,
+    "romaji" VARCHAR(255) NOT NULL,
+    "provider" VARCHAR(50) NOT NULL,
+    "delivered" BOOL NOT NULL DEFAULT False,
+    "delivered_at" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "user_id" BIGINT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE,
+    PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+ALTER SEQUENCE "name_requests_id_seq" OWNED BY "name_requests"."id";
+DO $$
+DECLARE
+    first_month TIMESTAMP;
+BEGIN
+    FOR first_month IN
+        SELECT generate_series(
+            date_trunc('month', COALESCE(
+                (SELECT MIN("created_at") FROM "name_requests_unpartitioned"),
+                CURRENT_TIMESTAMP
+            ) AT TIME ZONE 'UTC'),
+            date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC')
+                + INTERVAL '2 months',
+            INTERVAL '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "name_requests" FOR VALUES FROM (%L) TO (%L)',
+            'name_requests_' || to_char(first_month, 'YYYYMM'),
+            first_month AT TIME ZONE 'UTC',
+            (first_month + INTERVAL '1 month') AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END $$;
+CREATE TABLE "name_requests_default" PARTITION OF "name_requests" DEFAULT;
+INSERT INTO "name_requests" (
+    "id", "input_name", "katakana", "romaji", "provider",
+    "delivered", "delivered_at", "created_at", "user_id"
+)
+SELECT "id", "input_name", "katakana", "romaji", "provider",
+    "delivered", "delivered_at", "created_at", "user_id"
+FROM "name_requests_unpartitioned";
+DROP TABLE "name_requests_unpartitioned";
+CREATE INDEX "idx_name_requests_pending"
+    ON "name_requests" ("user_id", "id") WHERE NOT "delivered";
+CREATE TABLE IF NOT EXISTS "name_requests_daily" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "day" DATE NOT NULL,
+    "name_key" VARCHAR(255) NOT NULL,
+    "provider" VARCHAR(50) NOT NULL,
+    "requests" INT NOT NULL,
+    "delivered" INT NOT NULL,
+    CONSTRAINT "uid_name_requests_daily_day_name_key_provider"
+        UNIQUE ("day", "name_key", "provider")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    # Detached or dropped partitions are not brought back.
+    return """
+        DROP TABLE IF EXISTS "name_requests_daily";
+ALTER TABLE "name_requests" RENAME TO "name_requests_partitioned";
+ALTER INDEX "name_requests_pkey" RENAME TO "name_requests_partitioned_pkey";
+ALTER INDEX "idx_name_requests_pending"
+    RENAME TO "idx_name_requests_partitioned_pending";
+CREATE TABLE "name_requests" (
+    "id" INT NOT NULL PRIMARY KEY DEFAULT nextval('name_requests_id_seq'),
+    "input_name" VARCHAR(255) NOT NULL,
+    "katakana" VARCHAR(255) NOT NULL,
+    "romaji" VARCHAR(255) NOT NULL,
+    "provider" VARCHAR(50) NOT NULL,
+    "delivered" BOOL NOT NULL DEFAULT False,
+    "delivered_at" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "user_id" BIGINT NOT NULL REFERENCES "users" ("id") ON DELETE CASCADE
+);
+ALTER SEQUENCE "name_requests_id_seq" OWNED BY "name_requests"."id";
+INSERT INTO "name_requests" (
+    "id", "input_name", "katakana", "romaji", "provider",
+    "delivered", "delivered_at", "created_at", "user_id"
+)
+SELECT "id", "input_name", "katakana", "romaji", "provider",
+    "delivered", "delivered_at", "created_at", "user_id"
+FROM "name_requests_partitioned";
+DROP TABLE "name_requests_partitioned";
+CREATE INDEX "idx_name_requests_pending"
+    ON "name_requests" ("user_id", "id") WHERE NOT "delivered";"""
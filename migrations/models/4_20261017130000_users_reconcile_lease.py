@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Claims of the subscription reconciliation sweep; last_checked_at is only
+    # written together with a checked state.
+    return """
+        ALTER TABLE "users" ADD "reconcile_leased_until" TIMESTAMPTZ;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "users" DROP COLUMN "reconcile_leased_until";"""
@@ -0,0 +1,14 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # normalize_key(input_name), written by the bot with each row so that the
+    # daily rollup groups names by the same rule as conversion. Older rows keep
+    # NULL and are normalized in SQL by the rollup.
+    return """
+        ALTER TABLE "name_requests" ADD "name_key" VARCHAR(255);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "name_requests" DROP COLUMN "name_key";"""
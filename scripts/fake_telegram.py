@@ -0,0 +1,138 @@
+"""Local stand-in for Telegram to exercise webhook mode end to end.
+
+It serves a minimal Bot API (so the bot's outgoing calls succeed) and posts
+synthetic updates to the bot's webhook, reporting how fast they are acked.
+
+    BOT_MODE=webhook WEBHOOK_SECRET=s3cret TELEGRAM_API_URL=http://127.0.0.1:8081 \\
+        uv run japan-name-bot
+    uv run python scripts/fake_telegram.py --secret s3cret --updates 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+from collections import Counter
+from typing import Any
+
+from aiohttp import ClientSession, web
+
+NAMES = ["Анна", "Дмитрий", "Nikita", "Мария", "Екатерина", "John", "Ольга"]
+
+_message_ids = itertools.count(1)
+calls: Counter[str] = Counter()
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+
+
+def _result(method: str, params: dict[str, Any], subscribed: bool) -> Any:
+    if method == "getMe":
+        return {"id": 1, "is_bot": True, "first_name": "bot", "username": "fake_bot"}
+    if method in {"sendMessage", "sendPhoto"}:
+        chat_id = int(params.get("chat_id", 0))
+        return {
+            "message_id": next(_message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text", ""),
+        }
+    if method == "getChatMember":
+        user_id = int(params.get("user_id", 0))
+        status = "member" if subscribed else "left"
+        return {"status": status, "user": _user(user_id)}
+    return True
+
+
+def build_api(subscribed: bool) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        calls[method] += 1
+        params = dict(await request.post())
+        result = _result(method, params, subscribed)
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+    return app
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            "text": text,
+        },
+    }
+
+
+async def post_updates(args: argparse.Namespace) -> list[float]:
+    headers = {"Content-Type": "application/json"}
+    if args.secret:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = args.secret
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+
+    async with ClientSession() as session:
+
+        async def post(i: int) -> None:
+            update = make_update(i + 1, 1000 + i % args.users, NAMES[i % len(NAMES)])
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.post(
+                    args.webhook, data=json.dumps(update), headers=headers
+                ) as resp:
+                    await resp.read()
+                    statuses[resp.status] += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(post(i) for i in range(args.updates)))
+
+    print(f"webhook responses: {dict(statuses)}")
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--webhook", default="http://127.0.0.1:8080/telegram/webhook")
+    parser.add_argument("--secret")
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--unsubscribed", action="store_true")
+    parser.add_argument(
+        "--settle", type=float, default=2.0, help="seconds to wait for bot replies"
+    )
+    args = parser.parse_args()
+
+    runner = web.AppRunner(build_api(subscribed=not args.unsubscribed))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+    try:
+        latencies = await post_updates(args)
+        await asyncio.sleep(args.settle)
+    finally:
+        await runner.cleanup()
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"ack latency ms: p50={statistics.median(ms):.1f} "
+        f"p95={ms[int(len(ms) * 0.95) - 1]:.1f} max={ms[-1]:.1f}"
+    )
+    print(f"Bot API calls received: {dict(calls)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
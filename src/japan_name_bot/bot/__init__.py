@@ -1,38 +1,163 @@
 import asyncio
+import logging
+import time
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
-from japan_name_bot.config import settings
+from japan_name_bot.config import require_bot_settings, settings
 from japan_name_bot.db import close_db, init_db
 from japan_name_bot.handlers import chat_member as chat_member_handlers
+from japan_name_bot.handlers import inline as inline_handlers
 from japan_name_bot.handlers import name as name_handlers
 from japan_name_bot.handlers import start as start_handlers
+from japan_name_bot.middlewares import (
+    BotApiMetricsMiddleware,
+    LogContextMiddleware,
+    RateLimitMiddleware,
+    UpdateMetricsMiddleware,
+    get_rate_limiter,
+)
+from japan_name_bot.ops import (
+    mark_not_ready,
+    mark_ready,
+    metrics_enabled,
+    start_ops_server,
+)
+from japan_name_bot.services.name_conversion import (
+    drain_pending_writes,
+    shutdown_executor,
+    warm_conversion_cache,
+    warm_up_conversion,
+    watch_exceptions,
+)
+from japan_name_bot.services.name_requests import close_request_writer
+from japan_name_bot.services.name_requests.maintenance import (
+    keep_name_requests_maintained,
+)
+from japan_name_bot.services.popular_names import keep_popular_names_fresh
+from japan_name_bot.services.subscription.reconcile import (
+    keep_subscriptions_reconciled,
+)
 from japan_name_bot.utils.logging import setup_logging
 
+from .webhook import build_webhook_app, run_webhook
 
-async def main() -> None:
-    setup_logging()
+__all__ = ["build_dispatcher", "build_webhook_app", "cli", "create_bot", "main"]
+
+logger = logging.getLogger(__name__)
+
+
+def create_bot(session: BaseSession | None = None) -> Bot:
+    if session is None and settings.TELEGRAM_API_URL:
+        session = AiohttpSession(
+            api=TelegramAPIServer.from_base(settings.TELEGRAM_API_URL)
+        )
     bot = Bot(
         token=settings.BOT_TOKEN,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher()
+    if settings.RATE_LIMIT_ENABLED:
+        bot.session.middleware(
+            RateLimitMiddleware(
+                get_rate_limiter(), max_retries=settings.RATE_LIMIT_MAX_RETRIES
+            )
+        )
+    if metrics_enabled():
+        bot.session.middleware(BotApiMetricsMiddleware())
+    return bot
 
-    await init_db()
 
+def build_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
     dp.include_router(start_handlers.router)
     dp.include_router(name_handlers.router)
     dp.include_router(chat_member_handlers.router)
+    dp.include_router(inline_handlers.router)
+    LogContextMiddleware().setup(dp)
+    if metrics_enabled():
+        UpdateMetricsMiddleware().setup(dp)
+    return dp
+
+
+async def _warm_up() -> None:
+    start = time.perf_counter()
+    timings = await warm_up_conversion()
+    breakdown = ", ".join(f"{name} {sec:.2f}s" for name, sec in timings.items())
+    logger.info(
+        "Conversion warmup finished in %.2fs (%s)",
+        time.perf_counter() - start,
+        breakdown,
+    )
+
+
+async def main() -> None:
+    setup_logging()
+    bot = create_bot()
+    dp = build_dispatcher()
+
+    # The ops listener comes up first so probes see "starting" (503 on
+    # /readyz) instead of connection errors while the instance warms up.
+    ops_runner = None
+    if settings.OPS_PORT:
+        ops_runner = await start_ops_server(settings.OPS_HOST, settings.OPS_PORT)
+
+    start = time.perf_counter()
+    await init_db()
+    logger.info("Database ready in %.2fs", time.perf_counter() - start)
+    start = time.perf_counter()
+    warmed = await warm_conversion_cache()
+    if warmed:
+        logger.info(
+            "Loaded %d cached conversions in %.2fs",
+            warmed,
+            time.perf_counter() - start,
+        )
+    if settings.CONVERSION_WARMUP:
+        await _warm_up()
+    mark_ready()
+    watcher = asyncio.create_task(
+        watch_exceptions(settings.NAME_EXCEPTIONS_RELOAD_INTERVAL)
+    )
+    popular = asyncio.create_task(
+        keep_popular_names_fresh(settings.POPULAR_NAMES_REFRESH_INTERVAL)
+    )
+    maintenance = asyncio.create_task(
+        keep_name_requests_maintained(settings.NAME_REQUESTS_MAINTENANCE_INTERVAL)
+    )
+    reconciler = asyncio.create_task(
+        keep_subscriptions_reconciled(bot, settings.RECONCILE_INTERVAL)
+    )
 
     try:
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        if settings.BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await dp.start_polling(
+                bot, allowed_updates=dp.resolve_used_update_types()
+            )
     finally:
+        mark_not_ready()
+        background = (watcher, popular, maintenance, reconciler)
+        for task in background:
+            task.cancel()
+        # Let them unwind before the writer and the pool they use are closed.
+        await asyncio.gather(*background, return_exceptions=True)
+        shutdown_executor()
+        await close_request_writer()
+        await drain_pending_writes()
         await close_db()
+        if ops_runner is not None:
+            await ops_runner.cleanup()
 
 
 def cli() -> None:
+    require_bot_settings()
     asyncio.run(main())
 
 
@@ -0,0 +1,486 @@
+"""Pre-fork supervisor: one poller and N bot workers sharing preloaded data.
+
+The supervisor process stays single-threaded and never runs an event loop, so
+it can fork at any time. It loads the conversion data once and freezes the
+heap (``gc.freeze``) so children share those pages copy-on-write; the name
+index is an mmap and is shared through the page cache anyway. It then forks:
+
+* a poller that calls getUpdates and forwards each update to worker
+  ``user_id % N`` over a SOCK_SEQPACKET socket pair, and
+* N workers that feed their updates to the dispatcher, keeping each user's
+  updates in order. Each gets 1/N of RATE_LIMIT_GLOBAL, as they all send with
+  the same token.
+
+The socket pairs belong to the supervisor, so a worker restarted after a crash
+picks up whatever is still queued for its slot. On SIGTERM/SIGINT the poller
+is stopped first; the workers then drain their sockets and finish in-flight
+updates before exiting. SIGHUP reloads the name exceptions in the supervisor
+(for workers forked later) and is forwarded to every worker.
+
+Workers flag themselves warmed up in a shared memory page, one byte per slot;
+the poller reports the instance ready only while every flag is set. With
+OPS_PORT set, the poller serves the instance's health endpoints and its own
+metrics there, and worker ``i`` serves its metrics on ``OPS_PORT + 1 + i``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gc
+import json
+import logging
+import mmap
+import os
+import signal
+import socket
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import ChatMemberUpdated, Update
+from aiogram.utils.backoff import Backoff, BackoffConfig
+
+from japan_name_bot.config import settings
+from japan_name_bot.db import close_db, init_db
+from japan_name_bot.middlewares.rate_limit import share_global_rate
+from japan_name_bot.ops import mark_not_ready, mark_ready, start_ops_server
+from japan_name_bot.services.name_conversion import (
+    drain_pending_writes,
+    preload_conversion,
+    reload_exceptions,
+    shutdown_executor,
+    warm_conversion_cache,
+    warm_up_conversion,
+    watch_exceptions,
+)
+from japan_name_bot.services.name_requests import close_request_writer
+from japan_name_bot.services.name_requests.maintenance import (
+    keep_name_requests_maintained,
+)
+from japan_name_bot.services.popular_names import keep_popular_names_fresh
+from japan_name_bot.services.subscription.reconcile import (
+    keep_subscriptions_reconciled,
+)
+from japan_name_bot.utils.logging import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+# Largest update accepted over a worker socket (SOCK_SEQPACKET keeps message
+# boundaries, so each update is one datagram).
+MAX_UPDATE_SIZE = 1 << 20
+
+_SIGNALS = {signal.SIGTERM, signal.SIGINT, signal.SIGCHLD, signal.SIGHUP}
+
+# How often the poller re-reads the workers' warm-up flags.
+READY_POLL_INTERVAL = 0.5
+
+# getUpdates long-polling timeout, in seconds.
+POLLING_TIMEOUT = 30
+
+_BACKOFF = BackoffConfig(min_delay=1.0, max_delay=5.0, factor=1.3, jitter=0.1)
+
+
+def routing_key(update: Update) -> int:
+    """The user an update belongs to; all of a user's updates share a worker."""
+    try:
+        event = update.event
+    except Exception:
+        return update.update_id
+    if isinstance(event, ChatMemberUpdated):
+        return event.new_chat_member.user.id
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(event, "chat", None)
+    if chat is not None:
+        return chat.id
+    return update.update_id
+
+
+# --- Poller ----------------------------------------------------------------
+
+
+async def _track_readiness(ready: mmap.mmap) -> None:
+    while True:
+        if 0 in ready[:]:
+            mark_not_ready()
+        else:
+            mark_ready()
+        await asyncio.sleep(READY_POLL_INTERVAL)
+
+
+async def _listen_updates(
+    bot: Bot, allowed_updates: List[str]
+) -> AsyncIterator[Update]:
+    """Long-polls getUpdates, retrying with backoff while the Bot API fails."""
+    backoff = Backoff(config=_BACKOFF)
+    offset = None
+    # The request has to outlive the long poll itself.
+    request_timeout = int(bot.session.timeout + POLLING_TIMEOUT)
+    while True:
+        try:
+            updates = await bot.get_updates(
+                offset=offset,
+                timeout=POLLING_TIMEOUT,
+                allowed_updates=allowed_updates,
+                request_timeout=request_timeout,
+            )
+        except Exception as e:
+            logger.warning("Failed to fetch updates, retrying: %r", e)
+            await backoff.asleep()
+            continue
+        backoff.reset()
+        for update in updates:
+            yield update
+            offset = update.update_id + 1
+
+
+async def _poll(sockets: List[socket.socket], ready: mmap.mmap) -> None:
+    # Imported here: the package imports this module lazily from the CLI only.
+    from japan_name_bot.bot import build_dispatcher, create_bot
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+
+    bot = create_bot()
+    dp = build_dispatcher()
+    ops_runner = None
+    if settings.OPS_PORT:
+        ops_runner = await start_ops_server(settings.OPS_HOST, settings.OPS_PORT)
+    readiness = asyncio.create_task(_track_readiness(ready))
+
+    updates = _listen_updates(bot, dp.resolve_used_update_types())
+    stopped = asyncio.create_task(stop.wait())
+    last_update_id = None
+    try:
+        while True:
+            next_update = asyncio.ensure_future(anext(updates))
+            done, _ = await asyncio.wait(
+                {next_update, stopped}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if next_update not in done:
+                next_update.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await next_update
+                break
+            update = next_update.result()
+            key = routing_key(update)
+            raw = update.model_dump(mode="json", by_alias=True, exclude_unset=True)
+            payload = json.dumps([key, raw]).encode()
+            target = sockets[key % len(sockets)]
+            try:
+                await loop.sock_sendall(target, payload)
+            except OSError:
+                logger.exception("Dropping update %s", update.update_id)
+            last_update_id = update.update_id
+    finally:
+        readiness.cancel()
+        mark_not_ready()
+        await updates.aclose()
+        if last_update_id is not None:
+            # Confirm everything forwarded so a restart doesn't replay it.
+            try:
+                await bot.get_updates(offset=last_update_id + 1, limit=1, timeout=0)
+            except Exception:
+                logger.exception("Failed to confirm updates up to %s", last_update_id)
+        await bot.session.close()
+        if ops_runner is not None:
+            await ops_runner.cleanup()
+
+
+# --- Worker ----------------------------------------------------------------
+
+
+class _UserOrderedFeeder:
+    """Feeds updates concurrently across users but in order for each user."""
+
+    def __init__(self, dp: Dispatcher, bot: Bot) -> None:
+        self.dp = dp
+        self.bot = bot
+        self._tails: Dict[int, asyncio.Task[None]] = {}
+
+    def submit(self, key: int, update: Dict[str, Any]) -> asyncio.Task[None]:
+        task = asyncio.create_task(self._feed(self._tails.get(key), update))
+        self._tails[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        return task
+
+    def _forget(self, key: int, task: asyncio.Task[None]) -> None:
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def _feed(
+        self, previous: asyncio.Task[None] | None, update: Dict[str, Any]
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        try:
+            await self.dp.feed_raw_update(self.bot, update)
+        except Exception:
+            logger.exception("Failed to process update %s", update.get("update_id"))
+
+    async def join(self) -> None:
+        while self._tails:
+            await asyncio.wait(set(self._tails.values()))
+
+
+async def _work(
+    index: int, workers: int, sock: socket.socket, ready: mmap.mmap
+) -> None:
+    from japan_name_bot.bot import build_dispatcher, create_bot
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+
+    share_global_rate(workers)
+    bot = create_bot()
+    dp = build_dispatcher()
+    await init_db()
+    await warm_conversion_cache()
+    if settings.CONVERSION_WARMUP:
+        await warm_up_conversion()
+    watcher = asyncio.create_task(
+        watch_exceptions(settings.NAME_EXCEPTIONS_RELOAD_INTERVAL)
+    )
+    popular = asyncio.create_task(
+        keep_popular_names_fresh(settings.POPULAR_NAMES_REFRESH_INTERVAL)
+    )
+    # Every worker runs it; the advisory locks keep the runs from overlapping.
+    maintenance = asyncio.create_task(
+        keep_name_requests_maintained(settings.NAME_REQUESTS_MAINTENANCE_INTERVAL)
+    )
+    # One sweeper per instance keeps RECONCILE_RATE a per-instance limit.
+    reconciler = None
+    if index == 0:
+        reconciler = asyncio.create_task(
+            keep_subscriptions_reconciled(bot, settings.RECONCILE_INTERVAL)
+        )
+    ops_runner = None
+    if settings.OPS_PORT:
+        ops_runner = await start_ops_server(
+            settings.OPS_HOST, settings.OPS_PORT + 1 + index
+        )
+    feeder = _UserOrderedFeeder(dp, bot)
+    slots = asyncio.Semaphore(settings.WORKER_CONCURRENCY)
+    ready[index] = 1
+    mark_ready()
+    logger.info("Worker %d ready (pid %d)", index, os.getpid())
+
+    def submit(message: bytes) -> None:
+        key, update = json.loads(message)
+        feeder.submit(key, update).add_done_callback(lambda _: slots.release())
+
+    stopped = asyncio.create_task(stop.wait())
+    try:
+        while True:
+            await slots.acquire()
+            received = asyncio.ensure_future(loop.sock_recv(sock, MAX_UPDATE_SIZE))
+            done, _ = await asyncio.wait(
+                {received, stopped}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if received not in done:
+                received.cancel()
+                slots.release()
+                ready[index] = 0
+                mark_not_ready()
+                break
+            submit(received.result())
+
+        # The poller has stopped by now; take whatever is left in the socket.
+        while True:
+            try:
+                message = sock.recv(MAX_UPDATE_SIZE)
+            except BlockingIOError:
+                break
+            await slots.acquire()
+            submit(message)
+        await feeder.join()
+    finally:
+        background = [watcher, popular, maintenance]
+        if reconciler is not None:
+            background.append(reconciler)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        shutdown_executor()
+        await close_request_writer()
+        await drain_pending_writes()
+        await bot.session.close()
+        await close_db()
+        if ops_runner is not None:
+            await ops_runner.cleanup()
+
+
+# --- Supervisor ------------------------------------------------------------
+
+
+class Supervisor:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.shutdown_timeout = settings.WORKER_SHUTDOWN_TIMEOUT
+        # Per worker slot: (supervisor/poller end, worker end)
+        self._pairs: List[tuple[socket.socket, socket.socket]] = []
+        # Shared with every child: 1 per worker slot that has warmed up.
+        self._ready = mmap.mmap(-1, workers)
+        self._poller_pid: int | None = None
+        self._worker_pids: Dict[int, int] = {}  # pid -> slot
+        self._started_at: Dict[int, float] = {}
+        self._failures: Dict[str | int, int] = {}
+        self._respawn_at: Dict[str | int, float] = {}
+
+    def _fork(self, role: str, target: Any, *args: Any) -> int:
+        pid = os.fork()
+        if pid:
+            self._started_at[pid] = time.monotonic()
+            return pid
+        # Child: Ctrl+C reaches the whole process group, but shutdown order is
+        # the supervisor's job, so children only react to its SIGTERM. SIGHUP
+        # is ignored until a worker installs its exceptions reload handler.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, _SIGNALS)
+        code = 0
+        try:
+            asyncio.run(target(*args))
+        except BaseException:
+            logger.exception("%s crashed", role)
+            code = 1
+        finally:
+            shutdown_logging()
+            logging.shutdown()
+            os._exit(code)
+
+    def _spawn_poller(self) -> None:
+        sockets = [poller_end for poller_end, _ in self._pairs]
+        self._poller_pid = self._fork("poller", _poll, sockets, self._ready)
+        logger.info("Started poller (pid %d)", self._poller_pid)
+
+    def _spawn_worker(self, slot: int) -> None:
+        pid = self._fork(
+            f"worker {slot}",
+            _work,
+            slot,
+            self.workers,
+            self._pairs[slot][1],
+            self._ready,
+        )
+        self._worker_pids[pid] = slot
+        logger.info("Started worker %d (pid %d)", slot, pid)
+
+    def _schedule_respawn(self, key: str | int, pid: int) -> None:
+        # Exponential backoff for processes that keep dying right after start.
+        lived = time.monotonic() - self._started_at.pop(pid, 0.0)
+        failures = 0 if lived > 30 else self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        delay = min(30.0, 2.0 ** (failures - 1)) if failures else 0.0
+        self._respawn_at[key] = time.monotonic() + delay
+        if delay:
+            name = key if key == "poller" else f"worker {key}"
+            logger.warning("Restarting %s in %.0fs", name, delay)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            code = os.waitstatus_to_exitcode(status)
+            if pid == self._poller_pid:
+                logger.error("Poller (pid %d) exited with %d", pid, code)
+                self._poller_pid = None
+                self._schedule_respawn("poller", pid)
+            elif pid in self._worker_pids:
+                slot = self._worker_pids.pop(pid)
+                self._ready[slot] = 0
+                logger.error("Worker %d (pid %d) exited with %d", slot, pid, code)
+                self._schedule_respawn(slot, pid)
+
+    def _respawn_due(self) -> None:
+        now = time.monotonic()
+        for key, when in list(self._respawn_at.items()):
+            if when > now:
+                continue
+            del self._respawn_at[key]
+            if key == "poller":
+                self._spawn_poller()
+            else:
+                self._spawn_worker(int(key))
+
+    def _wait_for(self, pids: List[int]) -> None:
+        deadline = time.monotonic() + self.shutdown_timeout
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+            time.sleep(0.05)
+        for pid in remaining:
+            logger.warning("pid %d did not stop in time, killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+    def _reload(self) -> None:
+        reload_exceptions(force=True)
+        for pid in self._worker_pids:
+            os.kill(pid, signal.SIGHUP)
+
+    def _stop(self) -> None:
+        logger.info("Shutting down")
+        if self._poller_pid is not None:
+            os.kill(self._poller_pid, signal.SIGTERM)
+            self._wait_for([self._poller_pid])
+        for pid in self._worker_pids:
+            os.kill(pid, signal.SIGTERM)
+        self._wait_for(list(self._worker_pids))
+
+    def run(self) -> int:
+        start = time.perf_counter()
+        timings = preload_conversion()
+        logger.info(
+            "Preloaded conversion data in %.2fs (%s)",
+            time.perf_counter() - start,
+            ", ".join(f"{name} {sec:.2f}s" for name, sec in timings.items()),
+        )
+        # Keep the collector from touching (and so copying) the preloaded heap.
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.workers):
+            poller_end, worker_end = socket.socketpair(
+                socket.AF_UNIX, socket.SOCK_SEQPACKET
+            )
+            poller_end.setblocking(False)
+            worker_end.setblocking(False)
+            self._pairs.append((poller_end, worker_end))
+
+        signal.pthread_sigmask(signal.SIG_BLOCK, _SIGNALS)
+        for slot in range(self.workers):
+            self._spawn_worker(slot)
+        self._spawn_poller()
+
+        while True:
+            info = signal.sigtimedwait(_SIGNALS, 1.0)
+            if info is not None and info.si_signo in {signal.SIGTERM, signal.SIGINT}:
+                break
+            if info is not None and info.si_signo == signal.SIGHUP:
+                self._reload()
+            self._reap()
+            self._respawn_due()
+        self._stop()
+        return 0
+
+
+def run_supervisor(workers: int) -> int:
+    if settings.BOT_MODE != "polling":
+        raise SystemExit("Multiple workers are only supported with BOT_MODE=polling")
+    setup_logging()
+    return Supervisor(workers).run()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from japan_name_bot.config import settings
+from japan_name_bot.ops import (
+    add_health_routes,
+    add_metrics_route,
+    mark_not_ready,
+    metrics_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LimitedRequestHandler(SimpleRequestHandler):
+    """Acknowledges updates immediately and processes them in the background.
+
+    At most ``concurrency`` updates run handlers at once; the rest wait. Once
+    ``max_pending`` updates are accepted but unfinished, new requests get a 503
+    so Telegram keeps them and retries later instead of us buffering without
+    bound.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        concurrency: int,
+        max_pending: int,
+        secret_token: str | None = None,
+        **data: Any,
+    ) -> None:
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.max_pending = max(max_pending, concurrency)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def pending(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def _background_feed_update(self, bot: Bot, update: dict[str, Any]) -> None:
+        async with self._semaphore:
+            await super()._background_feed_update(bot, update)
+
+    async def _handle_request_background(
+        self, bot: Bot, request: web.Request
+    ) -> web.Response:
+        if self.pending >= self.max_pending:
+            return web.Response(status=503, text="Too many pending updates")
+        return await super()._handle_request_background(bot, request)
+
+    async def drain(self, timeout: float) -> int:
+        """Waits for accepted updates to finish; returns how many did not."""
+        tasks = set(self._background_feed_update_tasks)
+        if not tasks:
+            return 0
+        _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        return len(unfinished)
+
+
+WEBHOOK_HANDLER = web.AppKey("webhook_handler", LimitedRequestHandler)
+
+
+def build_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    app = web.Application()
+    handler = LimitedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        concurrency=settings.WEBHOOK_CONCURRENCY,
+        max_pending=settings.WEBHOOK_MAX_PENDING,
+        secret_token=settings.WEBHOOK_SECRET,
+    )
+    handler.register(app, path=settings.WEBHOOK_PATH)
+    app[WEBHOOK_HANDLER] = handler
+    add_health_routes(app)
+    if metrics_enabled():
+        add_metrics_route(app)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    if settings.WEBHOOK_BASE_URL and settings.WEBHOOK_SET_ON_STARTUP:
+        url = settings.WEBHOOK_BASE_URL.rstrip("/") + settings.WEBHOOK_PATH
+        await bot.set_webhook(
+            url=url,
+            secret_token=settings.WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info("Webhook set to %s", url)
+
+    app = build_webhook_app(dp, bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.WEBHOOK_HOST, port=settings.WEBHOOK_PORT)
+    await site.start()
+    logger.info(
+        "Serving webhook on %s:%s%s",
+        settings.WEBHOOK_HOST,
+        settings.WEBHOOK_PORT,
+        settings.WEBHOOK_PATH,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        # Telegram already got a 200 for every accepted update, so stop taking
+        # new ones and let those finish while the bot session and the database
+        # are still open.
+        mark_not_ready()
+        await site.stop()
+        unfinished = await app[WEBHOOK_HANDLER].drain(
+            settings.WEBHOOK_SHUTDOWN_TIMEOUT
+        )
+        if unfinished:
+            logger.warning("Shutting down with %d updates unfinished", unfinished)
+        # Runs the app's shutdown hooks, which also close the bot session.
+        await runner.cleanup()
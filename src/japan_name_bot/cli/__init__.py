@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from typing import IO, Iterator, Sequence
+
+
+def _read_csv(stream: IO[str], column: str | None, header: bool) -> Iterator[str]:
+    reader = csv.reader(stream)
+    index = 0
+    if header:
+        row = next(reader, None)
+        if row is None:
+            return
+        if column is not None:
+            try:
+                index = row.index(column)
+            except ValueError:
+                raise SystemExit(f"Column {column!r} not found in CSV header")
+    for row in reader:
+        if len(row) > index:
+            yield row[index]
+
+
+def _read_jsonl(stream: IO[str], column: str | None) -> Iterator[str]:
+    key = column or "name"
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        value = json.loads(line)
+        if isinstance(value, dict):
+            value = value.get(key)
+        if isinstance(value, str):
+            yield value
+
+
+def _cmd_run(args: argparse.Namespace) -> None:
+    from japan_name_bot.config import require_bot_settings, settings
+
+    require_bot_settings()
+    workers = getattr(args, "workers", None) or settings.BOT_WORKERS
+    if workers > 1:
+        from japan_name_bot.bot.supervisor import run_supervisor
+
+        raise SystemExit(run_supervisor(workers))
+
+    from japan_name_bot.bot import cli
+
+    cli()
+
+
+def _cmd_convert(args: argparse.Namespace) -> None:
+    from japan_name_bot.services.name_conversion import convert_names
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if (args.input or "").endswith((".jsonl", ".ndjson")) else "csv"
+
+    src: IO[str] = (
+        open(args.input, encoding="utf-8", newline="")
+        if args.input and args.input != "-"
+        else sys.stdin
+    )
+    dst: IO[str] = (
+        open(args.output, "w", encoding="utf-8", newline="")
+        if args.output and args.output != "-"
+        else sys.stdout
+    )
+    try:
+        names = (
+            _read_jsonl(src, args.column)
+            if fmt == "jsonl"
+            else _read_csv(src, args.column, header=not args.no_header)
+        )
+        results = convert_names(names, processes=args.processes)
+        if fmt == "jsonl":
+            for name, katakana, romaji in results:
+                record = {"name": name, "katakana": katakana, "romaji": romaji}
+                dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            writer = csv.writer(dst)
+            writer.writerow(["name", "katakana", "romaji"])
+            writer.writerows(results)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+
+def _cmd_build_index(args: argparse.Namespace) -> None:
+    from japan_name_bot.services.name_conversion.name_index import build_index
+
+    count = build_index(args.output, args.db)
+    print(f"Wrote {count} names to {args.output}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="japan-name-bot")
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="run the Telegram bot (default)")
+    run.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes sharing preloaded data (default: BOT_WORKERS)",
+    )
+    run.set_defaults(func=_cmd_run)
+
+    convert = sub.add_parser("convert", help="convert a list of names offline")
+    convert.add_argument("input", nargs="?", help="CSV/JSONL file (default: stdin)")
+    convert.add_argument("-o", "--output", help="output file (default: stdout)")
+    convert.add_argument("-f", "--format", choices=["csv", "jsonl"])
+    convert.add_argument(
+        "-c",
+        "--column",
+        help="CSV header column or JSONL key holding the name "
+        "(default: first CSV column / 'name')",
+    )
+    convert.add_argument(
+        "--no-header", action="store_true", help="CSV input has no header row"
+    )
+    convert.add_argument(
+        "-p", "--processes", type=int, default=None, help="worker processes"
+    )
+    convert.set_defaults(func=_cmd_convert)
+
+    index = sub.add_parser("build-index", help="compile the JMnedict name index")
+    index.add_argument("output", nargs="?", default="data/jmnedict_names.idx")
+    index.add_argument("--db", help="jamdict SQLite database (default: bundled)")
+    index.set_defaults(func=_cmd_build_index)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = _build_parser().parse_args(argv)
+    func = getattr(args, "func", _cmd_run)
+    func(args)
@@ -1,12 +1,154 @@
+from typing import Dict, Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    BOT_TOKEN: str
+    # Required to run the bot (see require_bot_settings); offline commands
+    # such as "japan-name-bot convert" work without them.
+    BOT_TOKEN: str = ""
     CHANNEL_ID: int | None = None
     CHANNEL_USERNAME: str | None = None
-    DATABASE_URL: str
+    DATABASE_URL: str = ""
     DEFAULT_PROVIDER: str | None = None
+    # Custom Bot API server base URL (self-hosted server or a local fake)
+    TELEGRAM_API_URL: str | None = None
+
+    # asyncpg pool, per process (BOT_WORKERS processes open one each).
+    # Connections idle for DB_POOL_MAX_INACTIVE_LIFETIME seconds are closed and
+    # each is replaced after DB_POOL_MAX_QUERIES queries. DB_COMMAND_TIMEOUT
+    # bounds every query (unset: no limit). DB_PGBOUNCER turns off prepared
+    # statement caching for PgBouncer in transaction or statement pool mode.
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300
+    DB_POOL_MAX_QUERIES: int = 50000
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = None
+    DB_PGBOUNCER: bool = False
+
+    # Update delivery: long polling or a webhook served by aiohttp
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    WEBHOOK_BASE_URL: str | None = None
+    WEBHOOK_PATH: str = "/telegram/webhook"
+    WEBHOOK_SECRET: str | None = None
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_SET_ON_STARTUP: bool = True
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    WEBHOOK_MAX_PENDING: int = 1000
+    WEBHOOK_CONCURRENCY: int = 100
+    # Seconds to let accepted updates finish on shutdown
+    WEBHOOK_SHUTDOWN_TIMEOUT: float = 30
+
+    # Pre-fork worker mode (polling only): one poller process forwards updates
+    # to BOT_WORKERS worker processes by user id; 1 runs a single process
+    BOT_WORKERS: int = 1
+    WORKER_CONCURRENCY: int = 100
+    WORKER_SHUTDOWN_TIMEOUT: float = 30
+
+    # Health/readiness endpoints (/healthz, /readyz). In webhook mode they are
+    # also served by the webhook app; OPS_PORT adds a separate listener that is
+    # up from the very start of the process (it must differ from WEBHOOK_PORT).
+    # With BOT_WORKERS > 1, worker i also serves its own /metrics (and health)
+    # on OPS_PORT + 1 + i, since each worker process keeps its own registry.
+    OPS_HOST: str = "0.0.0.0"
+    OPS_PORT: int | None = None
+    # Prometheus metrics on /metrics (served wherever the health routes are)
+    METRICS_ENABLED: bool = False
+    # Logging: "text" or "json" lines on stdout. LOG_ASYNC writes from a
+    # background thread behind a queue of LOG_QUEUE_SIZE records (overflow is
+    # dropped and counted). LOG_SAMPLING keeps only a share of sub-WARNING
+    # records per logger prefix, e.g. {"aiogram.event": 0.1}. LOG_UPDATES adds
+    # one line per handled update with its latency.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_ASYNC: bool = False
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLING: Dict[str, float] = {}
+    LOG_UPDATES: bool = False
+    # Build conversion backends in every worker before taking updates
+    CONVERSION_WARMUP: bool = True
+
+    # Outbound Bot API pacing (Telegram allows ~30 msg/s overall, ~1/s per
+    # private chat and ~20/min per group)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_GLOBAL: float = 30
+    RATE_LIMIT_CHAT: float = 1
+    RATE_LIMIT_CHAT_BURST: float = 3
+    RATE_LIMIT_GROUP_PER_MINUTE: float = 20
+    RATE_LIMIT_MAX_RETRIES: int = 3
+
+    # Name conversion pool: "thread" or "process", size and admission queue
+    CONVERSION_EXECUTOR: Literal["thread", "process"] = "thread"
+    CONVERSION_WORKERS: int = 4
+    CONVERSION_QUEUE_SIZE: int = 64
+    CONVERSION_QUEUE_TIMEOUT: float = 5.0
+
+    # Conversion result cache: in-process LRU plus optional Postgres table
+    CONVERSION_CACHE_SIZE: int = 10000
+    CONVERSION_CACHE_PERSIST: bool = False
+    CONVERSION_CACHE_WARM_LIMIT: int = 5000
+    # Per-word memo: parts of multi-word names are converted and cached alone
+    CONVERSION_TOKEN_CACHE_SIZE: int = 50000
+
+    # Compiled JMnedict name index; jamdict SQLite is used when it is missing
+    NAME_INDEX_PATH: str | None = "data/jmnedict_names.idx"
+    # Preferred spellings TSV (the bundled table when unset). Checked for
+    # changes every interval seconds (0 disables polling) and on SIGHUP.
+    NAME_EXCEPTIONS_PATH: str | None = None
+    NAME_EXCEPTIONS_RELOAD_INTERVAL: float = 30
+
+    # Subscription status cache (seconds); kept fresh by chat_member updates
+    SUBSCRIPTION_CACHE_TTL: float = 3600
+    SUBSCRIPTION_NEGATIVE_CACHE_TTL: float = 300
+    SUBSCRIPTION_CACHE_SIZE: int = 100000
+    # Background reconciliation for joins missed while the bot was down: every
+    # RECONCILE_INTERVAL seconds, users with undelivered requests from the last
+    # RECONCILE_PENDING_DAYS days that were not checked for
+    # RECONCILE_RECHECK_AFTER seconds are checked in batches, at most
+    # RECONCILE_RATE getChatMember calls per second per process.
+    RECONCILE_INTERVAL: float = 300
+    RECONCILE_RECHECK_AFTER: float = 1800
+    RECONCILE_PENDING_DAYS: int = 7
+    RECONCILE_BATCH_SIZE: int = 100
+    RECONCILE_RATE: float = 5
+
+    # Inline mode (@bot Анна; enable it with BotFather's /setinline). Queries
+    # shorter than INLINE_MIN_QUERY_LENGTH only get popular-name suggestions;
+    # a name that is neither cached nor popular is converted after
+    # INLINE_DEBOUNCE seconds without a newer query, within
+    # INLINE_CONVERT_TIMEOUT.
+    INLINE_MIN_QUERY_LENGTH: int = 2
+    INLINE_DEBOUNCE: float = 0.3
+    INLINE_CONVERT_TIMEOUT: float = 0.5
+    INLINE_CACHE_TIME: int = 300
+    INLINE_MAX_RESULTS: int = 10
+    # Popular names for inline answers, recomputed from recent requests
+    POPULAR_NAMES_LIMIT: int = 1000
+    POPULAR_NAMES_WINDOW_DAYS: int = 30
+    POPULAR_NAMES_REFRESH_INTERVAL: float = 3600
+
+    # Recently seen users skip the users upsert entirely
+    KNOWN_USERS_CACHE_SIZE: int = 100000
+
+    # Write-behind batching of name_requests inserts (COPY per batch). While
+    # the database is unreachable at most NAME_REQUEST_MAX_PENDING rows are
+    # kept; the oldest are dropped beyond that.
+    NAME_REQUEST_BATCHING: bool = False
+    NAME_REQUEST_BATCH_SIZE: int = 200
+    NAME_REQUEST_FLUSH_INTERVAL: float = 1.0
+    NAME_REQUEST_MAX_PENDING: int = 10000
+    # name_requests is partitioned by month (UTC). The maintenance job keeps
+    # NAME_REQUESTS_PARTITIONS_AHEAD future months created, detaches (keeps
+    # as standalone tables) or drops months past NAME_REQUESTS_RETENTION_MONTHS
+    # (0 keeps everything) and re-aggregates the last NAME_REQUESTS_ROLLUP_DAYS
+    # days into name_requests_daily.
+    NAME_REQUESTS_MAINTENANCE_INTERVAL: float = 3600
+    NAME_REQUESTS_PARTITIONS_AHEAD: int = 2
+    NAME_REQUESTS_RETENTION_MONTHS: int = 12
+    NAME_REQUESTS_EXPIRED: Literal["detach", "drop"] = "detach"
+    NAME_REQUESTS_ROLLUP_DAYS: int = 7
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -15,4 +157,12 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()  # type: ignore[reportCallIssue]
+settings = Settings()
+
+
+def require_bot_settings() -> None:
+    missing = [
+        name for name in ("BOT_TOKEN", "DATABASE_URL") if not getattr(settings, name)
+    ]
+    if missing:
+        raise SystemExit(f"Missing required settings: {', '.join(missing)}")
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
 
-from tortoise import Tortoise
+from tortoise import Tortoise, connections
+from tortoise.backends.base.config_generator import expand_db_url
+from tortoise.exceptions import ConfigurationError
 
 from japan_name_bot.config import settings
+from japan_name_bot.ops.metrics import DB_POOL_CONNECTIONS, metrics_enabled
 
 TORTOISE_ORM: Dict[str, Any] = {
     "connections": {"default": settings.DATABASE_URL},
@@ -19,9 +23,82 @@ TORTOISE_ORM: Dict[str, Any] = {
     },
 }
 
+_ASYNCPG_ENGINE = "tortoise.backends.asyncpg"
+
+
+def pool_options() -> Dict[str, Any]:
+    """asyncpg pool and connection arguments from the DB_* settings."""
+    options: Dict[str, Any] = {
+        "minsize": settings.DB_POOL_MIN_SIZE,
+        "maxsize": settings.DB_POOL_MAX_SIZE,
+        "max_inactive_connection_lifetime": settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+        "max_queries": settings.DB_POOL_MAX_QUERIES,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_COMMAND_TIMEOUT is not None:
+        options["command_timeout"] = settings.DB_COMMAND_TIMEOUT
+    if settings.DB_PGBOUNCER:
+        # PgBouncer may run each statement on a different server connection,
+        # where a statement prepared on another one does not exist.
+        options["statement_cache_size"] = 0
+    return options
+
+
+def _runtime_config() -> Dict[str, Any]:
+    # Postgres connections get the pool settings and, with metrics on, go
+    # through the query-timing client. Migrations (aerich) keep using
+    # TORTOISE_ORM as is.
+    connection = expand_db_url(settings.DATABASE_URL)
+    if connection["engine"] != _ASYNCPG_ENGINE:
+        return TORTOISE_ORM
+    connection["credentials"].update(pool_options())
+    if metrics_enabled():
+        connection["engine"] = "japan_name_bot.db.instrumented"
+    return {**TORTOISE_ORM, "connections": {"default": connection}}
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    idle: int
+    max_size: int
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self.idle
+
+
+def pool_stats() -> PoolStats | None:
+    """Current state of the default connection's pool, if it has one yet."""
+    try:
+        client = connections.get("default")
+    except ConfigurationError:
+        return None
+    # The pool is created on the first query.
+    pool = getattr(client, "_pool", None)
+    if pool is None:
+        return None
+    return PoolStats(
+        size=pool.get_size(), idle=pool.get_idle_size(), max_size=pool.get_max_size()
+    )
+
+
+def _pool_samples() -> Dict[Tuple[str, ...], float]:
+    stats = pool_stats()
+    if stats is None:
+        return {}
+    return {
+        ("in_use",): stats.in_use,
+        ("idle",): stats.idle,
+        ("max",): stats.max_size,
+    }
+
+
+DB_POOL_CONNECTIONS.set_collector(_pool_samples)
+
 
 async def init_db() -> None:
-    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.init(config=_runtime_config())
 
 
 async def close_db() -> None:
@@ -0,0 +1,97 @@
+"""Tortoise engine module: the asyncpg client with query and pool timing.
+
+Selected by :func:`japan_name_bot.db.init_db` in place of
+``tortoise.backends.asyncpg`` when metrics are enabled. Pool waits are timed
+for connections taken by queries outside a transaction; transactions acquire
+theirs from the pool directly.
+"""
+
+from __future__ import annotations
+
+import time
+from types import TracebackType
+from typing import Any, Optional, Type
+
+from tortoise.backends.asyncpg.client import AsyncpgDBClient, TransactionWrapper
+
+from japan_name_bot.ops.metrics import DB_POOL_ACQUIRE_SECONDS, DB_QUERY_SECONDS
+
+_OPERATIONS = ("select", "insert", "update", "delete")
+
+
+def _operation(query: str) -> str:
+    head = query.lstrip()[:6].lower()
+    return head if head in _OPERATIONS else "other"
+
+
+class _QueryTimingMixin:
+    async def execute_insert(self, query: str, values: list) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_insert(query, values)  # type: ignore[misc]
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, "insert")
+
+    async def execute_many(self, query: str, values: list) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)  # type: ignore[misc]
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, _operation(query))
+
+    async def execute_query(self, query: str, values: Optional[list] = None) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_query(query, values)  # type: ignore[misc]
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, _operation(query))
+
+    async def execute_query_dict(
+        self, query: str, values: Optional[list] = None
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_query_dict(query, values)  # type: ignore[misc]
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, _operation(query))
+
+    async def execute_script(self, query: str) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_script(query)  # type: ignore[misc]
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, "other")
+
+
+class _TimedAcquire:
+    def __init__(self, inner: Any) -> None:
+        self._inner = inner
+
+    async def __aenter__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self._inner.__aenter__()
+        finally:
+            DB_POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - start)
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> Any:
+        return await self._inner.__aexit__(exc_type, exc, tb)
+
+
+class InstrumentedTransactionWrapper(_QueryTimingMixin, TransactionWrapper):
+    pass
+
+
+class InstrumentedAsyncpgClient(_QueryTimingMixin, AsyncpgDBClient):
+    _transaction_class = InstrumentedTransactionWrapper
+
+    def acquire_connection(self) -> Any:
+        return _TimedAcquire(super().acquire_connection())
+
+
+client_class = InstrumentedAsyncpgClient
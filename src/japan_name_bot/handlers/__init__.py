@@ -1,4 +1,5 @@
 from .chat_member import router as chat_member_router
+from .inline import router as inline_router
 from .name import router as name_router
 from .start import router as start_router
 
@@ -6,4 +7,5 @@ __all__ = [
     "start_router",
     "name_router",
     "chat_member_router",
+    "inline_router",
 ]
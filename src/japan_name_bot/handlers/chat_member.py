@@ -1,46 +1,42 @@
 from __future__ import annotations
 
 from aiogram import Bot, F, Router, types
-from aiogram.enums import ParseMode
 
 from japan_name_bot.config import settings
-from japan_name_bot.models import NameRequest
+from japan_name_bot.services.delivery import deliver_pending
+from japan_name_bot.services.name_requests import flush_pending_requests
+from japan_name_bot.services.subscription import (
+    SUBSCRIBED_STATUSES,
+    record_subscription,
+)
 
-router = Router()
+router = Router(name="chat_member")
 
 
-@router.chat_member(
-    F.new_chat_member.status.in_({"member", "administrator", "creator"})
-)
-async def on_join(event: types.ChatMemberUpdated, bot: Bot) -> None:
+def _is_target_channel(chat: types.Chat) -> bool:
     if settings.CHANNEL_ID is not None:
-        if event.chat.id != settings.CHANNEL_ID:
-            return
-    else:
-        desired_username = (settings.CHANNEL_USERNAME or "").lstrip("@").lower()
-        actual_username = (event.chat.username or "").lstrip("@").lower()
-        if not desired_username or actual_username != desired_username:
-            return
+        return chat.id == settings.CHANNEL_ID
+    desired_username = (settings.CHANNEL_USERNAME or "").lstrip("@").lower()
+    actual_username = (chat.username or "").lstrip("@").lower()
+    return bool(desired_username) and actual_username == desired_username
+
+
+@router.chat_member(F.new_chat_member.status.in_(SUBSCRIBED_STATUSES))
+async def on_join(event: types.ChatMemberUpdated, bot: Bot) -> None:
+    if not _is_target_channel(event.chat):
+        return
 
     user_id = event.new_chat_member.user.id
+    await record_subscription(user_id, True)
+    # The pending request may still sit in the write-behind buffer.
+    await flush_pending_requests(user_id)
+
+    await deliver_pending(bot, user_id)
+
 
-    req = (
-        await NameRequest.filter(user_id=user_id, delivered=False)
-        .order_by("-id")
-        .first()
-    )
-    if not req:
+@router.chat_member(F.new_chat_member.status.in_({"left", "kicked"}))
+async def on_leave(event: types.ChatMemberUpdated) -> None:
+    if not _is_target_channel(event.chat):
         return
 
-    await bot.send_message(
-        chat_id=user_id,
-        text=f"<b>Твое имя:</b> {req.katakana}\n\n<b>Romaji:</b> {req.romaji}",
-        parse_mode=ParseMode.HTML,
-    )
-    await bot.send_message(
-        chat_id=user_id,
-        text="Интересно звучит, не так ли?\n\n"
-        "Узнай, как по-японски будет имя твоего друга и скинь ему!",
-    )
-    req.delivered = True
-    await req.save(update_fields=["delivered"])
+    await record_subscription(event.new_chat_member.user.id, False)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+from typing import Dict, List, Tuple
+
+from aiogram import Bot, Router, types
+from aiogram.enums import ParseMode
+
+from japan_name_bot.config import settings
+from japan_name_bot.services.delivery import format_shared_result
+from japan_name_bot.services.name_conversion import (
+    ConversionQueueFull,
+    convert_name_async,
+    peek_conversion,
+)
+from japan_name_bot.services.name_conversion.cache import normalize_key
+from japan_name_bot.services.popular_names import PopularName, popular_names
+from japan_name_bot.services.subscription import is_user_subscribed_nowait_db
+
+router = Router(name="inline")
+
+# Telegram sends a query per keystroke; only each user's latest one is worth
+# answering, the client discards results for older ones anyway.
+_sequence = itertools.count()
+_latest: Dict[int, int] = {}
+
+# Answers that may change soon (a name still being typed, a conversion that
+# did not finish in time) are cached by Telegram only briefly.
+_PARTIAL_CACHE_TIME = 5
+
+
+def _article(
+    name: str, katakana: str, romaji: str
+) -> types.InlineQueryResultArticle:
+    digest = hashlib.sha1(f"{name}\0{katakana}".encode()).hexdigest()
+    return types.InlineQueryResultArticle(
+        id=digest[:32],
+        title=f"{name} — {katakana}",
+        description=romaji,
+        input_message_content=types.InputTextMessageContent(
+            message_text=format_shared_result(name, katakana, romaji),
+            parse_mode=ParseMode.HTML,
+        ),
+    )
+
+
+def _suggestions(
+    query: str, exclude: str | None = None
+) -> List[types.InlineQueryResultArticle]:
+    entries: Tuple[PopularName, ...] = popular_names().suggest(query)
+    skip = normalize_key(exclude) if exclude else None
+    return [
+        _article(entry.name, entry.katakana, entry.romaji)
+        for entry in entries
+        if normalize_key(entry.name) != skip
+    ]
+
+
+def _is_superseded(user_id: int, seq: int) -> bool:
+    return _latest.get(user_id) != seq
+
+
+async def _convert_debounced(
+    name: str, user_id: int, seq: int
+) -> Tuple[str, str] | None:
+    # Give the user a moment to keep typing before spending a conversion.
+    await asyncio.sleep(settings.INLINE_DEBOUNCE)
+    if _is_superseded(user_id, seq):
+        return None
+    try:
+        return await asyncio.wait_for(
+            convert_name_async(name), settings.INLINE_CONVERT_TIMEOUT
+        )
+    except (ConversionQueueFull, asyncio.TimeoutError):
+        return None
+
+
+@router.inline_query()
+async def on_inline_query(query: types.InlineQuery, bot: Bot) -> None:
+    user_id = query.from_user.id
+    seq = next(_sequence)
+    _latest[user_id] = seq
+    try:
+        await _answer(query, bot, user_id, seq)
+    finally:
+        if _latest.get(user_id) == seq:
+            del _latest[user_id]
+
+
+async def _answer(
+    query: types.InlineQuery, bot: Bot, user_id: int, seq: int
+) -> None:
+    text = " ".join(query.query.split())
+    # Results depend on the user only when they are gated on the channel.
+    gated = bool(settings.CHANNEL_ID or settings.CHANNEL_USERNAME)
+    if gated and not await is_user_subscribed_nowait_db(bot, user_id):
+        await query.answer(
+            [],
+            cache_time=_PARTIAL_CACHE_TIME,
+            is_personal=True,
+            button=types.InlineQueryResultsButton(
+                text="Подпишись на канал, чтобы делиться именами",
+                start_parameter="inline",
+            ),
+        )
+        return
+
+    cache_time = settings.INLINE_CACHE_TIME
+    results: List[types.InlineQueryResultArticle] = []
+    words = text.split()
+    if len(text) < settings.INLINE_MIN_QUERY_LENGTH or len(words) > 3:
+        # A fragment (or not a name): popular names only, no conversion.
+        results = _suggestions(text)
+        if text:
+            cache_time = _PARTIAL_CACHE_TIME
+    else:
+        result = peek_conversion(text)
+        if result is None:
+            popular = popular_names().get(text)
+            if popular is not None:
+                result = popular.katakana, popular.romaji
+        if result is None:
+            result = await _convert_debounced(text, user_id, seq)
+            if result is None:
+                cache_time = _PARTIAL_CACHE_TIME
+        if result is not None and result[0]:
+            results.append(_article(text, *result))
+        results.extend(_suggestions(text, exclude=text))
+
+    if _is_superseded(user_id, seq):
+        return
+    await query.answer(
+        results[: settings.INLINE_MAX_RESULTS],
+        cache_time=cache_time,
+        is_personal=gated,
+    )
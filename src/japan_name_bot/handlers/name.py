@@ -1,34 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+from datetime import datetime
+from typing import Tuple
+
 from aiogram import Bot, F, Router, types
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from japan_name_bot.config import settings
-from japan_name_bot.models import NameRequest, User
-from japan_name_bot.services.name_conversion import convert_name as convert_name_v2
+from japan_name_bot.services.delivery import RESULT_FOLLOW_UP, format_result
+from japan_name_bot.services.name_conversion import (
+    ConversionQueueFull,
+    convert_name_async,
+)
+from japan_name_bot.services.name_requests import mark_delivered, save_name_request
 from japan_name_bot.services.subscription import is_user_subscribed
+from japan_name_bot.services.users import ensure_user
 
-router = Router()
+logger = logging.getLogger(__name__)
 
+router = Router(name="name")
 
-@router.message(F.text, ~F.text.startswith("/"))
-async def on_name(message: types.Message, bot: Bot) -> None:
-    if not message.from_user or not message.text:
-        return
-    user_id = message.from_user.id
-    input_name = message.text.strip()
+_pending_reactions: set[asyncio.Task[None]] = set()
 
-    # Validate word count: allow up to 3 words (to support cases like full name)
-    words = [w for w in input_name.split() if w]
-    if len(words) > 3:
-        await message.answer(
-            "Хмм, что-то много слов 😅\n\n"
-            "Отправь только имя (до 3 слов), пожалуйста 🙏"
-        )
-        return
 
+async def _react(bot: Bot, message: types.Message) -> None:
     # React with a fire emoji to the valid name message
     try:
         await bot.set_message_reaction(
@@ -39,29 +38,103 @@ async def on_name(message: types.Message, bot: Bot) -> None:
         )
     except TelegramBadRequest:
         pass
+    except Exception:
+        logger.exception("Failed to react to message %s", message.message_id)
 
-    katakana, romaji = convert_name_v2(input_name)
 
-    username = message.from_user.username
-    user, _ = await User.get_or_create(id=user_id, defaults={"username": username})
-    await NameRequest.create(
-        user=user,
+def _react_in_background(bot: Bot, message: types.Message) -> None:
+    # The reaction is low priority for the rate limiter and can wait behind
+    # other chats' messages, so the reply never waits for it.
+    task = asyncio.create_task(_react(bot, message))
+    _pending_reactions.add(task)
+    task.add_done_callback(_pending_reactions.discard)
+
+
+async def _convert(input_name: str) -> Tuple[str, str] | None:
+    try:
+        return await convert_name_async(input_name)
+    except ConversionQueueFull:
+        return None
+
+
+async def _check_subscription(
+    bot: Bot, user_ready: asyncio.Task[None], user_id: int
+) -> bool:
+    # A fresh answer from Telegram is stored on the user row, which must exist.
+    await user_ready
+    return await is_user_subscribed(bot, None, user_id)
+
+
+async def _save_request(
+    user_ready: asyncio.Task[None],
+    conversion: asyncio.Task[Tuple[str, str] | None],
+    user_id: int,
+    input_name: str,
+) -> datetime | None:
+    result = await conversion
+    if result is None:
+        return None
+    katakana, romaji = result
+    await user_ready
+    # Saved as undelivered until the reply is out, so a failed send leaves it
+    # for the next join or reconcile sweep.
+    return await save_name_request(
+        user_id=user_id,
         input_name=input_name,
         katakana=katakana,
         romaji=romaji,
         provider="offline",
     )
 
-    subscribed = await is_user_subscribed(bot, None, user_id)
-    if subscribed:
+
+@router.message(F.text, ~F.text.startswith("/"))
+async def on_name(message: types.Message, bot: Bot) -> None:
+    if not message.from_user or not message.text:
+        return
+    user_id = message.from_user.id
+    input_name = message.text.strip()
+
+    # Validate word count: allow up to 3 words (to support cases like full name)
+    words = [w for w in input_name.split() if w]
+    if len(words) > 3:
         await message.answer(
-            f"<b>Твое имя:</b> {katakana}\n\n<b>Romaji:</b> {romaji}",
-            parse_mode=ParseMode.HTML,
+            "Хмм, что-то много слов 😅\n\n"
+            "Отправь только имя (до 3 слов), пожалуйста 🙏"
+        )
+        return
+
+    # The conversion runs alongside the user row and then the subscription
+    # check; the request is persisted as soon as the conversion and the user
+    # row are ready, and before any reply. A failure in any step cancels the
+    # others and surfaces as an ExceptionGroup. The reaction is not waited for.
+    _react_in_background(bot, message)
+    username = message.from_user.username
+    async with asyncio.TaskGroup() as tg:
+        conversion = tg.create_task(_convert(input_name))
+        user_ready = tg.create_task(ensure_user(user_id, username))
+        subscription = tg.create_task(_check_subscription(bot, user_ready, user_id))
+        saved = tg.create_task(
+            _save_request(user_ready, conversion, user_id, input_name)
+        )
+
+    result = conversion.result()
+    if result is None:
+        await message.answer(
+            "Сейчас слишком много желающих 😅\n\n"
+            "Попробуй еще раз через минутку 🙏"
         )
+        return
+    katakana, romaji = result
+
+    subscribed = subscription.result()
+    if subscribed:
         await message.answer(
-            text="Интересно звучит, не так ли?\n\n"
-            "Узнай, как по-японски будет имя твоего друга и скинь ему!",
+            format_result(katakana, romaji),
+            parse_mode=ParseMode.HTML,
         )
+        # Saved whenever the conversion succeeded.
+        await mark_delivered(user_id, saved.result())  # type: ignore[arg-type]
+        await message.answer(text=RESULT_FOLLOW_UP)
     else:
         # Построим ссылку на канал, если указан username (@channel)
         username = settings.CHANNEL_USERNAME
@@ -3,9 +3,9 @@ from __future__ import annotations
 from aiogram import Router, types
 from aiogram.filters import CommandStart
 
-from japan_name_bot.models import User
+from japan_name_bot.services.users import ensure_user
 
-router = Router()
+router = Router(name="start")
 
 
 @router.message(CommandStart())
@@ -15,6 +15,6 @@ async def cmd_start(message: types.Message) -> None:
     user_id = message.from_user.id
     username = message.from_user.username
 
-    await User.get_or_create(id=user_id, defaults={"username": username})
+    await ensure_user(user_id, username)
 
     await message.answer("🌸напиши свое имя🌸")
@@ -0,0 +1,18 @@
+from .log_context import LogContextMiddleware
+from .metrics import BotApiMetricsMiddleware, UpdateMetricsMiddleware
+from .rate_limit import (
+    RateLimiter,
+    RateLimiterStats,
+    RateLimitMiddleware,
+    get_rate_limiter,
+)
+
+__all__ = [
+    "BotApiMetricsMiddleware",
+    "LogContextMiddleware",
+    "RateLimiter",
+    "RateLimiterStats",
+    "RateLimitMiddleware",
+    "UpdateMetricsMiddleware",
+    "get_rate_limiter",
+]
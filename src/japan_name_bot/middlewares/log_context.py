@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from japan_name_bot.config import settings
+from japan_name_bot.utils.logging import bind_log_context, log_context
+
+logger = logging.getLogger("japan_name_bot.updates")
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """Attaches the update id, user id and handler name to log records.
+
+    As an outer middleware on updates it opens a log context with the ids
+    (and, with LOG_UPDATES, logs one line per update with its latency); as an
+    inner middleware it adds the name of the handler that matched.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            matched = data.get("handler")
+            router = data.get("event_router")
+            name = getattr(getattr(matched, "callback", None), "__name__", "")
+            if router is not None:
+                name = f"{router.name}.{name}"
+            bind_log_context(handler=name)
+            return await handler(event, data)
+
+        user = data.get("event_from_user")
+        with log_context(update_id=event.update_id, user_id=user and user.id):
+            start = time.perf_counter()
+            try:
+                return await handler(event, data)
+            finally:
+                if settings.LOG_UPDATES:
+                    elapsed = time.perf_counter() - start
+                    logger.info(
+                        "Update %s handled",
+                        event.update_id,
+                        extra={"latency_ms": round(elapsed * 1000, 2)},
+                    )
+
+    def setup(self, dp: Dispatcher) -> None:
+        dp.update.outer_middleware(self)
+        for event_name, observer in dp.observers.items():
+            if event_name not in {"update", "error"}:
+                observer.middleware(self)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from japan_name_bot.ops.metrics import (
+    BOT_API_ERRORS,
+    BOT_API_REQUEST_SECONDS,
+    UPDATE_SECONDS,
+)
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """Records latency and failures of every Bot API call by method.
+
+    Register it after :class:`RateLimitMiddleware` so it wraps the HTTP call
+    itself: pacing waits are not counted and each flood-control retry is
+    observed separately.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as exc:
+            BOT_API_ERRORS.inc(name, type(exc).__name__)
+            raise
+        finally:
+            BOT_API_REQUEST_SECONDS.observe(time.perf_counter() - start, name)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Times handler execution, labelled by the router that handled the event.
+
+    It runs as an inner middleware, i.e. only once a handler has matched, which
+    is when aiogram puts ``event_router`` into the handler data.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            router = data.get("event_router")
+            UPDATE_SECONDS.observe(
+                time.perf_counter() - start,
+                router.name if router is not None else "",
+                type(event).__name__,
+            )
+
+    def setup(self, dp: Dispatcher) -> None:
+        # Inner middlewares of a router also apply to its nested routers, so
+        # registering on the dispatcher covers every handler.
+        for event_name, observer in dp.observers.items():
+            if event_name not in {"update", "error"}:
+                observer.middleware(self)
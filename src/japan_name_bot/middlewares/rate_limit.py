@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from japan_name_bot.config import settings
+from japan_name_bot.ops.metrics import (
+    RATE_LIMIT_QUEUE_DEPTH,
+    RATE_LIMIT_RETRY_AFTER,
+    RATE_LIMIT_WAIT_SECONDS,
+    metrics_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+HIGH_PRIORITY = 0
+LOW_PRIORITY = 10
+
+# Cosmetic calls that should never delay a result message.
+LOW_PRIORITY_METHODS = frozenset({"setMessageReaction", "sendChatAction"})
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token can be taken (0 if available now)."""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, now: float, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    queue_depth: int
+    granted: int
+    throttled: int
+    throttle_delay_total: float
+    retry_after: int
+
+
+_Waiter = Tuple[int, int, "int | str | None", "asyncio.Future[None]"]
+
+
+class RateLimiter:
+    """Global plus per-chat token buckets with a priority-ordered wait queue.
+
+    A single pump task hands out permits: the highest-priority (then oldest)
+    waiter whose chat bucket has a token goes first, so one flooded chat does
+    not hold up everyone else.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        group_rate: float = 20 / 60,
+        group_burst: float = 3.0,
+        max_chat_buckets: int = 10000,
+    ) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._group_rate = group_rate
+        self._group_burst = group_burst
+        self._max_chat_buckets = max_chat_buckets
+        self._chats: Dict[int | str, TokenBucket] = {}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._pump_task: asyncio.Task[None] | None = None
+        self._granted = 0
+        self._throttled = 0
+        self._throttle_delay = 0.0
+        self._retry_after = 0
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._max_chat_buckets:
+                self._prune(time.monotonic())
+            # Negative IDs and @usernames are groups/channels with tighter limits.
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            if is_group:
+                bucket = TokenBucket(self._group_rate, self._group_burst)
+            else:
+                bucket = TokenBucket(self._chat_rate, self._chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        busy = {waiter[2] for waiter in self._waiters}
+        for chat_id, bucket in list(self._chats.items()):
+            if chat_id not in busy and bucket.idle(now):
+                del self._chats[chat_id]
+
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            queue_depth=len(self._waiters),
+            granted=self._granted,
+            throttled=self._throttled,
+            throttle_delay_total=self._throttle_delay,
+            retry_after=self._retry_after,
+        )
+
+    async def acquire(
+        self, chat_id: int | str | None, priority: int = HIGH_PRIORITY
+    ) -> float:
+        """Wait for a permit; returns the time spent waiting in seconds."""
+        start = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append((priority, next(self._seq), chat_id, future))
+        self._wake.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._waiters = [w for w in self._waiters if w[3] is not future]
+            raise
+        waited = time.monotonic() - start
+        if metrics_enabled():
+            RATE_LIMIT_WAIT_SECONDS.observe(
+                waited, "low" if priority >= LOW_PRIORITY else "high"
+            )
+        if waited > 0.001:
+            self._throttled += 1
+            self._throttle_delay += waited
+        return waited
+
+    def penalize(self, chat_id: int | str | None, seconds: float) -> None:
+        """Hold back a chat (or everything) after Telegram asked us to wait."""
+        self._retry_after += 1
+        now = time.monotonic()
+        if chat_id is None:
+            self._global.block(now, seconds)
+        else:
+            self._chat_bucket(chat_id).block(now, seconds)
+
+    async def _pump(self) -> None:
+        while self._waiters:
+            self._wake.clear()
+            now = time.monotonic()
+            wait = self._global.delay(now)
+            if wait <= 0:
+                wait = self._grant_next(now)
+                if wait <= 0:
+                    continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except TimeoutError:
+                pass
+
+    def _grant_next(self, now: float) -> float:
+        """Grant the best ready waiter; else return how long until one is."""
+        min_wait = float("inf")
+        for waiter in sorted(self._waiters, key=lambda w: (w[0], w[1])):
+            future = waiter[3]
+            if future.done():
+                self._waiters.remove(waiter)
+                return 0.0
+            chat_id = waiter[2]
+            bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+            wait = bucket.delay(now) if bucket is not None else 0.0
+            if wait <= 0:
+                self._waiters.remove(waiter)
+                self._global.take(now)
+                if bucket is not None:
+                    bucket.take(now)
+                self._granted += 1
+                future.set_result(None)
+                return 0.0
+            min_wait = min(min_wait, wait)
+        return min_wait
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Paces outgoing Bot API calls and retries them on ``TelegramRetryAfter``.
+
+    Only calls addressed to a chat are paced; ``getUpdates``, ``getMe`` and
+    other reads pass straight through.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        max_retries: int = 3,
+        jitter: float = 0.5,
+    ) -> None:
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.jitter = jitter
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        chat_id = getattr(method, "chat_id", None)
+        paced = chat_id is not None and not name.startswith("get")
+        priority = LOW_PRIORITY if name in LOW_PRIORITY_METHODS else HIGH_PRIORITY
+
+        attempt = 0
+        while True:
+            if paced:
+                await self.limiter.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = exc.retry_after + random.uniform(0, self.jitter)
+                logger.warning(
+                    "%s to %s hit flood control, retrying in %.1fs (%d/%d)",
+                    name,
+                    chat_id,
+                    delay,
+                    attempt,
+                    self.max_retries,
+                )
+                self.limiter.penalize(chat_id, delay)
+                if not paced:
+                    await asyncio.sleep(delay)
+
+
+_limiter: RateLimiter | None = None
+_global_share = 1
+
+
+def share_global_rate(processes: int) -> None:
+    """Give this process 1/``processes`` of RATE_LIMIT_GLOBAL.
+
+    For processes sending with the same bot token; call it before the limiter
+    is first used. Per-chat limits stay whole, as each chat is served by one
+    process.
+    """
+    global _global_share
+    _global_share = max(1, processes)
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            global_rate=settings.RATE_LIMIT_GLOBAL / _global_share,
+            chat_rate=settings.RATE_LIMIT_CHAT,
+            chat_burst=settings.RATE_LIMIT_CHAT_BURST,
+            group_rate=settings.RATE_LIMIT_GROUP_PER_MINUTE / 60,
+        )
+    return _limiter
+
+
+def _queue_depth() -> Dict[Tuple[str, ...], float]:
+    if _limiter is None:
+        return {}
+    return {(): _limiter.stats().queue_depth}
+
+
+def _retry_after() -> Dict[Tuple[str, ...], float]:
+    if _limiter is None:
+        return {}
+    return {(): _limiter.stats().retry_after}
+
+
+RATE_LIMIT_QUEUE_DEPTH.set_collector(_queue_depth)
+RATE_LIMIT_RETRY_AFTER.set_collector(_retry_after)
@@ -1,4 +1,6 @@
+from .name_conversion import NameConversion
 from .name_request import NameRequest
+from .name_request_daily import NameRequestDaily
 from .user import User
 
-__all__ = ["User", "NameRequest"]
+__all__ = ["User", "NameRequest", "NameRequestDaily", "NameConversion"]
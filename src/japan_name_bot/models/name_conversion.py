@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from tortoise import fields
+from tortoise.models import Model
+
+
+class NameConversion(Model):
+    key = fields.CharField(max_length=255, pk=True)
+    version = fields.CharField(max_length=32)
+    katakana = fields.CharField(max_length=255)
+    romaji = fields.CharField(max_length=255)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "name_conversions"
@@ -18,6 +18,8 @@ class NameRequest(Model):
     delivered = fields.BooleanField(default=False)
     delivered_at = fields.DatetimeField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
+    # normalize_key(input_name); NULL on rows written before it was stored
+    name_key = fields.CharField(max_length=255, null=True)
 
     class Meta:
         table = "name_requests"
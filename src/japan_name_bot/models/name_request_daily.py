@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from tortoise import fields
+from tortoise.models import Model
+
+
+class NameRequestDaily(Model):
+    id = fields.IntField(pk=True)
+    day = fields.DateField()
+    name_key = fields.CharField(max_length=255)
+    provider = fields.CharField(max_length=50)
+    requests = fields.IntField()
+    delivered = fields.IntField()
+
+    class Meta:
+        table = "name_requests_daily"
+        unique_together = (("day", "name_key", "provider"),)
@@ -9,6 +9,8 @@ class User(Model):
     username = fields.CharField(max_length=255, null=True)
     is_subscribed_cached = fields.BooleanField(default=False)
     last_checked_at = fields.DatetimeField(null=True)
+    # Set while a reconciliation sweep has the user claimed
+    reconcile_leased_until = fields.DatetimeField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
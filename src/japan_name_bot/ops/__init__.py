@@ -0,0 +1,19 @@
+from .health import (
+    add_health_routes,
+    is_ready,
+    mark_not_ready,
+    mark_ready,
+    start_ops_server,
+)
+from .metrics import REGISTRY, add_metrics_route, metrics_enabled
+
+__all__ = [
+    "REGISTRY",
+    "add_health_routes",
+    "add_metrics_route",
+    "is_ready",
+    "mark_not_ready",
+    "mark_ready",
+    "metrics_enabled",
+    "start_ops_server",
+]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from .metrics import add_metrics_route, metrics_enabled
+
+logger = logging.getLogger(__name__)
+
+_ready = False
+
+
+def mark_ready() -> None:
+    global _ready
+    if not _ready:
+        logger.info("Instance is ready")
+    _ready = True
+
+
+def mark_not_ready() -> None:
+    global _ready
+    _ready = False
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+async def _healthz(request: web.Request) -> web.Response:
+    # Liveness: the event loop is answering requests.
+    return web.json_response({"status": "ok"})
+
+
+async def _readyz(request: web.Request) -> web.Response:
+    # Readiness: startup (database, warmup) finished and shutdown hasn't begun.
+    if _ready:
+        return web.json_response({"status": "ready"})
+    return web.json_response({"status": "starting"}, status=503)
+
+
+def add_health_routes(app: web.Application) -> None:
+    app.router.add_get("/healthz", _healthz)
+    app.router.add_get("/readyz", _readyz)
+
+
+async def start_ops_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    add_health_routes(app)
+    if metrics_enabled():
+        add_metrics_route(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    logger.info("Serving ops endpoints on %s:%s", host, port)
+    return runner
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from aiohttp import web
+
+from japan_name_bot.config import settings
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def metrics_enabled() -> bool:
+    return settings.METRICS_ENABLED
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Updated from the event loop and from conversion pool threads.
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, values))
+
+    def samples(self) -> Iterator[_Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            if labels:
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter; label values are passed positionally to ``inc``."""
+
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[_Sample]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name, self._labels(labels), value
+
+
+class Gauge(_Metric):
+    """Point-in-time values read at scrape time from a collector function.
+
+    The collector returns a value per label-value tuple; until one is set
+    with :meth:`set_collector` the gauge renders no samples.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect: Callable[[], Dict[Tuple[str, ...], float]] | None = None
+
+    def set_collector(
+        self, collect: Callable[[], Dict[Tuple[str, ...], float]]
+    ) -> None:
+        self._collect = collect
+
+    def samples(self) -> Iterator[_Sample]:
+        values = self._collect() if self._collect is not None else {}
+        for labels, value in sorted(values.items()):
+            yield self.name, self._labels(labels), value
+
+
+class CollectedCounter(Gauge):
+    """Counter read at scrape time from totals kept elsewhere (a cache, say)."""
+
+    type_name = "counter"
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram in the Prometheus exposition format."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[labels] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterator[_Sample]:
+        with self._lock:
+            values = sorted(
+                (labels, (list(counts), total[0]))
+                for labels, (counts, total) in self._values.items()
+            )
+        for labels, (counts, total) in values:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket", (*base, ("le", le)), cumulative
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._register(metric)
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self._register(metric)
+        return metric
+
+    def collected_counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> CollectedCounter:
+        metric = CollectedCounter(name, documentation, labelnames)
+        self._register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._register(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONVERSION_STAGE_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_conversion_stage_seconds",
+    "Time spent in each name conversion stage.",
+    ("stage",),
+)
+CONVERSION_RESULTS = REGISTRY.counter(
+    "japan_name_bot_conversion_results_total",
+    "Conversions (per word of multi-word names) by the stage that produced them.",
+    ("stage",),
+)
+CONVERSION_CACHE_EVENTS = REGISTRY.collected_counter(
+    "japan_name_bot_conversion_cache_events_total",
+    "Conversion cache lookups and evictions per cache (name, token) and event.",
+    ("cache", "event"),
+)
+CONVERSION_CACHE_ENTRIES = REGISTRY.gauge(
+    "japan_name_bot_conversion_cache_entries",
+    "Entries held per conversion cache (name, token).",
+    ("cache",),
+)
+BOT_API_REQUEST_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_bot_api_request_seconds",
+    "Bot API call latency per method, including failed calls.",
+    ("method",),
+)
+BOT_API_ERRORS = REGISTRY.counter(
+    "japan_name_bot_bot_api_errors_total",
+    "Failed Bot API calls per method and error type.",
+    ("method", "error"),
+)
+RATE_LIMIT_QUEUE_DEPTH = REGISTRY.gauge(
+    "japan_name_bot_rate_limit_queue_depth",
+    "Bot API calls waiting for an outbound rate limit permit.",
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_rate_limit_wait_seconds",
+    "Time paced Bot API calls waited for a permit, by priority (high, low).",
+    ("priority",),
+)
+RATE_LIMIT_RETRY_AFTER = REGISTRY.collected_counter(
+    "japan_name_bot_rate_limit_retry_after_total",
+    "Bot API calls that Telegram answered with a flood-control retry_after.",
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_db_query_seconds",
+    "Database query latency by statement kind.",
+    ("operation",),
+)
+DB_POOL_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_db_pool_acquire_seconds",
+    "Time spent waiting for a connection from the database pool.",
+)
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "japan_name_bot_db_pool_connections",
+    "Database pool connections by state (in_use, idle) and the pool's max.",
+    ("state",),
+)
+SUBSCRIPTIONS_RECONCILED = REGISTRY.counter(
+    "japan_name_bot_subscriptions_reconciled_total",
+    "Users checked by the background subscription sweep, by outcome.",
+    ("outcome",),
+)
+UPDATE_SECONDS = REGISTRY.histogram(
+    "japan_name_bot_update_seconds",
+    "Handler processing time per router and event type.",
+    ("router", "event"),
+)
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "japan_name_bot_log_records_dropped_total",
+    "Log records discarded by sampling or because the log queue was full.",
+    ("reason",),
+)
+
+
+async def _metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=REGISTRY.render().encode(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+def add_metrics_route(app: web.Application) -> None:
+    app.router.add_get("/metrics", _metrics)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import html
+from typing import Any, Dict, List
+
+from aiogram import Bot
+from aiogram.enums import ParseMode
+from tortoise import connections
+
+RESULT_FOLLOW_UP = (
+    "Интересно звучит, не так ли?\n\n"
+    "Узнай, как по-японски будет имя твоего друга и скинь ему!"
+)
+
+# Keeps a batched message well under Telegram's 4096 character limit.
+_RESULTS_PER_MESSAGE = 30
+
+# Claiming marks rows delivered in the same statement that selects them, and
+# SKIP LOCKED makes concurrent replicas skip rows another one is claiming, so
+# every row is handed out at most once.
+_CLAIM_SQL = """
+UPDATE "name_requests"
+SET "delivered" = TRUE, "delivered_at" = CURRENT_TIMESTAMP
+WHERE "id" IN (
+    SELECT "id" FROM "name_requests"
+    WHERE "user_id" = $1 AND NOT "delivered"
+    ORDER BY "id"
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING "id", "input_name", "katakana", "romaji"
+"""
+
+_RELEASE_SQL = """
+UPDATE "name_requests"
+SET "delivered" = FALSE, "delivered_at" = NULL
+WHERE "id" = ANY($1::int[])
+"""
+
+
+def format_result(katakana: str, romaji: str) -> str:
+    return (
+        f"<b>Твое имя:</b> {html.escape(katakana)}\n\n"
+        f"<b>Romaji:</b> {html.escape(romaji)}"
+    )
+
+
+def format_shared_result(name: str, katakana: str, romaji: str) -> str:
+    # Sent on the user's behalf from inline mode, so it names the person.
+    return (
+        f"<b>{html.escape(name)}</b> по-японски: {html.escape(katakana)}\n\n"
+        f"<b>Romaji:</b> {html.escape(romaji)}"
+    )
+
+
+def format_results(rows: List[Dict[str, Any]]) -> str:
+    if len(rows) == 1:
+        return format_result(rows[0]["katakana"], rows[0]["romaji"])
+    lines = ["<b>Твои имена:</b>"]
+    for row in rows:
+        lines.append(
+            f"\n<b>{html.escape(row['input_name'])}:</b> "
+            f"{html.escape(row['katakana'])} ({html.escape(row['romaji'])})"
+        )
+    return "\n".join(lines)
+
+
+async def claim_pending(user_id: int) -> List[Dict[str, Any]]:
+    rows = await connections.get("default").execute_query_dict(_CLAIM_SQL, [user_id])
+    return sorted(rows, key=lambda row: row["id"])
+
+
+async def release(ids: List[int]) -> None:
+    await connections.get("default").execute_query(_RELEASE_SQL, [ids])
+
+
+async def deliver_pending(bot: Bot, user_id: int) -> int:
+    """Send every undelivered result of ``user_id``; returns how many were sent."""
+    rows = await claim_pending(user_id)
+    if not rows:
+        return 0
+
+    sent = 0
+    try:
+        for start in range(0, len(rows), _RESULTS_PER_MESSAGE):
+            chunk = rows[start : start + _RESULTS_PER_MESSAGE]
+            await bot.send_message(
+                chat_id=user_id,
+                text=format_results(chunk),
+                parse_mode=ParseMode.HTML,
+            )
+            sent += len(chunk)
+    finally:
+        if sent < len(rows):
+            # Hand back whatever didn't go out so a later join or sweep
+            # retries it, also when cancelled (at shutdown, say).
+            await asyncio.shield(release([row["id"] for row in rows[sent:]]))
+
+    await bot.send_message(chat_id=user_id, text=RESULT_FOLLOW_UP)
+    return sent
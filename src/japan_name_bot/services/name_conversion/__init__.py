@@ -1,187 +1,72 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Tuple
+import asyncio
+import contextlib
+import hashlib
+import logging
+import signal
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 
-import icu
-from jamdict import Jamdict
-from pykakasi import kakasi
 from unidecode import unidecode
 
-_YOON: Dict[str, str] = {
-    # palatalized combinations
-    "kya": "キャ",
-    "kyu": "キュ",
-    "kyo": "キョ",
-    "gya": "ギャ",
-    "gyu": "ギュ",
-    "gyo": "ギョ",
-    "sha": "シャ",
-    "shu": "シュ",
-    "sho": "ショ",
-    "ja": "ジャ",
-    "ju": "ジュ",
-    "jo": "ジョ",
-    "jya": "ジャ",
-    "jyu": "ジュ",
-    "jyo": "ジョ",
-    "cha": "チャ",
-    "chu": "チュ",
-    "cho": "チョ",
-    "nya": "ニャ",
-    "nyu": "ニュ",
-    "nyo": "ニョ",
-    "hya": "ヒャ",
-    "hyu": "ヒュ",
-    "hyo": "ヒョ",
-    "bya": "ビャ",
-    "byu": "ビュ",
-    "byo": "ビョ",
-    "pya": "ピャ",
-    "pyu": "ピュ",
-    "pyo": "ピョ",
-    "mya": "ミャ",
-    "myu": "ミュ",
-    "myo": "ミョ",
-    "rya": "リャ",
-    "ryu": "リュ",
-    "ryo": "リョ",
-}
-
-_SPECIAL: Dict[str, str] = {
-    "shi": "シ",
-    "chi": "チ",
-    "tsu": "ツ",
-    "fu": "フ",
-    "ji": "ジ",
-    "ti": "チ",
-    "tu": "ツ",
-    "di": "ディ",
-    "du": "ドゥ",
-    "wi": "ウィ",
-    "we": "ウェ",
-    "wu": "ウ",
-    "va": "ヴァ",
-    "vi": "ヴィ",
-    "vu": "ヴ",
-    "ve": "ヴェ",
-    "vo": "ヴォ",
-    "fa": "ファ",
-    "fi": "フィ",
-    "fe": "フェ",
-    "fo": "フォ",
-}
-
-_BASE: Dict[str, Dict[str, str]] = {
-    "": {"a": "ア", "i": "イ", "u": "ウ", "e": "エ", "o": "オ"},
-    "k": {"a": "カ", "i": "キ", "u": "ク", "e": "ケ", "o": "コ"},
-    "g": {"a": "ガ", "i": "ギ", "u": "グ", "e": "ゲ", "o": "ゴ"},
-    "s": {"a": "サ", "i": "シ", "u": "ス", "e": "セ", "o": "ソ"},
-    "z": {"a": "ザ", "i": "ジ", "u": "ズ", "e": "ゼ", "o": "ゾ"},
-    "t": {"a": "タ", "i": "チ", "u": "ツ", "e": "テ", "o": "ト"},
-    "d": {"a": "ダ", "i": "ヂ", "u": "ヅ", "e": "デ", "o": "ド"},
-    "n": {"a": "ナ", "i": "ニ", "u": "ヌ", "e": "ネ", "o": "ノ"},
-    "h": {"a": "ハ", "i": "ヒ", "u": "フ", "e": "ヘ", "o": "ホ"},
-    "b": {"a": "バ", "i": "ビ", "u": "ブ", "e": "ベ", "o": "ボ"},
-    "p": {"a": "パ", "i": "ピ", "u": "プ", "e": "ペ", "o": "ポ"},
-    "m": {"a": "マ", "i": "ミ", "u": "ム", "e": "メ", "o": "モ"},
-    "y": {"a": "ヤ", "i": "イ", "u": "ユ", "e": "イェ", "o": "ヨ"},
-    "r": {"a": "ラ", "i": "リ", "u": "ル", "e": "レ", "o": "ロ"},
-    "w": {"a": "ワ", "i": "ウィ", "u": "ウ", "e": "ウェ", "o": "ヲ"},
-    "j": {"a": "ジャ", "i": "ジ", "u": "ジュ", "e": "ジェ", "o": "ジョ"},
-    "q": {"a": "クァ", "i": "クィ", "u": "ク", "e": "クェ", "o": "クォ"},
-    "x": {"a": "ザ", "i": "クスィ", "u": "クス", "e": "グゼ", "o": "クソ"},
-    "c": {"a": "カ", "i": "シ", "u": "ク", "e": "セ", "o": "コ"},
-    "v": {"a": "ヴァ", "i": "ヴィ", "u": "ヴ", "e": "ヴェ", "o": "ヴォ"},
-}
-
-
-def _long_vowelize(kata: str) -> str:
-    result = []
-    for ch in kata:
-        if result and ch in {"ア", "イ", "ウ", "エ", "オ"} and result[-1] == ch:
-            result.append("ー")
-        else:
-            result.append(ch)
-    return "".join(result)
-
-
-def _romaji_to_katakana(token: str) -> str:
-    s = token.lower()
-    out = []
-    i = 0
-    while i < len(s):
-        # sokuon (double consonant except 'n')
-        if (
-            i + 1 < len(s)
-            and s[i] == s[i + 1]
-            and s[i].isalpha()
-            and s[i] not in {"a", "i", "u", "e", "o", "n"}
-        ):
-            out.append("ッ")
-            i += 1
-            continue
-
-        # terminal or standalone 'n' → ン
-        if s[i] == "n":
-            nxt = s[i + 1] if i + 1 < len(s) else ""
-            if not nxt or nxt not in {"a", "i", "u", "e", "o", "y"}:
-                out.append("ン")
-                i += 1
-                continue
-
-        # yoon combos (3 letters)
-        if i + 2 < len(s):
-            tri = s[i : i + 3]
-            if tri in _YOON:
-                out.append(_YOON[tri])
-                i += 3
-                continue
-
-        # specials (2-3 letters)
-        if i + 2 <= len(s):
-            for length in (3, 2):
-                if i + length <= len(s):
-                    seg = s[i : i + length]
-                    if seg in _SPECIAL:
-                        out.append(_SPECIAL[seg])
-                        i += length
-                        break
-            else:
-                pass
-            if i > 0 and out and out[-1] in _SPECIAL.values():
-                continue
-
-        # base CV or V
-        c = ""
-        v = ""
-        if i < len(s) and s[i] in _BASE:
-            c = s[i]
-            if i + 1 < len(s) and s[i + 1] in {"a", "i", "u", "e", "o"}:
-                v = s[i + 1]
-                out.append(_BASE[c][v])
-                i += 2
-                continue
-            else:
-                # bare consonant, approximate with vowel 'u'
-                out.append(
-                    _BASE[c]["u"]
-                )  # e.g., 't' -> トゥ (approx via ツ/トゥ), keep simple ル/ム style
-                i += 1
-                continue
-        # vowel only
-        if s[i] in {"a", "i", "u", "e", "o"}:
-            out.append(_BASE[""][s[i]])
-            i += 1
-            continue
-
-        # non-letter: skip
-        i += 1
-
-    return _long_vowelize("".join(out))
-
+from japan_name_bot.config import settings
+from japan_name_bot.ops.metrics import (
+    CONVERSION_CACHE_ENTRIES,
+    CONVERSION_CACHE_EVENTS,
+    CONVERSION_RESULTS,
+    CONVERSION_STAGE_SECONDS,
+    metrics_enabled,
+)
+from japan_name_bot.utils.logging import bind_log_context
+
+from .batch import convert_names
+from .cache import (
+    CacheStats,
+    ConversionCache,
+    drain_pending_writes,
+    normalize_key,
+    persist_in_background,
+    warm_from_db,
+)
+from .engine import ConversionEngine, engine_load_time, get_engine
+from .exceptions import (
+    BUNDLED_EXCEPTIONS,
+    ExceptionTable,
+    file_signature,
+    load_exception_table,
+)
+from .executor import ConversionQueueFull, get_executor, shutdown_executor
+from .romaji import romaji_to_katakana
+
+__all__ = [
+    "CacheStats",
+    "ConversionEngine",
+    "ConversionQueueFull",
+    "convert_name",
+    "convert_name_async",
+    "convert_names",
+    "cache_stats",
+    "drain_pending_writes",
+    "get_engine",
+    "peek_conversion",
+    "reload_exceptions",
+    "shutdown_executor",
+    "token_cache_stats",
+    "warm_conversion_cache",
+    "preload_conversion",
+    "warm_up_conversion",
+    "watch_exceptions",
+]
+
+logger = logging.getLogger(__name__)
 
 # --- Normalization rules ---------------------------------------------------
 
+# Bump whenever conversion logic changes in a way that alters results, so that
+# cached conversions computed by older code are discarded.
+_RULES_VERSION = "6"
+
 _OLD_KANA_MAP: Dict[str, str] = {
     "ヷ": "ヴァ",
     "ヸ": "ヴィ",
@@ -212,103 +97,165 @@ def _normalize_katakana_after_icu(kata: str, latin_query: str) -> str:
 
 # --- Exceptions ------------------------------------------------------------
 
-_EXCEPTIONS: Dict[str, Tuple[str, str]] = {
-    # Common Russian names with preferred forms
-    "nikita": ("ニキータ", "Nikita"),
-    "evelina": ("エヴェリーナ", "Everina"),
-    "dmitriy": ("ドミトリー", "Dmitriy"),
-    "dmitri": ("ドミトリー", "Dmitri"),
-    "sergey": ("セルゲイ", "Sergei"),
-    "sergei": ("セルゲイ", "Sergei"),
-    "alexey": ("アレクセイ", "Alexey"),
-    "aleksei": ("アレクセイ", "Aleksei"),
-    "mikhail": ("ミハイル", "Mikhail"),
-    "yuliya": ("ユーリヤ", "Yuliya"),
-    "julia": ("ユリア", "Julia"),
-    "maria": ("マリヤ", "Mariya"),
-}
+# Preferred forms live in a TSV file (bundled exceptions.tsv unless
+# NAME_EXCEPTIONS_PATH is set). The whole table is swapped on reload.
+_exceptions: ExceptionTable = load_exception_table(settings.NAME_EXCEPTIONS_PATH)
 
 
 def _exceptions_lookup(name: str) -> Optional[Tuple[str, str]]:
-    key = unidecode(name).strip().lower()
-    return _EXCEPTIONS.get(key)
+    return _exceptions.lookup(name)
 
 
-# --- ICU helpers -----------------------------------------------------------
+# --- Result cache ----------------------------------------------------------
 
 
-def _icu_ru_to_latin(text: str) -> str:
-    if icu is None:
-        return unidecode(text)
-    try:
-        tr = icu.Transliterator.createInstance("Russian-Latin/BGN")
-        return tr.transliterate(text)
-    except Exception:
-        return unidecode(text)
-
-
-def _icu_latin_to_katakana(text: str) -> Optional[str]:
-    if icu is None:
-        return None
-    try:
-        tr = icu.Transliterator.createInstance("Latin-Katakana")
-        return tr.transliterate(text)
-    except Exception:
-        return None
-
+def _cache_version() -> str:
+    digest = hashlib.sha1(
+        repr(
+            (
+                _RULES_VERSION,
+                _exceptions.digest,
+                sorted(_OLD_KANA_MAP.items()),
+            )
+        ).encode()
+    ).hexdigest()
+    return digest[:16]
 
-# --- jamdict lookup -------------------------------------------------------
 
-_jamdict_instance: Any | None = None
+_cache = ConversionCache(
+    maxsize=settings.CONVERSION_CACHE_SIZE, version=_cache_version()
+)
 
 
-def _get_jamdict() -> Any | None:
-    global _jamdict_instance
-    if Jamdict is None:
-        return None
-    if _jamdict_instance is None:
-        try:
-            _jamdict_instance = Jamdict()
-        except Exception:
-            _jamdict_instance = None
-    return _jamdict_instance
-
+def reload_exceptions(force: bool = False) -> bool:
+    """Re-reads the exceptions file if it changed (or always, with ``force``).
 
-def _lookup_katakana_in_jamdict(query: str) -> Optional[str]:
-    jd = _get_jamdict()
-    if jd is None:
-        return None
+    The new table replaces the old one in a single assignment and the result
+    cache moves to a new version, so nothing computed with the old table is
+    served afterwards. A file that fails to parse is logged and ignored.
+    Returns whether a new table was installed.
+    """
+    global _exceptions
+    current = _exceptions
+    path = current.path or BUNDLED_EXCEPTIONS
     try:
-        res = jd.lookup(query)
-    except Exception:
-        return None
-
-    # Prefer name entries (JMnedict)
-    names = getattr(res, "names", None) or getattr(res, "name_entries", None) or []
-    for ne in names:  # type: ignore[assignment]
-        r_list = getattr(ne, "r_ele", [])
-        for r in r_list:
-            reading = getattr(r, "reb", None)
-            if not reading:
-                continue
-            # Ensure Katakana; if Hiragana, keep as-is (later we can convert if needed)
-            return reading
-    return None
-
-
-def convert_name(name: str) -> Tuple[str, str]:
-    ascii_name = unidecode(name).strip()
+        if not force and file_signature(path) == current.signature:
+            return False
+        table = load_exception_table(path)
+    except (OSError, ValueError):
+        logger.exception(
+            "Keeping %d exceptions; reload of %s failed", len(current), path
+        )
+        return False
+    _exceptions = table
+    _cache.set_version(_cache_version())
+    logger.info(
+        "Loaded %d exception spellings from %s (version %s)",
+        len(table),
+        path,
+        table.version or "-",
+    )
+    return True
+
+
+async def watch_exceptions(interval: float) -> None:
+    """Reloads exceptions on file change (polled) or on SIGHUP until cancelled.
+
+    Parsing runs in a thread, so handlers are never blocked by a reload.
+    """
+    loop = asyncio.get_running_loop()
+    hangup = asyncio.Event()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, hangup.set)
+    except (NotImplementedError, RuntimeError):
+        pass
+    timeout = interval if interval > 0 else None
+    try:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(hangup.wait(), timeout)
+            forced = hangup.is_set()
+            hangup.clear()
+            await loop.run_in_executor(None, reload_exceptions, forced)
+    finally:
+        with contextlib.suppress(NotImplementedError, RuntimeError):
+            loop.remove_signal_handler(signal.SIGHUP)
+
+
+def cache_stats() -> CacheStats:
+    return _cache.stats()
+
+
+async def warm_conversion_cache() -> int:
+    if not settings.CONVERSION_CACHE_PERSIST:
+        return 0
+    return await warm_from_db(_cache, settings.CONVERSION_CACHE_WARM_LIMIT)
+
+
+# Returned alongside each result: the stage that produced it and the seconds
+# spent in every stage that ran. Timing happens wherever the conversion runs
+# (including pool processes); recording into metrics happens in the caller.
+_Trace = Tuple[Tuple[str, str], str, Dict[str, float]]
+
+# Separators for the parts of a multi-word name (the interpunct is how
+# foreign full names are written in katakana).
+_KATAKANA_SEPARATOR = "・"
+_ROMAJI_SEPARATOR = " "
+# Parts of a double-barrelled name ("Anna-Maria") keep the hyphen in romaji.
+_ROMAJI_HYPHEN = "-"
+
+
+def _convert_hyphenated_traced(parts: Sequence[str]) -> _Trace:
+    # Each part is converted like a word of its own: アンナ・マリア, Anna-Maria.
+    timings: Dict[str, float] = {}
+    results = []
+    stages = set()
+    for part in parts:
+        exc = _exceptions_lookup(part)
+        if exc:
+            result, stage = exc, "exceptions"
+        else:
+            result, stage, part_timings = _convert_token_traced(part)
+            for step, elapsed in part_timings.items():
+                timings[step] = timings.get(step, 0.0) + elapsed
+        results.append(result)
+        stages.add(stage)
+    if not any(kata for kata, _ in results):
+        return ("", ""), "empty", timings
+    joined = (
+        _KATAKANA_SEPARATOR.join(kata for kata, _ in results if kata),
+        _ROMAJI_HYPHEN.join(romaji for _, romaji in results if romaji),
+    )
+    return joined, "+".join(sorted(stages - {"empty"})), timings
+
+
+def _dictionary_query(latin: str) -> str:
+    # The name index matches glosses exactly and JMnedict capitalizes names
+    # ("Ivan"), while conversion sees the casefolded word.
+    return latin.capitalize()
+
+
+def _convert_token_traced(token: str) -> _Trace:
+    token = normalize_key(token)
+    parts = [part for part in token.split("-") if part.strip()]
+    if len(parts) > 1:
+        return _convert_hyphenated_traced(parts)
+
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter
+    ascii_name = unidecode(token).strip()
     if not ascii_name:
-        return ("", "")
+        return ("", ""), "empty", timings
 
-    # 0) Exceptions
-    exc = _exceptions_lookup(name)
-    if exc:
-        return exc
+    engine = get_engine()
 
     # 1) Try JMnedict by romanized query (BGN)
-    latin_query = _icu_ru_to_latin(name).strip() or ascii_name
-    kata_from_dict = _lookup_katakana_in_jamdict(latin_query)
+    start = clock()
+    latin_query = engine.ru_to_latin(token).strip() or ascii_name
+    timings["transliterate"] = clock() - start
+    start = clock()
+    kata_from_dict = engine.jamdict_reading(_dictionary_query(latin_query))
+    timings["dictionary"] = clock() - start
     if kata_from_dict:
         kata = kata_from_dict
         # normalize to Katakana if needed
@@ -318,37 +265,271 @@ def convert_name(name: str) -> Tuple[str, str]:
             kata = jaconv.hira2kata(kata)
         except Exception:
             pass
-        kk = kakasi()
-        kk.setMode("H", "a")
-        kk.setMode("K", "a")
-        kk.setMode("J", "a")
-        conv = kk.getConverter()
-        romaji = conv.do(kata)
-        return kata, romaji.capitalize()
+        start = clock()
+        romaji = engine.katakana_to_romaji(kata)
+        timings["romaji"] = clock() - start
+        return (kata, romaji.capitalize()), "dictionary", timings
 
     # 2) Fallback via ICU Latin→Katakana if available
-    icu_kata = _icu_latin_to_katakana(latin_query)
+    start = clock()
+    icu_kata = engine.latin_to_katakana(latin_query)
+    timings["icu"] = clock() - start
     if icu_kata:
         icu_kata = _normalize_katakana_after_icu(icu_kata, latin_query)
-        kk = kakasi()
-        kk.setMode("H", "a")
-        kk.setMode("K", "a")
-        kk.setMode("J", "a")
-        conv = kk.getConverter()
-        romaji = conv.do(icu_kata)
-        return icu_kata, romaji.capitalize()
+        start = clock()
+        romaji = engine.katakana_to_romaji(icu_kata)
+        timings["romaji"] = clock() - start
+        return (icu_kata, romaji.capitalize()), "icu", timings
 
     # 3) Final fallback: heuristic mapper
+    start = clock()
     tokens = [t for t in ascii_name.replace("-", " ").split() if t]
-    kata_tokens = [_romaji_to_katakana(t) for t in tokens]
+    kata_tokens = [romaji_to_katakana(t) for t in tokens]
     katakana = " ".join(kata_tokens)
+    timings["heuristic"] = clock() - start
 
     # Canonical romaji from resulting katakana (Hepburn-ish)
-    kk = kakasi()
-    kk.setMode("H", "a")
-    kk.setMode("K", "a")
-    kk.setMode("J", "a")
-    conv = kk.getConverter()
-    romaji = " ".join(conv.do(k) for k in kata_tokens) if kata_tokens else ""
-
-    return katakana, romaji.capitalize()
+    start = clock()
+    romaji = (
+        " ".join(engine.katakana_to_romaji(k) for k in kata_tokens)
+        if kata_tokens
+        else ""
+    )
+    timings["romaji"] = clock() - start
+
+    return (katakana, romaji.capitalize()), "heuristic", timings
+
+
+def _convert_tokens_traced(tokens: Sequence[str]) -> List[_Trace]:
+    # One pool round trip for all the words of a name that need converting.
+    return [_convert_token_traced(token) for token in tokens]
+
+
+def _join_tokens(results: Sequence[Tuple[str, str]]) -> Tuple[str, str]:
+    return (
+        _KATAKANA_SEPARATOR.join(kata for kata, _ in results if kata),
+        _ROMAJI_SEPARATOR.join(romaji for _, romaji in results if romaji),
+    )
+
+
+def _convert_name_traced(name: str) -> _Trace:
+    """Converts ``name`` word by word, bypassing every cache.
+
+    A whole-name exception wins; otherwise each word is looked up in the
+    exceptions and converted on its own, and the timings are summed.
+    """
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter
+    start = clock()
+    exc = _exceptions_lookup(name)
+    timings["exceptions"] = clock() - start
+    if exc:
+        return exc, "exceptions", timings
+    results = []
+    stages = []
+    for token in normalize_key(name).split():
+        exc = _exceptions_lookup(token)
+        if exc:
+            result, stage = exc, "exceptions"
+        else:
+            result, stage, token_timings = _convert_token_traced(token)
+            for step, elapsed in token_timings.items():
+                timings[step] = timings.get(step, 0.0) + elapsed
+        results.append(result)
+        stages.append(stage)
+    if not any(kata for kata, _ in results):
+        return ("", ""), "empty", timings
+    return _join_tokens(results), "+".join(stages), timings
+
+
+def _convert_name_uncached(name: str) -> Tuple[str, str]:
+    return _convert_name_traced(name)[0]
+
+
+def _record_trace(stage: str, timings: Dict[str, float]) -> None:
+    CONVERSION_RESULTS.inc(stage)
+    for step, elapsed in timings.items():
+        CONVERSION_STAGE_SECONDS.observe(elapsed, step)
+
+
+# --- Warmup ----------------------------------------------------------------
+
+# Canned inputs covering the exception table, the dictionary/ICU path for
+# Cyrillic and Latin input, and the heuristic fallback.
+_WARMUP_NAMES = ("Никита", "Анастасия", "Александр Пушкин", "Emily", "Zhuk")
+
+
+def _warm_up_worker() -> Dict[str, float]:
+    engine = get_engine()
+    timings = {"name_index": engine_load_time()}
+    timings.update(engine.warm_up())
+    start = time.perf_counter()
+    for name in _WARMUP_NAMES:
+        _convert_name_uncached(name)
+    timings["samples"] = time.perf_counter() - start
+    return timings
+
+
+def preload_conversion() -> Dict[str, float]:
+    """Loads the name index and the shared ICU and kakasi data in this process.
+
+    Meant to run before forking workers so they share the pages; unlike
+    :func:`warm_up_conversion` it leaves no per-thread backends behind.
+    """
+    timings = get_engine().preload()
+    timings["name_index"] = engine_load_time()
+    return timings
+
+
+async def warm_up_conversion() -> Dict[str, float]:
+    """Builds the conversion backends in every pool worker and runs a few names.
+
+    Returns the slowest worker's time per backend, in seconds. Results of the
+    canned names are not cached.
+    """
+    timings: Dict[str, float] = {}
+    for worker in await get_executor().run_on_each_worker(_warm_up_worker):
+        for backend, elapsed in worker.items():
+            timings[backend] = max(timings.get(backend, 0.0), elapsed)
+    return timings
+
+
+# Words recur across names in new combinations ("Анна Иванова", "Анна
+# Петрова"), so converted words are memoized on their own, in the caller's
+# process. Word results depend on the rules but not on the exceptions table,
+# so reloading exceptions leaves this memo alone.
+_token_cache = ConversionCache(
+    maxsize=settings.CONVERSION_TOKEN_CACHE_SIZE, version=_RULES_VERSION
+)
+
+
+def token_cache_stats() -> CacheStats:
+    return _token_cache.stats()
+
+
+def _cache_samples() -> Dict[str, CacheStats]:
+    return {"name": _cache.stats(), "token": _token_cache.stats()}
+
+
+def _cache_events() -> Dict[Tuple[str, ...], float]:
+    samples: Dict[Tuple[str, ...], float] = {}
+    for cache, stats in _cache_samples().items():
+        samples[(cache, "hit")] = stats.hits
+        samples[(cache, "miss")] = stats.misses
+        samples[(cache, "eviction")] = stats.evictions
+    return samples
+
+
+def _cache_entries() -> Dict[Tuple[str, ...], float]:
+    return {(cache,): stats.size for cache, stats in _cache_samples().items()}
+
+
+CONVERSION_CACHE_EVENTS.set_collector(_cache_events)
+CONVERSION_CACHE_ENTRIES.set_collector(_cache_entries)
+
+
+def _known_token(token: str) -> Optional[Tuple[Tuple[str, str], str]]:
+    # A word's result and where it came from, or None if it needs converting.
+    # Words come from the normalized key, the exact form that is converted,
+    # so they key the memo as they are.
+    exc = _exceptions_lookup(token)
+    if exc:
+        return exc, "exceptions"
+    memo = _token_cache.get(token)
+    if memo is not None:
+        return memo, "token_cache"
+    return None
+
+
+def _finish(
+    tokens: Sequence[str],
+    known: Sequence[Optional[Tuple[Tuple[str, str], str]]],
+    traces: Sequence[_Trace],
+) -> Tuple[Tuple[str, str], str]:
+    # Merges looked-up and freshly converted words (in order), memoizes the
+    # latter and records metrics per word.
+    record = metrics_enabled()
+    converted = iter(traces)
+    results = []
+    stages = []
+    for token, entry in zip(tokens, known):
+        if entry is None:
+            result, stage, timings = next(converted)
+            _token_cache.put(token, result)
+            if record:
+                _record_trace(stage, timings)
+        else:
+            result, stage = entry
+            if record:
+                CONVERSION_RESULTS.inc(stage)
+        results.append(result)
+        stages.append(stage)
+    return _join_tokens(results), "+".join(stages) or "empty"
+
+
+def convert_name(name: str) -> Tuple[str, str]:
+    key = normalize_key(name)
+    cached = _cache.get(key)
+    if cached is not None:
+        if metrics_enabled():
+            CONVERSION_RESULTS.inc("cache")
+        return cached
+    version = _cache.version
+    exc = _exceptions_lookup(name)
+    if exc:
+        if metrics_enabled():
+            CONVERSION_RESULTS.inc("exceptions")
+        result = exc
+    else:
+        tokens = key.split()
+        known = [_known_token(token) for token in tokens]
+        missing = [token for token, entry in zip(tokens, known) if entry is None]
+        result, _ = _finish(tokens, known, _convert_tokens_traced(missing))
+    _cache.put(key, result, version=version)
+    return result
+
+
+def peek_conversion(name: str) -> Optional[Tuple[str, str]]:
+    """The result for ``name`` if it is cached or an exception, else ``None``.
+
+    Never converts, so it is safe on paths that must answer within a few
+    milliseconds.
+    """
+    return _cache.get(normalize_key(name)) or _exceptions_lookup(name)
+
+
+async def convert_name_async(name: str) -> Tuple[str, str]:
+    # Cache hits are answered inline; misses run in the conversion pool so
+    # dictionary lookups and transliteration never block the event loop.
+    key = normalize_key(name)
+    cached = _cache.get(key)
+    if cached is not None:
+        bind_log_context(stage="cache")
+        if metrics_enabled():
+            CONVERSION_RESULTS.inc("cache")
+        return cached
+    # Exceptions are checked here rather than in the pool: it is one dict
+    # probe, and pool processes would not see a reloaded table.
+    exc = _exceptions_lookup(name)
+    if exc:
+        bind_log_context(stage="exceptions")
+        if metrics_enabled():
+            CONVERSION_RESULTS.inc("exceptions")
+        return exc
+    # Words already known are filled in here; the rest go to the pool in one
+    # call.
+    tokens = key.split()
+    known = [_known_token(token) for token in tokens]
+    missing = [token for token, entry in zip(tokens, known) if entry is None]
+    version = _cache.version
+    traces = (
+        await get_executor().run(_convert_tokens_traced, missing) if missing else []
+    )
+    result, stage = _finish(tokens, known, traces)
+    bind_log_context(stage=stage)
+    # Not kept if the exceptions were reloaded while this was converting.
+    if version == _cache.version:
+        _cache.put(key, result, version=version)
+        if settings.CONVERSION_CACHE_PERSIST:
+            persist_in_background(key, version, result)
+    return result
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Tuple
+
+from .cache import normalize_key
+
+BatchResult = Tuple[str, str, str]
+
+
+def _dedupe(names: Iterable[str]) -> Iterator[str]:
+    seen: set[str] = set()
+    for name in names:
+        name = name.strip()
+        key = normalize_key(name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        yield name
+
+
+def _chunks(names: Iterator[str], size: int) -> Iterator[List[str]]:
+    while chunk := list(islice(names, size)):
+        yield chunk
+
+
+def _convert_chunk(chunk: List[str]) -> List[BatchResult]:
+    from . import convert_name  # local import: the package imports this module
+
+    return [(name, *convert_name(name)) for name in chunk]
+
+
+def convert_names(
+    names: Iterable[str],
+    processes: int | None = None,
+    chunksize: int = 256,
+) -> Iterator[BatchResult]:
+    """Convert a stream of names, yielding ``(name, katakana, romaji)``.
+
+    Inputs are deduplicated by normalized key, the form conversion works on,
+    so a dropped duplicate would have had the same result; results come out
+    in input order. With ``processes > 1`` chunks are spread over a process pool, and at
+    most two chunks per worker are in flight, so arbitrarily long inputs are
+    never held in memory.
+    """
+    unique = _dedupe(names)
+    if not processes or processes <= 1:
+        for chunk in _chunks(unique, chunksize):
+            yield from _convert_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending: Deque[Future[List[BatchResult]]] = deque()
+        for chunk in _chunks(unique, chunksize):
+            pending.append(pool.submit(_convert_chunk, chunk))
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Set, Tuple
+
+from japan_name_bot.models import NameConversion
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[str, str]
+
+
+def normalize_key(name: str) -> str:
+    """The form of a name that conversion works on: NFKC, casefolded, single
+    spaces.
+
+    Names are converted from this form only, so case and whitespace never
+    change a result and it is safe to key caches (and dedupe) on it.
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    version: str
+
+
+class ConversionCache:
+    """Thread-safe bounded LRU of conversion results keyed by normalized name.
+
+    Entries belong to a ``version`` derived from the conversion rules; changing
+    the version drops everything computed under the old rules.
+    """
+
+    def __init__(self, maxsize: int, version: str) -> None:
+        self.maxsize = max(0, maxsize)
+        self._version = version
+        self._data: OrderedDict[str, Result] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def get(self, key: str) -> Optional[Result]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value: Result, version: Optional[str] = None) -> None:
+        """Stores ``value``; with ``version``, only if it is still current."""
+        if not self.maxsize:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def set_version(self, version: str) -> bool:
+        with self._lock:
+            if version == self._version:
+                return False
+            self._version = version
+            self._data.clear()
+            return True
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._data),
+                maxsize=self.maxsize,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                version=self._version,
+            )
+
+
+# --- Postgres-backed layer -------------------------------------------------
+
+_pending_writes: Set[asyncio.Task[None]] = set()
+
+
+async def warm_from_db(cache: ConversionCache, limit: int) -> int:
+    # Rows computed under other rule versions are useless; drop them first.
+    await NameConversion.filter(version__not=cache.version).delete()
+    rows = (
+        await NameConversion.filter(version=cache.version)
+        .order_by("-updated_at")
+        .limit(limit)
+        .values_list("key", "katakana", "romaji")
+    )
+    # Oldest first so the most recently used rows end up hottest in the LRU.
+    for key, katakana, romaji in reversed(rows):
+        cache.put(key, (katakana, romaji))
+    return len(rows)
+
+
+async def _persist(key: str, version: str, value: Result) -> None:
+    try:
+        await NameConversion.bulk_create(
+            [
+                NameConversion(
+                    key=key, version=version, katakana=value[0], romaji=value[1]
+                )
+            ],
+            on_conflict=["key"],
+            update_fields=["version", "katakana", "romaji", "updated_at"],
+        )
+    except Exception:
+        logger.exception("Failed to persist conversion for %r", key)
+
+
+def persist_in_background(key: str, version: str, value: Result) -> None:
+    task = asyncio.create_task(_persist(key, version, value))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def drain_pending_writes() -> None:
+    if _pending_writes:
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import icu
+from jamdict import Jamdict
+from unidecode import unidecode
+
+from japan_name_bot.config import settings
+
+from .hepburn import kana_to_romaji
+from .name_index import NameIndex, load_name_index
+
+T = TypeVar("T")
+
+
+class _Backends:
+    """Per-thread set of conversion backends, built once and then reused.
+
+    ``timings`` records how long each backend took to construct, in seconds.
+    kakasi is only needed for text the kana table can't romanize (kanji), so
+    it is built on first use rather than here.
+    """
+
+    def __init__(self, with_jamdict: bool = True) -> None:
+        self.timings: Dict[str, float] = {}
+        self.ru_latin = self._timed(
+            "icu", _create_transliterator, "Russian-Latin/BGN"
+        )
+        self.latin_katakana = self._timed(
+            "icu", _create_transliterator, "Latin-Katakana"
+        )
+        self.jamdict = (
+            self._timed("jamdict", _create_jamdict) if with_jamdict else None
+        )
+        self._kakasi: Any | None = None
+        self._kakasi_built = False
+
+    @property
+    def kakasi(self) -> Any | None:
+        if not self._kakasi_built:
+            self._kakasi = self._timed("kakasi", _create_kakasi_converter)
+            self._kakasi_built = True
+        return self._kakasi
+
+    def _timed(self, backend: str, factory: Callable[..., T], *args: Any) -> T:
+        start = time.perf_counter()
+        try:
+            return factory(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[backend] = self.timings.get(backend, 0.0) + elapsed
+
+
+def _create_kakasi_converter() -> Any | None:
+    try:
+        from pykakasi import kakasi  # only needed for kanji readings
+    except ImportError:
+        return None
+    kk = kakasi()
+    kk.setMode("H", "a")
+    kk.setMode("K", "a")
+    kk.setMode("J", "a")
+    return kk.getConverter()
+
+
+def _create_transliterator(name: str) -> Any | None:
+    if icu is None:
+        return None
+    try:
+        return icu.Transliterator.createInstance(name)
+    except Exception:
+        return None
+
+
+def _create_jamdict() -> Any | None:
+    if Jamdict is None:
+        return None
+    try:
+        return Jamdict()
+    except Exception:
+        return None
+
+
+class ConversionEngine:
+    """Owns the ICU transliterators, name dictionary and kakasi fallback.
+
+    None of the backends are documented as thread-safe, so every thread of the
+    conversion pool lazily gets its own instances and keeps them for its
+    lifetime instead of rebuilding them on each call. When a compiled
+    :class:`NameIndex` is given, name readings come from it and jamdict is
+    never opened.
+    """
+
+    def __init__(self, name_index: NameIndex | None = None) -> None:
+        self.name_index = name_index
+        self._local = threading.local()
+
+    def _backends(self) -> _Backends:
+        backends: _Backends | None = getattr(self._local, "backends", None)
+        if backends is None:
+            backends = _Backends(with_jamdict=self.name_index is None)
+            self._local.backends = backends
+        return backends
+
+    def preload(self) -> Dict[str, float]:
+        """Loads the data behind ICU and kakasi without keeping any instances.
+
+        ICU caches compiled transliterator rules and pykakasi keeps its kanji
+        dictionary in process-wide state, so after this every thread (and
+        every process forked afterwards) builds its backends from memory that
+        is already loaded. Returns per-backend load times in seconds.
+        """
+        backends = _Backends(with_jamdict=False)
+        backends.kakasi  # built lazily otherwise
+        return backends.timings
+
+    def warm_up(self) -> Dict[str, float]:
+        """Builds this thread's backends now instead of on first use.
+
+        Returns per-backend construction times in seconds; they are zero when
+        the thread was already warm.
+        """
+        had_backends = getattr(self._local, "backends", None) is not None
+        backends = self._backends()
+        if had_backends:
+            return {backend: 0.0 for backend in backends.timings}
+        return dict(backends.timings)
+
+    def ru_to_latin(self, text: str) -> str:
+        tr = self._backends().ru_latin
+        if tr is None:
+            return unidecode(text)
+        try:
+            return tr.transliterate(text)
+        except Exception:
+            return unidecode(text)
+
+    def latin_to_katakana(self, text: str) -> Optional[str]:
+        tr = self._backends().latin_katakana
+        if tr is None:
+            return None
+        try:
+            return tr.transliterate(text)
+        except Exception:
+            return None
+
+    def katakana_to_romaji(self, kata: str) -> str:
+        romaji = kana_to_romaji(kata)
+        if romaji is not None:
+            return romaji
+        kk = self._backends().kakasi
+        if kk is None:
+            return unidecode(kata)
+        return kk.do(kata)
+
+    def jamdict_reading(self, query: str) -> Optional[str]:
+        if self.name_index is not None:
+            return self.name_index.lookup(query)
+        jd = self._backends().jamdict
+        if jd is None:
+            return None
+        try:
+            res = jd.lookup(query)
+        except Exception:
+            return None
+
+        # Prefer name entries (JMnedict)
+        names = (
+            getattr(res, "names", None) or getattr(res, "name_entries", None) or []
+        )
+        for ne in names:  # type: ignore[assignment]
+            for kana in getattr(ne, "kana_forms", []):
+                reading = getattr(kana, "text", None)
+                if not reading:
+                    continue
+                # Ensure Katakana; if Hiragana, keep as-is (converted by caller)
+                return reading
+        return None
+
+
+_engine: ConversionEngine | None = None
+_engine_lock = threading.Lock()
+
+
+_engine_load_time = 0.0
+
+
+def get_engine() -> ConversionEngine:
+    global _engine, _engine_load_time
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                start = time.perf_counter()
+                _engine = ConversionEngine(
+                    name_index=load_name_index(settings.NAME_INDEX_PATH)
+                )
+                _engine_load_time = time.perf_counter() - start
+    return _engine
+
+
+def engine_load_time() -> float:
+    """Seconds spent loading the engine (mostly the name index) in this process."""
+    return _engine_load_time
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pathlib
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from unidecode import unidecode
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[str, str]
+
+BUNDLED_EXCEPTIONS = pathlib.Path(__file__).with_name("exceptions.tsv")
+
+
+def exception_key(name: str) -> str:
+    """Spelling-insensitive key: Cyrillic and Latin forms of a name coincide.
+
+    NFKC, transliteration to ASCII, casefolding and treating hyphens as spaces
+    are all applied here once, so a lookup is a single dict probe.
+    """
+    ascii_name = unidecode(unicodedata.normalize("NFKC", name))
+    return " ".join(ascii_name.casefold().replace("-", " ").split())
+
+
+def file_signature(path: str | os.PathLike[str]) -> Tuple[int, int, int]:
+    # Inode included so an atomic rename of a new file counts as a change even
+    # when size and mtime happen to match.
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+@dataclass(frozen=True)
+class ExceptionTable:
+    """Immutable index of preferred (katakana, romaji) forms by spelling.
+
+    Replaced as a whole on reload, so readers never see a half-built table.
+    """
+
+    entries: Dict[str, Result] = field(default_factory=dict)
+    version: str = ""
+    path: Optional[str] = None
+    signature: Optional[Tuple[int, int, int]] = None
+
+    def lookup(self, name: str) -> Optional[Result]:
+        return self.entries.get(exception_key(name))
+
+    @property
+    def digest(self) -> str:
+        payload = repr((self.version, sorted(self.entries.items())))
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def parse_exceptions(
+    text: str, source: str = "<string>"
+) -> Tuple[Dict[str, Result], str]:
+    """Parses the TSV format described in the bundled exceptions.tsv.
+
+    Returns the key index and the ``# version:`` header value (empty if
+    absent). Malformed lines raise ``ValueError``, so a bad edit never
+    replaces a working table.
+    """
+    entries: Dict[str, Result] = {}
+    version = ""
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            label, _, value = line[1:].partition(":")
+            if label.strip().lower() == "version":
+                version = value.strip()
+            continue
+        columns = [c.strip() for c in raw.split("\t")]
+        if len(columns) < 3 or not all(columns[:3]):
+            raise ValueError(
+                f"{source}:{lineno}: expected katakana, romaji and at least "
+                "one spelling separated by tabs"
+            )
+        katakana, romaji, *spellings = columns
+        for spelling in filter(None, spellings):
+            key = exception_key(spelling)
+            previous = entries.get(key)
+            if previous is not None and previous != (katakana, romaji):
+                logger.warning(
+                    "%s:%d: %r already maps to %s, overriding",
+                    source,
+                    lineno,
+                    spelling,
+                    previous[0],
+                )
+            entries[key] = (katakana, romaji)
+    return entries, version
+
+
+def load_exception_table(
+    path: str | os.PathLike[str] | None = None,
+) -> ExceptionTable:
+    path = pathlib.Path(path) if path else BUNDLED_EXCEPTIONS
+    signature = file_signature(path)
+    entries, version = parse_exceptions(path.read_text(encoding="utf-8"), str(path))
+    return ExceptionTable(
+        entries=entries, version=version, path=str(path), signature=signature
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from japan_name_bot.config import settings
+
+T = TypeVar("T")
+
+
+def _after_barrier(barrier: threading.Barrier, func: Callable[[], T]) -> T:
+    # Holding every call until all have started forces each onto its own thread.
+    try:
+        barrier.wait(timeout=30)
+    except threading.BrokenBarrierError:
+        pass
+    return func()
+
+
+class ConversionQueueFull(Exception):
+    """The conversion pool stayed saturated longer than the queue timeout."""
+
+
+class ConversionExecutor:
+    """Runs blocking conversions in a thread or process pool.
+
+    At most ``workers + queue_size`` calls are admitted at once; further callers
+    wait up to ``queue_timeout`` seconds for a slot and then get
+    :class:`ConversionQueueFull`, so a burst cannot pile up unbounded work.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = 4,
+        queue_size: int = 64,
+        queue_timeout: float = 5.0,
+    ) -> None:
+        if kind not in {"thread", "process"}:
+            raise ValueError(f"Unknown conversion executor kind: {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._executor: Executor | None = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="name-conversion",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            raise ConversionQueueFull(
+                f"{self.capacity} conversions already queued or running"
+            ) from None
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def run_on_each_worker(self, func: Callable[[], T]) -> list[T]:
+        """Calls ``func`` once per worker, bypassing the admission queue.
+
+        Meant for startup warmup of per-worker state. Thread pools are covered
+        exactly; process pools get one call per worker slot, which normally
+        lands on distinct processes as well.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        call = func
+        if self.kind == "thread":
+            call = functools.partial(
+                _after_barrier, threading.Barrier(self.workers), func
+            )
+        return list(
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, call)
+                    for _ in range(self.workers)
+                )
+            )
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_executor: ConversionExecutor | None = None
+
+
+def get_executor() -> ConversionExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ConversionExecutor(
+            kind=settings.CONVERSION_EXECUTOR,
+            workers=settings.CONVERSION_WORKERS,
+            queue_size=settings.CONVERSION_QUEUE_SIZE,
+            queue_timeout=settings.CONVERSION_QUEUE_TIMEOUT,
+        )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
@@ -0,0 +1,138 @@
+"""Table-driven kana → modified Hepburn romanization.
+
+Every kana and two-kana combination (yōon such as キャ, loanword forms such as
+ティ or ヴァ) maps to its romaji in one precomputed table; hiragana is folded
+to katakana first. Conversion is a single pass that looks up two characters,
+then one, and resolves the three context-dependent marks from the following
+syllable:
+
+* ッ doubles the next consonant (ッチ → ``tchi``) and is dropped when nothing
+  follows it;
+* ン is written ``n'`` before a vowel or ``y`` (ケンイチ → ``ken'ichi``);
+* ー repeats the previous vowel (ニキータ → ``nikiita``).
+
+Anything that is not kana (kanji in particular) is left to the caller.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+# fmt: off
+_GOJUON: Dict[str, str] = {
+    "ア": "a", "イ": "i", "ウ": "u", "エ": "e", "オ": "o",
+    "カ": "ka", "キ": "ki", "ク": "ku", "ケ": "ke", "コ": "ko",
+    "ガ": "ga", "ギ": "gi", "グ": "gu", "ゲ": "ge", "ゴ": "go",
+    "サ": "sa", "シ": "shi", "ス": "su", "セ": "se", "ソ": "so",
+    "ザ": "za", "ジ": "ji", "ズ": "zu", "ゼ": "ze", "ゾ": "zo",
+    "タ": "ta", "チ": "chi", "ツ": "tsu", "テ": "te", "ト": "to",
+    "ダ": "da", "ヂ": "ji", "ヅ": "zu", "デ": "de", "ド": "do",
+    "ナ": "na", "ニ": "ni", "ヌ": "nu", "ネ": "ne", "ノ": "no",
+    "ハ": "ha", "ヒ": "hi", "フ": "fu", "ヘ": "he", "ホ": "ho",
+    "バ": "ba", "ビ": "bi", "ブ": "bu", "ベ": "be", "ボ": "bo",
+    "パ": "pa", "ピ": "pi", "プ": "pu", "ペ": "pe", "ポ": "po",
+    "マ": "ma", "ミ": "mi", "ム": "mu", "メ": "me", "モ": "mo",
+    "ヤ": "ya", "ユ": "yu", "ヨ": "yo",
+    "ラ": "ra", "リ": "ri", "ル": "ru", "レ": "re", "ロ": "ro",
+    "ワ": "wa", "ヰ": "i", "ヱ": "e", "ヲ": "o",
+    "ヴ": "vu", "ヷ": "va", "ヸ": "vi", "ヹ": "ve", "ヺ": "vo",
+    # small kana on their own
+    "ァ": "a", "ィ": "i", "ゥ": "u", "ェ": "e", "ォ": "o",
+    "ャ": "ya", "ュ": "yu", "ョ": "yo", "ヮ": "wa", "ヵ": "ka", "ヶ": "ke",
+}
+
+# i-column kana and the consonant their yōon forms start with
+_YOON_STEMS: Dict[str, str] = {
+    "キ": "ky", "ギ": "gy", "シ": "sh", "ジ": "j", "チ": "ch", "ヂ": "j",
+    "ニ": "ny", "ヒ": "hy", "ビ": "by", "ピ": "py", "ミ": "my", "リ": "ry",
+}
+
+# Loanword combinations (the extended katakana of modified Hepburn)
+_EXTENDED: Dict[str, str] = {
+    "イェ": "ye",
+    "ウィ": "wi", "ウェ": "we", "ウォ": "wo",
+    "ヴァ": "va", "ヴィ": "vi", "ヴェ": "ve", "ヴォ": "vo", "ヴュ": "vyu",
+    "クァ": "kwa", "クィ": "kwi", "クェ": "kwe", "クォ": "kwo", "グァ": "gwa",
+    "シェ": "she", "ジェ": "je", "チェ": "che",
+    "スィ": "si", "ズィ": "zi",
+    "ツァ": "tsa", "ツィ": "tsi", "ツェ": "tse", "ツォ": "tso",
+    "ティ": "ti", "トゥ": "tu", "テュ": "tyu",
+    "ディ": "di", "ドゥ": "du", "デュ": "dyu",
+    "ファ": "fa", "フィ": "fi", "フェ": "fe", "フォ": "fo", "フュ": "fyu",
+}
+# fmt: on
+
+_SOKUON = "ッ"
+_HATSUON = "ン"
+_CHOON = "ー"
+_VOWELS = frozenset("aeiou")
+_CONSONANTS = frozenset("bcdfghjkmprstvwyz")
+_SEPARATORS = {"・": " ", "゠": "-"}
+
+# ぁ..ゖ sit exactly 0x60 below their katakana.
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+
+def _compile_table() -> Dict[str, str]:
+    table = dict(_GOJUON)
+    for kana, stem in _YOON_STEMS.items():
+        for small, vowel in (("ャ", "a"), ("ュ", "u"), ("ョ", "o")):
+            table[kana + small] = stem + vowel
+    table.update(_EXTENDED)
+    return table
+
+
+_TABLE = _compile_table()
+
+
+def kana_to_romaji(text: str) -> Optional[str]:
+    """Romanizes hiragana/katakana ``text``; ``None`` if it holds other letters.
+
+    ASCII, spaces and punctuation pass through unchanged, so a caller only
+    needs a fallback (kakasi) when kanji or other scripts are present.
+    """
+    s = text.translate(_HIRAGANA_TO_KATAKANA)
+    # First pass: syllables, with the three marks kept as placeholders.
+    units: List[str] = []
+    i = 0
+    n = len(s)
+    while i < n:
+        pair = s[i : i + 2]
+        romaji = _TABLE.get(pair) if len(pair) == 2 else None
+        if romaji is not None:
+            units.append(romaji)
+            i += 2
+            continue
+        ch = s[i]
+        romaji = _TABLE.get(ch)
+        if romaji is not None:
+            units.append(romaji)
+        elif ch in (_SOKUON, _HATSUON, _CHOON):
+            units.append(ch)
+        elif ch in _SEPARATORS:
+            units.append(_SEPARATORS[ch])
+        elif ch.isascii() or not ch.isalpha():
+            units.append(ch)
+        else:
+            return None
+        i += 1
+
+    # Second pass: resolve the marks against their neighbours.
+    out: List[str] = []
+    for index, unit in enumerate(units):
+        following = units[index + 1] if index + 1 < len(units) else ""
+        if unit == _SOKUON:
+            if following.startswith("ch"):
+                out.append("t")
+            elif following[:1] in _CONSONANTS:
+                out.append(following[0])
+        elif unit == _HATSUON:
+            starts_syllable = following[:1] in _VOWELS or following[:1] == "y"
+            out.append("n'" if starts_syllable else "n")
+        elif unit == _CHOON:
+            previous = out[-1][-1:] if out else ""
+            if previous in _VOWELS:
+                out.append(previous)
+        else:
+            out.append(unit)
+    return "".join(out)
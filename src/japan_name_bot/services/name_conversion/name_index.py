@@ -0,0 +1,157 @@
+"""Compact on-disk index of JMnedict romanized names → katakana readings.
+
+The file is a sorted array of fixed-size records followed by a string blob::
+
+    magic (8 bytes) | count (uint32) | count × record | blob
+
+Each record is ``(key_off, key_len, val_off, val_len)`` pointing into the
+blob. Keys are UTF-8 and compared bytewise, so a lookup is a binary search
+over the memory-mapped file without SQLite or any per-entry objects. Like
+jamdict's name search (``text == ?``), keys are the exact gloss text: no case
+folding.
+
+Build it with ``japan-name-bot build-index``.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"JNBNIX01"
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<IHIH")
+
+
+class NameIndex:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a name index")
+        self._blob = _HEADER.size + self._count * _RECORD.size
+        self.path = path
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, i: int) -> Tuple[int, int, int, int]:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+
+    def lookup(self, query: str) -> Optional[str]:
+        key = query.encode("utf-8")
+        mm, blob = self._mm, self._blob
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, val_off, val_len = self._record(mid)
+            start = blob + key_off
+            probe = mm[start : start + key_len]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                start = blob + val_off
+                return mm[start : start + val_len].decode("utf-8")
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def load_name_index(path: str | None) -> NameIndex | None:
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning("Name index %s not found, falling back to jamdict", path)
+        return None
+    try:
+        index = NameIndex(path)
+    except Exception:
+        logger.exception("Failed to load name index %s", path)
+        return None
+    logger.info("Loaded name index %s (%d names)", path, len(index))
+    return index
+
+
+# --- Build ----------------------------------------------------------------
+
+
+def _jamdict_db_path() -> str:
+    from jamdict import Jamdict
+
+    return Jamdict().db_file
+
+
+# A Latin query matches a name entry through one of its glosses or, for a
+# lowercase word such as "surname", one of its name types.
+_MATCHES_SQL = """
+SELECT g.text, t.idseq FROM NETransGloss g JOIN NETranslation t ON t.ID = g.tid
+UNION ALL
+SELECT n.text, t.idseq FROM NETransType n JOIN NETranslation t ON t.ID = n.tid
+"""
+
+
+def extract_names(db_path: str) -> Dict[str, str]:
+    """Map each JMnedict gloss to the first reading of its first entry.
+
+    Mirrors what ``Jamdict.lookup`` followed by "first kana form of the first
+    name entry" returns for a Latin query: an exact, case-sensitive match,
+    entries in idseq order.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        first_reading: Dict[int, str] = {}
+        for idseq, text in conn.execute(
+            "SELECT idseq, text FROM NEKana ORDER BY ID"
+        ):
+            if text and idseq not in first_reading:
+                first_reading[idseq] = text
+
+        best: Dict[str, Tuple[int, str]] = {}
+        for key, idseq in conn.execute(_MATCHES_SQL):
+            reading = first_reading.get(idseq)
+            if not key or reading is None:
+                continue
+            current = best.get(key)
+            if current is None or idseq < current[0]:
+                best[key] = (idseq, reading)
+    finally:
+        conn.close()
+    return {key: reading for key, (_, reading) in best.items()}
+
+
+def write_index(entries: Iterable[Tuple[str, str]], out_path: str) -> int:
+    items = sorted(
+        (key.encode("utf-8"), value.encode("utf-8")) for key, value in entries
+    )
+    records = bytearray()
+    blob = bytearray()
+    for key, value in items:
+        key_off = len(blob)
+        blob += key
+        val_off = len(blob)
+        blob += value
+        records += _RECORD.pack(key_off, len(key), val_off, len(value))
+
+    tmp_path = f"{out_path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(items)))
+        fh.write(records)
+        fh.write(blob)
+    os.replace(tmp_path, out_path)
+    return len(items)
+
+
+def build_index(out_path: str, db_path: str | None = None) -> int:
+    return write_index(extract_names(db_path or _jamdict_db_path()).items(), out_path)
@@ -0,0 +1,192 @@
+"""Heuristic romaji → katakana mapper used when no dictionary knows a name.
+
+The rule tables below are compiled once into a character trie. Conversion is a
+single left-to-right pass that applies, in order of precedence: sokuon for
+doubled consonants, ン for an ``n`` not followed by a vowel or ``y``, the
+longest table match (yōon/specials over plain CV syllables), and long vowels
+(ー) for a repeated vowel kana.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+_YOON: Dict[str, str] = {
+    # palatalized combinations
+    "kya": "キャ",
+    "kyu": "キュ",
+    "kyo": "キョ",
+    "gya": "ギャ",
+    "gyu": "ギュ",
+    "gyo": "ギョ",
+    "sha": "シャ",
+    "shu": "シュ",
+    "sho": "ショ",
+    "ja": "ジャ",
+    "ju": "ジュ",
+    "jo": "ジョ",
+    "jya": "ジャ",
+    "jyu": "ジュ",
+    "jyo": "ジョ",
+    "cha": "チャ",
+    "chu": "チュ",
+    "cho": "チョ",
+    "nya": "ニャ",
+    "nyu": "ニュ",
+    "nyo": "ニョ",
+    "hya": "ヒャ",
+    "hyu": "ヒュ",
+    "hyo": "ヒョ",
+    "bya": "ビャ",
+    "byu": "ビュ",
+    "byo": "ビョ",
+    "pya": "ピャ",
+    "pyu": "ピュ",
+    "pyo": "ピョ",
+    "mya": "ミャ",
+    "myu": "ミュ",
+    "myo": "ミョ",
+    "rya": "リャ",
+    "ryu": "リュ",
+    "ryo": "リョ",
+}
+
+_SPECIAL: Dict[str, str] = {
+    "shi": "シ",
+    "chi": "チ",
+    "tsu": "ツ",
+    "fu": "フ",
+    "ji": "ジ",
+    "ti": "チ",
+    "tu": "ツ",
+    "di": "ディ",
+    "du": "ドゥ",
+    "wi": "ウィ",
+    "we": "ウェ",
+    "wu": "ウ",
+    "va": "ヴァ",
+    "vi": "ヴィ",
+    "vu": "ヴ",
+    "ve": "ヴェ",
+    "vo": "ヴォ",
+    "fa": "ファ",
+    "fi": "フィ",
+    "fe": "フェ",
+    "fo": "フォ",
+}
+
+_BASE: Dict[str, Dict[str, str]] = {
+    "": {"a": "ア", "i": "イ", "u": "ウ", "e": "エ", "o": "オ"},
+    "k": {"a": "カ", "i": "キ", "u": "ク", "e": "ケ", "o": "コ"},
+    "g": {"a": "ガ", "i": "ギ", "u": "グ", "e": "ゲ", "o": "ゴ"},
+    "s": {"a": "サ", "i": "シ", "u": "ス", "e": "セ", "o": "ソ"},
+    "z": {"a": "ザ", "i": "ジ", "u": "ズ", "e": "ゼ", "o": "ゾ"},
+    "t": {"a": "タ", "i": "チ", "u": "ツ", "e": "テ", "o": "ト"},
+    "d": {"a": "ダ", "i": "ヂ", "u": "ヅ", "e": "デ", "o": "ド"},
+    "n": {"a": "ナ", "i": "ニ", "u": "ヌ", "e": "ネ", "o": "ノ"},
+    "h": {"a": "ハ", "i": "ヒ", "u": "フ", "e": "ヘ", "o": "ホ"},
+    "b": {"a": "バ", "i": "ビ", "u": "ブ", "e": "ベ", "o": "ボ"},
+    "p": {"a": "パ", "i": "ピ", "u": "プ", "e": "ペ", "o": "ポ"},
+    "m": {"a": "マ", "i": "ミ", "u": "ム", "e": "メ", "o": "モ"},
+    "y": {"a": "ヤ", "i": "イ", "u": "ユ", "e": "イェ", "o": "ヨ"},
+    "r": {"a": "ラ", "i": "リ", "u": "ル", "e": "レ", "o": "ロ"},
+    "w": {"a": "ワ", "i": "ウィ", "u": "ウ", "e": "ウェ", "o": "ヲ"},
+    "j": {"a": "ジャ", "i": "ジ", "u": "ジュ", "e": "ジェ", "o": "ジョ"},
+    "q": {"a": "クァ", "i": "クィ", "u": "ク", "e": "クェ", "o": "クォ"},
+    "x": {"a": "ザ", "i": "クスィ", "u": "クス", "e": "グゼ", "o": "クソ"},
+    "c": {"a": "カ", "i": "シ", "u": "ク", "e": "セ", "o": "コ"},
+    "v": {"a": "ヴァ", "i": "ヴィ", "u": "ヴ", "e": "ヴェ", "o": "ヴォ"},
+}
+
+
+_N_KEEPS_SYLLABLE = frozenset("aiueoy")
+_NO_SOKUON = frozenset("aiueon")
+_VOWEL_KANA = frozenset("アイウエオ")
+
+# A unit is (kana, kana with its first vowel lengthened to ー or None).
+_Unit = Tuple[str, Optional[str]]
+# A trie node is (unit ending here or None, children by next character).
+_Node = Tuple[Optional[_Unit], Dict[str, "_Node"]]
+
+
+def _unit(kana: str) -> _Unit:
+    long_form = "ー" + kana[1:] if kana[0] in _VOWEL_KANA else None
+    return kana, long_form
+
+
+def _compile_trie() -> _Node:
+    table: Dict[str, str] = {}
+    for consonant, row in _BASE.items():
+        if consonant:
+            # A bare consonant is approximated with its u-column kana.
+            table[consonant] = row["u"]
+        for vowel, kana in row.items():
+            table[consonant + vowel] = kana
+    # Specials and three-letter yōon take precedence over plain syllables.
+    table.update(_SPECIAL)
+    table.update({key: kana for key, kana in _YOON.items() if len(key) == 3})
+
+    root: _Node = (None, {})
+    for key, kana in table.items():
+        node = root
+        for ch in key:
+            children = node[1]
+            if ch not in children:
+                children[ch] = (None, {})
+            node = children[ch]
+        parent = root
+        for ch in key[:-1]:
+            parent = parent[1][ch]
+        parent[1][key[-1]] = (_unit(kana), node[1])
+    return root
+
+
+_TRIE = _compile_trie()
+_SOKUON = _unit("ッ")
+_N = _unit("ン")
+
+
+def romaji_to_katakana(token: str) -> str:
+    s = token.lower()
+    n = len(s)
+    out = []
+    last = ""
+    i = 0
+    while i < n:
+        ch = s[i]
+        nxt = s[i + 1] if i + 1 < n else ""
+
+        if ch == nxt and ch not in _NO_SOKUON and ch.isalpha():
+            unit: Optional[_Unit] = _SOKUON
+            i += 1
+        elif ch == "n" and nxt not in _N_KEEPS_SYLLABLE:
+            unit = _N
+            i += 1
+        else:
+            # Longest match in the trie starting at i.
+            unit = None
+            length = 0
+            children = _TRIE[1]
+            j = i
+            while j < n:
+                node = children.get(s[j])
+                if node is None:
+                    break
+                j += 1
+                if node[0] is not None:
+                    unit = node[0]
+                    length = j - i
+                children = node[1]
+            if unit is None:
+                # Not romaji (punctuation, unmapped letters): skip it.
+                i += 1
+                continue
+            i += length
+
+        kana, long_form = unit
+        if long_form is not None and kana[0] == last:
+            kana = long_form
+        out.append(kana)
+        last = kana[-1]
+
+    return "".join(out)
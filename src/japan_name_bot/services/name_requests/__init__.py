@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, List, Tuple
+
+from asyncpg.exceptions import DataError, IntegrityConstraintViolationError
+from tortoise import connections
+
+from japan_name_bot.config import settings
+from japan_name_bot.models import NameRequest
+from japan_name_bot.services.name_conversion.cache import normalize_key
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "user_id",
+    "input_name",
+    "katakana",
+    "romaji",
+    "provider",
+    "delivered",
+    "delivered_at",
+    "created_at",
+    "name_key",
+)
+
+_INSERT_SQL = 'INSERT INTO "{table}" ({columns}) VALUES ({values})'.format(
+    table=NameRequest._meta.db_table,
+    columns=", ".join(f'"{column}"' for column in _COLUMNS),
+    values=", ".join(f"${index}" for index in range(1, len(_COLUMNS) + 1)),
+)
+
+# Errors that reject a row for its contents (a value the column can't take, a
+# missing user); retrying such a row can never succeed.
+_MARK_DELIVERED_SQL = """
+UPDATE "name_requests"
+SET "delivered" = TRUE, "delivered_at" = CURRENT_TIMESTAMP
+WHERE "user_id" = $1 AND "created_at" = $2 AND NOT "delivered"
+"""
+
+_ROW_ERRORS = (DataError, IntegrityConstraintViolationError)
+
+_Row = Tuple[Any, ...]
+
+
+def _fit(field: str, value: str) -> str:
+    # Longer values would make Postgres reject the whole COPY.
+    return value[: NameRequest._meta.fields_map[field].max_length]  # type: ignore
+
+
+def _name_key(input_name: str) -> str:
+    # What the daily rollup groups by: the form conversion works on.
+    return _fit("name_key", normalize_key(input_name))
+
+
+class NameRequestWriter:
+    """Write-behind buffer for NameRequest rows.
+
+    Rows are collected in memory and written with a single COPY once
+    ``batch_size`` rows are pending or ``flush_interval`` seconds after the
+    first pending row, whichever comes first. Readers that need undelivered
+    rows must call :meth:`flush` first; a user's rows count as pending until
+    the batch holding them is committed.
+
+    When the COPY fails, the batch is inserted row by row and rows the
+    database rejects are dropped, so one bad row can't hold up the rest. If
+    the database itself fails, the rows are kept for the next attempt, up to
+    ``max_pending`` of them.
+    """
+
+    def __init__(
+        self, batch_size: int, flush_interval: float, max_pending: int = 10000
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self._buffer: List[_Row] = []
+        # The batch being written, so its rows still count as pending.
+        self._inflight: List[_Row] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def has_pending(self, user_id: int) -> bool:
+        return any(
+            row[0] == user_id and not row[5]
+            for row in self._buffer + self._inflight
+        )
+
+    async def add(
+        self,
+        user_id: int,
+        input_name: str,
+        katakana: str,
+        romaji: str,
+        provider: str,
+        created_at: datetime,
+    ) -> None:
+        self._buffer.append(
+            (
+                user_id,
+                _fit("input_name", input_name),
+                _fit("katakana", katakana),
+                _fit("romaji", romaji),
+                _fit("provider", provider),
+                False,
+                None,
+                created_at,
+                _name_key(input_name),
+            )
+        )
+        self._trim()
+        if len(self._buffer) >= self.batch_size:
+            # The caller is serving a user; a failed write is retried later.
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flush of name requests failed")
+        if self._buffer and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def mark_delivered(self, user_id: int, created_at: datetime) -> bool:
+        """Marks a row that is not written yet; False once it is in the database."""
+        while True:
+            for index, row in enumerate(self._buffer):
+                if row[0] == user_id and row[7] == created_at:
+                    delivered = (True, datetime.now(timezone.utc))
+                    self._buffer[index] = row[:5] + delivered + row[7:]
+                    return True
+            if not any(
+                row[0] == user_id and row[7] == created_at for row in self._inflight
+            ):
+                return False
+            # Being written: once that ends the row is either in the database
+            # or back in the buffer.
+            async with self._lock:
+                pass
+
+    def _trim(self) -> None:
+        excess = len(self._buffer) - self.max_pending
+        if excess > 0:
+            del self._buffer[:excess]
+            logger.warning("Dropped %d oldest unsaved name requests", excess)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Background flush of name requests failed")
+        if self._buffer and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            self._inflight = batch
+            try:
+                await self._write(batch)
+            finally:
+                self._inflight = []
+
+    async def _write(self, batch: List[_Row]) -> None:
+        try:
+            await _copy_rows(batch)
+            return
+        except Exception:
+            logger.warning(
+                "COPY of %d name requests failed; inserting one by one",
+                len(batch),
+                exc_info=True,
+            )
+        for index, row in enumerate(batch):
+            try:
+                await _insert_row(row)
+            except _ROW_ERRORS:
+                logger.exception("Dropped name request of user %s", row[0])
+            except Exception:
+                # Keep the rest for the next attempt, ahead of newer ones.
+                self._buffer[:0] = batch[index:]
+                self._trim()
+                raise
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+async def _copy_rows(rows: List[_Row]) -> None:
+    client: Any = connections.get("default")
+    async with client.acquire_connection() as conn:
+        await conn.copy_records_to_table(
+            NameRequest._meta.db_table, records=rows, columns=_COLUMNS
+        )
+
+
+async def _insert_row(row: _Row) -> None:
+    client: Any = connections.get("default")
+    async with client.acquire_connection() as conn:
+        await conn.execute(_INSERT_SQL, *row)
+
+
+_writer: NameRequestWriter | None = None
+
+
+def _get_writer() -> NameRequestWriter | None:
+    global _writer
+    if _writer is None and settings.NAME_REQUEST_BATCHING:
+        _writer = NameRequestWriter(
+            batch_size=settings.NAME_REQUEST_BATCH_SIZE,
+            flush_interval=settings.NAME_REQUEST_FLUSH_INTERVAL,
+            max_pending=settings.NAME_REQUEST_MAX_PENDING,
+        )
+    return _writer
+
+
+async def save_name_request(
+    user_id: int,
+    input_name: str,
+    katakana: str,
+    romaji: str,
+    provider: str,
+) -> datetime:
+    """Store an undelivered result; returns the key for :func:`mark_delivered`."""
+    created_at = datetime.now(timezone.utc)
+    writer = _get_writer()
+    if writer is None:
+        await NameRequest.create(
+            user_id=user_id,
+            input_name=_fit("input_name", input_name),
+            katakana=_fit("katakana", katakana),
+            romaji=_fit("romaji", romaji),
+            provider=_fit("provider", provider),
+            created_at=created_at,
+            name_key=_name_key(input_name),
+        )
+    else:
+        await writer.add(user_id, input_name, katakana, romaji, provider, created_at)
+    return created_at
+
+
+async def mark_delivered(user_id: int, created_at: datetime) -> None:
+    """Mark the result saved at ``created_at`` as sent to ``user_id``."""
+    if _writer is not None and await _writer.mark_delivered(user_id, created_at):
+        return
+    await connections.get("default").execute_query(
+        _MARK_DELIVERED_SQL, [user_id, created_at]
+    )
+
+
+async def flush_pending_requests(user_id: int | None = None) -> None:
+    """Write buffered rows now; with ``user_id``, only if that user has any.
+
+    A user whose rows are in a flush already running waits for it to commit.
+    """
+    if _writer is None:
+        return
+    if user_id is not None and not _writer.has_pending(user_id):
+        return
+    await _writer.flush()
+
+
+async def close_request_writer() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
@@ -0,0 +1,276 @@
+"""Housekeeping for the month-partitioned name_requests table.
+
+Every run creates the partitions for the coming months, detaches or drops the
+ones past the retention period and re-aggregates recent days into
+``name_requests_daily`` (requests and delivered results per day, normalized
+name and provider), which is what analytics queries read instead of raw rows.
+
+Every worker and replica runs the job; a transaction-level advisory lock lets
+only one of them do each step at a time and the others skip it.
+
+Rows for a month without a partition land in the default partition, and
+Postgres refuses to create a partition for a range the default one already
+holds rows of. Such a month is built as a standalone table, the rows are
+moved into it and it is then attached, all in the locked transaction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from tortoise import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from japan_name_bot.config import settings
+
+__all__ = [
+    "create_partitions",
+    "expire_partitions",
+    "keep_name_requests_maintained",
+    "maintain_name_requests",
+    "partition_name",
+    "refresh_daily_rollup",
+]
+
+logger = logging.getLogger(__name__)
+
+_TABLE = "name_requests"
+_DEFAULT_PARTITION = f"{_TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{_TABLE}_(\d{{4}})(\d{{2}})$")
+
+# Arbitrary keys for pg_try_advisory_xact_lock, one per step.
+_PARTITIONS_LOCK = 0x4A4E4201
+_ROLLUP_LOCK = 0x4A4E4202
+
+# DDL on a partition briefly locks the whole table; rather than queue behind
+# a long query (and hold up every insert queued behind it), give up and let
+# the next run retry.
+_LOCK_TIMEOUT = "5s"
+
+_PARTITIONED_SQL = """
+SELECT c."relkind" = 'p' AS "partitioned"
+FROM "pg_class" c
+WHERE c."oid" = to_regclass($1)
+"""
+
+_PARTITIONS_SQL = """
+SELECT c."relname" AS "name"
+FROM "pg_inherits" i
+JOIN "pg_class" c ON c."oid" = i."inhrelid"
+WHERE i."inhparent" = to_regclass($1)
+"""
+
+_IN_DEFAULT_SQL = f"""
+SELECT EXISTS (
+    SELECT 1 FROM "{_DEFAULT_PARTITION}"
+    WHERE "created_at" >= $1 AND "created_at" < $2
+) AS "found"
+"""
+
+# Names are grouped by the name_key the bot stores with each row, which is
+# normalize_key(input_name). Rows from before that column existed have none;
+# for them SQL approximates it (lower() instead of casefold), and
+# popular_names merges whatever keys that leaves apart.
+_ROLLUP_SQL = """
+INSERT INTO "name_requests_daily"
+    ("day", "name_key", "provider", "requests", "delivered")
+SELECT
+    ("created_at" AT TIME ZONE 'UTC')::date,
+    COALESCE(
+        "name_key",
+        lower(btrim(regexp_replace(normalize("input_name", NFKC), '\\s+', ' ', 'g')))
+    ),
+    "provider",
+    COUNT(*),
+    COUNT(*) FILTER (WHERE "delivered")
+FROM "name_requests"
+WHERE "created_at" >= $1
+GROUP BY 1, 2, 3
+ON CONFLICT ("day", "name_key", "provider") DO UPDATE
+SET "requests" = EXCLUDED."requests", "delivered" = EXCLUDED."delivered"
+"""
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _utc_bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def partition_name(month: date) -> str:
+    return f"{_TABLE}_{month:%Y%m}"
+
+
+async def _try_lock(conn: BaseDBAsyncClient, key: int) -> bool:
+    rows = await conn.execute_query_dict(
+        "SELECT pg_try_advisory_xact_lock($1) AS locked", [key]
+    )
+    return bool(rows[0]["locked"])
+
+
+async def _is_partitioned(conn: BaseDBAsyncClient) -> bool:
+    rows = await conn.execute_query_dict(_PARTITIONED_SQL, [_TABLE])
+    return bool(rows and rows[0]["partitioned"])
+
+
+def _utc_start(month: date) -> datetime:
+    return datetime.combine(month, datetime.min.time(), timezone.utc)
+
+
+async def _in_default(conn: BaseDBAsyncClient, month: date) -> bool:
+    rows = await conn.execute_query_dict(
+        _IN_DEFAULT_SQL,
+        [_utc_start(month), _utc_start(_add_months(month, 1))],
+    )
+    return bool(rows[0]["found"])
+
+
+async def _create_from_default(
+    conn: BaseDBAsyncClient, name: str, month: date
+) -> None:
+    lower, upper = _utc_bound(month), _utc_bound(_add_months(month, 1))
+    await conn.execute_script(
+        f"""
+CREATE TABLE "{name}" (LIKE "{_TABLE}" INCLUDING DEFAULTS);
+WITH moved AS (
+    DELETE FROM "{_DEFAULT_PARTITION}"
+    WHERE "created_at" >= '{lower}' AND "created_at" < '{upper}'
+    RETURNING *
+)
+INSERT INTO "{name}" SELECT * FROM moved;
+ALTER TABLE "{_TABLE}" ATTACH PARTITION "{name}"
+    FOR VALUES FROM ('{lower}') TO ('{upper}');
+"""
+    )
+
+
+async def create_partitions(
+    conn: BaseDBAsyncClient, today: date, ahead: int
+) -> List[str]:
+    rows = await conn.execute_query_dict(_PARTITIONS_SQL, [_TABLE])
+    existing = {row["name"] for row in rows}
+    created: List[str] = []
+    first = _month_start(today)
+    for offset in range(max(0, ahead) + 1):
+        month = _add_months(first, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        in_default = False
+        if _DEFAULT_PARTITION in existing:
+            # Creating the partition locks the default one anyway; locking it
+            # first keeps rows for the month from arriving after the check.
+            await conn.execute_script(
+                f'LOCK TABLE "{_DEFAULT_PARTITION}" IN ACCESS EXCLUSIVE MODE'
+            )
+            in_default = await _in_default(conn, month)
+        if in_default:
+            await _create_from_default(conn, name, month)
+            logger.warning(
+                "Moved the rows of %s out of %s", name, _DEFAULT_PARTITION
+            )
+        else:
+            await conn.execute_script(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{_TABLE}" '
+                f"FOR VALUES FROM ('{_utc_bound(month)}') "
+                f"TO ('{_utc_bound(_add_months(month, 1))}')"
+            )
+        created.append(name)
+    return created
+
+
+async def expire_partitions(
+    conn: BaseDBAsyncClient, today: date, retention_months: int
+) -> List[str]:
+    """Detaches or drops partitions that end before the retention period.
+
+    Detached partitions are renamed to ``name_requests_archive_YYYYMM`` and
+    left for an operator to dump and drop.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(today), -retention_months)
+    expired: List[str] = []
+    for row in await conn.execute_query_dict(_PARTITIONS_SQL, [_TABLE]):
+        match = _PARTITION_RE.match(row["name"])
+        if match is None:
+            continue
+        month = date(int(match[1]), int(match[2]), 1)
+        if _add_months(month, 1) > cutoff:
+            continue
+        name = row["name"]
+        if settings.NAME_REQUESTS_EXPIRED == "drop":
+            await conn.execute_script(f'DROP TABLE "{name}"')
+        else:
+            await conn.execute_script(
+                f'ALTER TABLE "{_TABLE}" DETACH PARTITION "{name}"; '
+                f'ALTER TABLE "{name}" RENAME TO "{_TABLE}_archive_{month:%Y%m}"'
+            )
+        expired.append(name)
+    return expired
+
+
+async def refresh_daily_rollup(
+    conn: BaseDBAsyncClient, today: date, days: int
+) -> None:
+    """Recomputes the rollup for ``days`` days back, up to and including today.
+
+    Older days are recomputed too because a result is marked delivered when
+    the user subscribes, which can be days after the request.
+    """
+    since = _utc_start(today - timedelta(days=max(0, days)))
+    await conn.execute_query(_ROLLUP_SQL, [since])
+
+
+async def maintain_name_requests(today: date | None = None) -> None:
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+
+    async with in_transaction() as conn:
+        if not await _is_partitioned(conn):
+            # Schemas made by generate_schemas rather than the migrations.
+            logger.warning("%s is not partitioned; skipping partitions", _TABLE)
+        elif await _try_lock(conn, _PARTITIONS_LOCK):
+            await conn.execute_script(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'")
+            created = await create_partitions(
+                conn, today, settings.NAME_REQUESTS_PARTITIONS_AHEAD
+            )
+            expired = await expire_partitions(
+                conn, today, settings.NAME_REQUESTS_RETENTION_MONTHS
+            )
+            if created or expired:
+                logger.info(
+                    "Partitions created: %s; expired (%s): %s",
+                    ", ".join(created) or "none",
+                    settings.NAME_REQUESTS_EXPIRED,
+                    ", ".join(expired) or "none",
+                )
+
+    async with in_transaction() as conn:
+        if await _try_lock(conn, _ROLLUP_LOCK):
+            await refresh_daily_rollup(
+                conn, today, settings.NAME_REQUESTS_ROLLUP_DAYS
+            )
+
+
+async def keep_name_requests_maintained(interval: float) -> None:
+    """Runs the maintenance now and then every ``interval`` seconds."""
+    while True:
+        try:
+            await maintain_name_requests()
+        except Exception:
+            logger.exception("name_requests maintenance failed")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
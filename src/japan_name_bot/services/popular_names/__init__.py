@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from tortoise import connections
+
+from japan_name_bot.config import settings
+from japan_name_bot.services.name_conversion import (
+    ConversionQueueFull,
+    convert_name_async,
+)
+from japan_name_bot.services.name_conversion.cache import normalize_key
+
+__all__ = [
+    "PopularName",
+    "PopularNames",
+    "keep_popular_names_fresh",
+    "popular_names",
+    "refresh_popular_names",
+]
+
+logger = logging.getLogger(__name__)
+
+# Most requested names of the last POPULAR_NAMES_WINDOW_DAYS, from the daily
+# rollup. Its keys are normalize_key output, except for rows written before
+# name_requests stored one; the few of those that normalize_key still folds
+# together are merged in Python, after the query.
+_POPULAR_SQL = """
+SELECT "name_key", SUM("requests") AS "requests"
+FROM "name_requests_daily"
+WHERE "day" >= (CURRENT_TIMESTAMP AT TIME ZONE 'UTC')::date - $1::int
+GROUP BY "name_key"
+ORDER BY "requests" DESC
+LIMIT $2
+"""
+
+
+@dataclass(frozen=True)
+class PopularName:
+    name: str
+    katakana: str
+    romaji: str
+
+
+@dataclass(frozen=True)
+class PopularNames:
+    """Precomputed answers for popular names with a prefix index.
+
+    Every prefix of every normalized name maps to the best-ranked names
+    starting with it, so a suggestion lookup is one dict probe.
+    """
+
+    top: Tuple[PopularName, ...] = ()
+    by_key: Dict[str, PopularName] = field(default_factory=dict)
+    by_prefix: Dict[str, Tuple[PopularName, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, ranked: List[PopularName], per_prefix: int) -> PopularNames:
+        by_key: Dict[str, PopularName] = {}
+        by_prefix: Dict[str, List[PopularName]] = {}
+        for entry in ranked:
+            key = normalize_key(entry.name)
+            if key in by_key:
+                continue
+            by_key[key] = entry
+            for end in range(1, len(key) + 1):
+                bucket = by_prefix.setdefault(key[:end], [])
+                if len(bucket) < per_prefix:
+                    bucket.append(entry)
+        return cls(
+            top=tuple(by_key.values())[:per_prefix],
+            by_key=by_key,
+            by_prefix={prefix: tuple(names) for prefix, names in by_prefix.items()},
+        )
+
+    def get(self, name: str) -> PopularName | None:
+        return self.by_key.get(normalize_key(name))
+
+    def suggest(self, prefix: str) -> Tuple[PopularName, ...]:
+        key = normalize_key(prefix)
+        if not key:
+            return self.top
+        return self.by_prefix.get(key, ())
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+
+_popular = PopularNames()
+
+
+def popular_names() -> PopularNames:
+    return _popular
+
+
+async def refresh_popular_names() -> int:
+    """Reloads the popular-name table from the recent daily rollup.
+
+    Conversions go through the regular cache and pool; the new table replaces
+    the old one in a single assignment once it is complete.
+    """
+    global _popular
+    rows = await connections.get("default").execute_query_dict(
+        _POPULAR_SQL,
+        [settings.POPULAR_NAMES_WINDOW_DAYS, settings.POPULAR_NAMES_LIMIT * 2],
+    )
+    counts: Dict[str, int] = {}
+    spelling: Dict[str, str] = {}
+    for row in rows:
+        key = normalize_key(row["name_key"])
+        if not key:
+            continue
+        counts[key] = counts.get(key, 0) + int(row["requests"])
+        # Keys are lower case; names are shown capitalized.
+        spelling.setdefault(key, key.title())
+    ranked_keys = sorted(counts, key=counts.__getitem__, reverse=True)
+    ranked: List[PopularName] = []
+    for key in ranked_keys[: settings.POPULAR_NAMES_LIMIT]:
+        try:
+            katakana, romaji = await convert_name_async(spelling[key])
+        except ConversionQueueFull:
+            await asyncio.sleep(settings.CONVERSION_QUEUE_TIMEOUT)
+            continue
+        if katakana:
+            ranked.append(PopularName(spelling[key], katakana, romaji))
+    _popular = PopularNames.build(ranked, settings.INLINE_MAX_RESULTS)
+    return len(_popular)
+
+
+async def keep_popular_names_fresh(interval: float) -> None:
+    """Refreshes the table now and then every ``interval`` seconds."""
+    while True:
+        try:
+            loaded = await refresh_popular_names()
+            logger.info("Loaded %d popular names", loaded)
+        except Exception:
+            logger.exception("Failed to refresh popular names")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
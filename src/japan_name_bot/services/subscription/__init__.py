@@ -1,9 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Tuple
+
 from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest
+from tortoise import timezone
+from tortoise.expressions import Q
 
 from japan_name_bot.config import settings
+from japan_name_bot.models import User
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBED_STATUSES = frozenset({"member", "administrator", "creator"})
 
 
 def _resolve_channel() -> str | int | None:
@@ -16,14 +30,124 @@ def _resolve_channel() -> str | int | None:
     return None
 
 
-async def is_user_subscribed(bot: Bot, channel: str | int | None, user_id: int) -> bool:
-    target = channel if channel is not None else _resolve_channel()
-    if target is None:
-        return False
+def _ttl(subscribed: bool) -> float:
+    if subscribed:
+        return settings.SUBSCRIPTION_CACHE_TTL
+    return settings.SUBSCRIPTION_NEGATIVE_CACHE_TTL
+
+
+class _SubscriptionCache:
+    """In-process layer in front of ``User.is_subscribed_cached``."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[int, Tuple[bool, float]] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[bool]:
+        entry = self._data.get(user_id)
+        if entry is None:
+            return None
+        subscribed, checked_at = entry
+        if time.monotonic() - checked_at > _ttl(subscribed):
+            del self._data[user_id]
+            return None
+        self._data.move_to_end(user_id)
+        return subscribed
 
+    def set(self, user_id: int, subscribed: bool) -> None:
+        self._data[user_id] = (subscribed, time.monotonic())
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_cache = _SubscriptionCache(maxsize=settings.SUBSCRIPTION_CACHE_SIZE)
+
+
+async def record_subscription(user_id: int, subscribed: bool) -> None:
+    """Store a known subscription state, e.g. from a chat_member update."""
+    _cache.set(user_id, subscribed)
+    await User.filter(id=user_id).update(
+        is_subscribed_cached=subscribed, last_checked_at=timezone.now()
+    )
+
+
+async def _cached_in_db(user_id: int) -> Optional[bool]:
+    now = timezone.now()
+    fresh = Q(
+        is_subscribed_cached=True,
+        last_checked_at__gte=now - timedelta(seconds=_ttl(True)),
+    ) | Q(
+        is_subscribed_cached=False,
+        last_checked_at__gte=now - timedelta(seconds=_ttl(False)),
+    )
+    return (
+        await User.filter(fresh, id=user_id)
+        .values_list("is_subscribed_cached", flat=True)
+        .first()
+    )
+
+
+async def check_membership(bot: Bot, target: str | int, user_id: int) -> bool:
     try:
         member = await bot.get_chat_member(chat_id=target, user_id=user_id)
     except TelegramBadRequest:
         return False
     status = getattr(member, "status", None)
-    return status in {"member", "administrator", "creator"}
+    return status in SUBSCRIBED_STATUSES
+
+
+async def is_user_subscribed(bot: Bot, channel: str | int | None, user_id: int) -> bool:
+    if channel is not None:
+        # Ad-hoc channels are not what the cache columns describe.
+        return await check_membership(bot, channel, user_id)
+
+    target = _resolve_channel()
+    if target is None:
+        return False
+
+    cached = _cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    cached = await _cached_in_db(user_id)
+    if cached is not None:
+        _cache.set(user_id, cached)
+        return cached
+
+    subscribed = await check_membership(bot, target, user_id)
+    await record_subscription(user_id, subscribed)
+    return subscribed
+
+
+_pending_records: set[asyncio.Task[None]] = set()
+
+
+async def _record_quietly(user_id: int, subscribed: bool) -> None:
+    try:
+        await record_subscription(user_id, subscribed)
+    except Exception:
+        logger.exception("Failed to store subscription of %s", user_id)
+
+
+async def is_user_subscribed_nowait_db(bot: Bot, user_id: int) -> bool:
+    """Like :func:`is_user_subscribed`, but never waits on the database.
+
+    A miss in the in-process cache is answered by Telegram and written to the
+    users table in the background. Meant for latency-bound paths such as
+    inline queries.
+    """
+    target = _resolve_channel()
+    if target is None:
+        return False
+
+    cached = _cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    subscribed = await check_membership(bot, target, user_id)
+    _cache.set(user_id, subscribed)
+    task = asyncio.create_task(_record_quietly(user_id, subscribed))
+    _pending_records.add(task)
+    task.add_done_callback(_pending_records.discard)
+    return subscribed
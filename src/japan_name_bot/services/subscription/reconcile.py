@@ -0,0 +1,125 @@
+"""Catches up on channel joins the bot never saw.
+
+Joins arrive as chat_member updates, which are lost while the bot is down, so
+a user can be subscribed with results still waiting. A sweep claims users
+with undelivered requests in batches, asks Telegram about each of them at a
+limited pace, stores the answer and delivers the waiting results to those
+who are subscribed.
+
+A batch is claimed by setting the users' ``reconcile_leased_until`` with
+``FOR UPDATE SKIP LOCKED``, so replicas running the sweep at the same time
+take different users. ``last_checked_at`` is only written together with the
+checked state, so a claim never makes an old cached state look fresh. A user
+left unchecked by a sweep cut short (a restart, a crash) can be claimed again
+once the lease runs out, after RECONCILE_RECHECK_AFTER seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import List
+
+from aiogram import Bot
+from tortoise import connections
+
+from japan_name_bot.config import settings
+from japan_name_bot.ops.metrics import SUBSCRIPTIONS_RECONCILED
+from japan_name_bot.services.delivery import deliver_pending
+from japan_name_bot.services.name_requests import flush_pending_requests
+
+from . import _resolve_channel, check_membership, record_subscription
+
+__all__ = ["keep_subscriptions_reconciled", "reconcile_subscriptions"]
+
+logger = logging.getLogger(__name__)
+
+_CLAIM_SQL = """
+UPDATE "users"
+SET "reconcile_leased_until" = CURRENT_TIMESTAMP + make_interval(secs => $2)
+WHERE "id" IN (
+    SELECT "id" FROM "users"
+    WHERE "id" IN (
+        SELECT "user_id" FROM "name_requests"
+        WHERE NOT "delivered"
+        AND "created_at" >= CURRENT_TIMESTAMP - make_interval(days => $1)
+    )
+    AND (
+        "last_checked_at" IS NULL
+        OR "last_checked_at" < CURRENT_TIMESTAMP - make_interval(secs => $2)
+    )
+    AND (
+        "reconcile_leased_until" IS NULL
+        OR "reconcile_leased_until" < CURRENT_TIMESTAMP
+    )
+    ORDER BY "last_checked_at" NULLS FIRST, "id"
+    LIMIT $3
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING "id"
+"""
+
+
+async def _claim_batch() -> List[int]:
+    rows = await connections.get("default").execute_query_dict(
+        _CLAIM_SQL,
+        [
+            settings.RECONCILE_PENDING_DAYS,
+            settings.RECONCILE_RECHECK_AFTER,
+            settings.RECONCILE_BATCH_SIZE,
+        ],
+    )
+    return [row["id"] for row in rows]
+
+
+async def _reconcile_user(bot: Bot, target: str | int, user_id: int) -> None:
+    subscribed = await check_membership(bot, target, user_id)
+    await record_subscription(user_id, subscribed)
+    if not subscribed:
+        SUBSCRIPTIONS_RECONCILED.inc("not_subscribed")
+        return
+    await flush_pending_requests(user_id)
+    sent = await deliver_pending(bot, user_id)
+    SUBSCRIPTIONS_RECONCILED.inc("delivered" if sent else "subscribed")
+    if sent:
+        logger.info("Delivered %d missed results to %s", sent, user_id)
+
+
+async def reconcile_subscriptions(bot: Bot) -> int:
+    """Runs one sweep over every claimable user; returns how many were checked."""
+    target = _resolve_channel()
+    if target is None:
+        return 0
+    step = 1 / settings.RECONCILE_RATE if settings.RECONCILE_RATE > 0 else 0.0
+    next_at = time.monotonic()
+    checked = 0
+    while True:
+        user_ids = await _claim_batch()
+        if not user_ids:
+            return checked
+        for user_id in user_ids:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_at = max(next_at, time.monotonic()) + step
+            try:
+                await _reconcile_user(bot, target, user_id)
+            except Exception:
+                SUBSCRIPTIONS_RECONCILED.inc("error")
+                logger.exception("Failed to reconcile subscription of %s", user_id)
+            checked += 1
+
+
+async def keep_subscriptions_reconciled(bot: Bot, interval: float) -> None:
+    """Sweeps now and then every ``interval`` seconds."""
+    while True:
+        try:
+            checked = await reconcile_subscriptions(bot)
+            if checked:
+                logger.info("Reconciled subscriptions of %d users", checked)
+        except Exception:
+            logger.exception("Subscription reconciliation failed")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from tortoise import connections
+
+from japan_name_bot.config import settings
+
+# Only touches the row when it is new or the username actually changed, so a
+# repeat user costs one statement and no write.
+_UPSERT_SQL = """
+INSERT INTO "users"
+    ("id", "username", "is_subscribed_cached", "created_at", "updated_at")
+VALUES ($1, $2, FALSE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+ON CONFLICT ("id") DO UPDATE
+SET "username" = EXCLUDED."username", "updated_at" = CURRENT_TIMESTAMP
+WHERE "users"."username" IS DISTINCT FROM EXCLUDED."username"
+"""
+
+_MISSING = object()
+
+
+class _KnownUsers:
+    """Bounded LRU of user IDs (with username) known to exist in the DB."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[int, str | None] = OrderedDict()
+
+    def matches(self, user_id: int, username: str | None) -> bool:
+        known = self._data.get(user_id, _MISSING)
+        if known is _MISSING or known != username:
+            return False
+        self._data.move_to_end(user_id)
+        return True
+
+    def add(self, user_id: int, username: str | None) -> None:
+        self._data[user_id] = username
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_known_users = _KnownUsers(maxsize=settings.KNOWN_USERS_CACHE_SIZE)
+
+
+async def upsert_user(user_id: int, username: str | None) -> None:
+    await connections.get("default").execute_query(_UPSERT_SQL, [user_id, username])
+
+
+async def ensure_user(user_id: int, username: str | None) -> None:
+    """Make sure the user row exists and has the current username."""
+    if _known_users.matches(user_id, username):
+        return
+    await upsert_user(user_id, username)
+    _known_users.add(user_id, username)
@@ -1,16 +1,232 @@
+"""Root logger setup: text or JSON lines on stdout, optionally off-thread.
+
+With ``LOG_ASYNC`` the root logger only gets a :class:`DroppingQueueHandler`;
+a :class:`logging.handlers.QueueListener` thread does the formatting and the
+writing, so a stalled stdout (a backed-up log collector) never blocks the
+event loop. The queue is bounded: when it is full a record is dropped and
+counted instead of waiting.
+
+Fields bound with :func:`log_context` and :func:`bind_log_context` (update
+id, user id, handler, conversion stage, ...) are attached to every record
+logged while handling the same update.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import time
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from japan_name_bot.config import settings
+from japan_name_bot.ops.metrics import LOG_RECORDS_DROPPED
+
+__all__ = [
+    "CONTEXT_FIELDS",
+    "DroppingQueueHandler",
+    "JsonFormatter",
+    "SamplingFilter",
+    "bind_log_context",
+    "log_context",
+    "setup_logging",
+    "shutdown_logging",
+]
+
+# Fields known to the JSON output, in the order they are written.
+CONTEXT_FIELDS = ("update_id", "user_id", "handler", "stage", "latency_ms")
+
+_log_context: contextvars.ContextVar[Optional[Dict[str, Any]]] = (
+    contextvars.ContextVar("log_context", default=None)
+)
+
+
+@contextlib.contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Opens a scope whose fields are attached to every record logged in it.
+
+    Tasks started inside the scope share it, so a field bound in one of them
+    (say, the conversion stage) also shows up in later records of the others.
+    """
+    token = _log_context.set({**(_log_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Adds ``fields`` to the current scope (or starts one for this context)."""
+    scope = _log_context.get()
+    if scope is None:
+        _log_context.set(dict(fields))
+    else:
+        scope.update(fields)
+
+
+class _ContextFilter(logging.Filter):
+    # Runs in the thread that logs, where the context variables are visible.
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in (_log_context.get() or {}).items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of sub-WARNING records per logger name prefix.
+
+    ``rates`` maps a logger name (and so its children) to the share of records
+    to keep; the longest matching prefix wins and unlisted loggers keep all.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS_DROPPED.inc("sampled")
+        return False
+
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and context."""
 
-def setup_logging(level: int = logging.INFO) -> None:
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc("queue_full")
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, keep the record's fields and the traceback
+        # separate so the listener's formatter can lay them out itself.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _start_listener(handler: DroppingQueueHandler, target: logging.Handler) -> None:
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        handler.queue, target, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _restart_in_child(handler: DroppingQueueHandler, target: logging.Handler) -> None:
+    # The listener thread does not survive fork() and the queue's lock may
+    # have been held by it at that moment, so a child gets fresh ones.
+    handler.queue = queue.Queue(handler.queue.maxsize)
+    handler.dropped = 0
+    _start_listener(handler, target)
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the listener thread, if any."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler) and handler.dropped:
+            print(f"{handler.dropped} log records were dropped", file=sys.stderr)
+
+
+def setup_logging(level: int | str | None = None) -> None:
     root = logging.getLogger()
     if root.handlers:
         return
-    handler = logging.StreamHandler(stream=sys.stdout)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(stream=sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+    stream_handler.setFormatter(formatter)
+
+    handler: logging.Handler = stream_handler
+    if settings.LOG_ASYNC:
+        queue_handler = DroppingQueueHandler(settings.LOG_QUEUE_SIZE)
+        _start_listener(queue_handler, stream_handler)
+        os.register_at_fork(
+            after_in_child=lambda: _restart_in_child(queue_handler, stream_handler)
+        )
+        atexit.register(shutdown_logging)
+        handler = queue_handler
+
+    # Filters sit on the handler the logging thread calls, so sampled-out
+    # records never reach the queue and context is read where it was bound.
+    if settings.LOG_SAMPLING:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    handler.addFilter(_ContextFilter())
     root.addHandler(handler)
-    root.setLevel(level)
+    root.setLevel(level if level is not None else settings.LOG_LEVEL.upper())
@@ -0,0 +1,5 @@
+import os
+
+# Settings are read at import time; the tests never reach Telegram or Postgres.
+os.environ.setdefault("BOT_TOKEN", "42:test")
+os.environ.setdefault("DATABASE_URL", "postgres://test@localhost/test")
@@ -0,0 +1,21 @@
+from japan_name_bot.services.name_conversion import _cache, _token_cache
+from japan_name_bot.services.name_conversion.batch import convert_names
+
+
+def _fresh() -> None:
+    _cache.clear()
+    _token_cache.clear()
+
+
+def test_duplicates_by_case_keep_the_first_row() -> None:
+    _fresh()
+    rows = list(convert_names(["иван", " Иван ", "ИВАН", "Анна", ""]))
+    assert [row[0] for row in rows] == ["иван", "Анна"]
+
+
+def test_result_does_not_depend_on_which_spelling_comes_first() -> None:
+    _fresh()
+    lower_first = list(convert_names(["иван", "Иван"]))
+    _fresh()
+    upper_first = list(convert_names(["Иван", "иван"]))
+    assert lower_first[0][1:] == upper_first[0][1:]
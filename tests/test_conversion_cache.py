@@ -0,0 +1,59 @@
+import asyncio
+
+from japan_name_bot.services.name_conversion import (
+    _cache,
+    _convert_name_traced,
+    _token_cache,
+    convert_name_async,
+    peek_conversion,
+)
+from japan_name_bot.services.name_conversion.cache import (
+    ConversionCache,
+    normalize_key,
+)
+
+
+def test_normalize_key_folds_case_width_and_spaces() -> None:
+    assert normalize_key("  Анна   МАРИЯ ") == "анна мария"
+    assert normalize_key("Ｓｔｒａßｅ") == "strasse"
+
+
+def test_lru_evicts_the_least_recently_used_entry() -> None:
+    cache = ConversionCache(maxsize=2, version="1")
+    cache.put("a", ("ア", "A"))
+    cache.put("b", ("ビ", "Bi"))
+    assert cache.get("a") == ("ア", "A")
+    cache.put("c", ("シ", "Shi"))
+
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 1, 1, 1)
+
+
+def test_results_of_an_old_version_are_dropped() -> None:
+    cache = ConversionCache(maxsize=10, version="1")
+    cache.put("a", ("ア", "A"))
+
+    assert cache.set_version("2")
+    assert cache.get("a") is None
+    # A conversion that started under version 1 must not land in version 2.
+    cache.put("a", ("ア", "A"), version="1")
+    assert cache.get("a") is None
+    assert not cache.set_version("2")
+
+
+def test_zero_size_cache_stores_nothing() -> None:
+    cache = ConversionCache(maxsize=0, version="1")
+    cache.put("a", ("ア", "A"))
+    assert cache.get("a") is None
+
+
+def test_peek_serves_the_same_result_for_every_casing() -> None:
+    _cache.clear()
+    _token_cache.clear()
+    assert peek_conversion("иван петров") is None
+
+    result = asyncio.run(convert_name_async("Иван Петров"))
+
+    assert result == _convert_name_traced("иван петров")[0]
+    assert peek_conversion("ИВАН  ПЕТРОВ") == result
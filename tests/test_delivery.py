@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from japan_name_bot.services import delivery
+
+
+class FakeOutbox:
+    def __init__(self, count: int) -> None:
+        self.pending: List[Dict[str, Any]] = [
+            {"id": i, "input_name": f"name{i}", "katakana": "ア", "romaji": "A"}
+            for i in range(1, count + 1)
+        ]
+        self.claimed: List[Dict[str, Any]] = []
+
+    async def claim(self, user_id: int) -> List[Dict[str, Any]]:
+        self.claimed, self.pending = self.pending, []
+        return list(self.claimed)
+
+    async def release(self, ids: List[int]) -> None:
+        await asyncio.sleep(0)
+        released = [row for row in self.claimed if row["id"] in ids]
+        self.pending.extend(released)
+
+
+class FakeBot:
+    def __init__(self, fail_after: int, error: BaseException | None = None) -> None:
+        self.fail_after = fail_after
+        self.error = error
+        self.texts: List[str] = []
+        self.blocked = asyncio.Event()
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        if len(self.texts) >= self.fail_after:
+            if self.error is not None:
+                raise self.error
+            self.blocked.set()
+            await asyncio.Event().wait()
+        self.texts.append(text)
+
+
+@pytest.fixture
+def outbox(monkeypatch: pytest.MonkeyPatch) -> FakeOutbox:
+    fake = FakeOutbox(count=45)
+    monkeypatch.setattr(delivery, "claim_pending", fake.claim)
+    monkeypatch.setattr(delivery, "release", fake.release)
+    return fake
+
+
+def test_everything_is_sent_in_batches(outbox: FakeOutbox) -> None:
+    bot = FakeBot(fail_after=10)
+    sent = asyncio.run(delivery.deliver_pending(bot, 1))  # type: ignore[arg-type]
+
+    assert sent == 45
+    assert len(bot.texts) == 3  # 30 + 15 results and the follow-up
+    assert outbox.pending == []
+
+
+def test_unsent_rows_are_released_on_error(outbox: FakeOutbox) -> None:
+    bot = FakeBot(fail_after=1, error=ConnectionError("network"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(delivery.deliver_pending(bot, 1))  # type: ignore[arg-type]
+
+    assert [row["id"] for row in outbox.pending] == list(range(31, 46))
+
+
+def test_unsent_rows_are_released_on_cancellation(outbox: FakeOutbox) -> None:
+    async def scenario() -> None:
+        bot = FakeBot(fail_after=1)
+        task = asyncio.create_task(delivery.deliver_pending(bot, 1))  # type: ignore
+        await bot.blocked.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert [row["id"] for row in outbox.pending] == list(range(31, 46))
+
+
+def test_nothing_pending_sends_nothing(outbox: FakeOutbox) -> None:
+    outbox.pending = []
+    bot = FakeBot(fail_after=10)
+    assert asyncio.run(delivery.deliver_pending(bot, 1)) == 0  # type: ignore
+    assert bot.texts == []
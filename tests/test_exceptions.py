@@ -0,0 +1,76 @@
+import os
+import pathlib
+from typing import Iterator
+
+import pytest
+
+from japan_name_bot.services import name_conversion
+from japan_name_bot.services.name_conversion import (
+    _cache,
+    _token_cache,
+    convert_name,
+    reload_exceptions,
+)
+from japan_name_bot.services.name_conversion.exceptions import (
+    exception_key,
+    load_exception_table,
+    parse_exceptions,
+)
+
+TABLE = "# version: 1\nニキータ\tNikita\tnikita\tНикита\n"
+
+
+def test_cyrillic_and_latin_spellings_share_a_key() -> None:
+    assert exception_key("Анна-Никита") == exception_key(" anna  NIKITA ")
+    entries, version = parse_exceptions(TABLE)
+    assert version == "1"
+    assert entries == {"nikita": ("ニキータ", "Nikita")}
+
+
+def test_malformed_line_is_rejected_with_its_location() -> None:
+    with pytest.raises(ValueError, match="names.tsv:2:"):
+        parse_exceptions("# version: 1\nニキータ\tNikita\n", "names.tsv")
+
+
+@pytest.fixture
+def exceptions_file(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[pathlib.Path]:
+    path = tmp_path / "exceptions.tsv"
+    path.write_text(TABLE, encoding="utf-8")
+    version = _cache.version
+    monkeypatch.setattr(name_conversion, "_exceptions", load_exception_table(path))
+    _cache.clear()
+    _token_cache.clear()
+    yield path
+    _cache.set_version(version)
+    _token_cache.clear()
+
+
+def _replace(path: pathlib.Path, text: str) -> None:
+    # Written aside and renamed in, the way deployments update the file.
+    staged = path.with_suffix(".new")
+    staged.write_text(text, encoding="utf-8")
+    os.replace(staged, path)
+
+
+def test_changed_file_is_reloaded_and_drops_cached_results(
+    exceptions_file: pathlib.Path,
+) -> None:
+    assert not reload_exceptions()
+    assert convert_name("Nikita") == ("ニキータ", "Nikita")
+    version = _cache.version
+
+    _replace(exceptions_file, "# version: 2\nニキタ\tNikita\tnikita\n")
+    assert reload_exceptions()
+    assert _cache.version != version
+    assert convert_name("Никита") == ("ニキタ", "Nikita")
+    assert not reload_exceptions()
+
+
+def test_bad_edit_keeps_the_working_table(exceptions_file: pathlib.Path) -> None:
+    version = _cache.version
+    _replace(exceptions_file, "# version: 2\nニキタ\n")
+    assert not reload_exceptions()
+    assert _cache.version == version
+    assert convert_name("Nikita") == ("ニキータ", "Nikita")
@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from japan_name_bot.config import settings
+from japan_name_bot.handlers import inline
+
+
+class FakeQuery:
+    def __init__(self, user_id: int, text: str) -> None:
+        self.from_user = SimpleNamespace(id=user_id)
+        self.query = text
+        self.answers: List[Tuple[List[Any], Dict[str, Any]]] = []
+
+    async def answer(self, results: List[Any], **kwargs: Any) -> None:
+        self.answers.append((results, kwargs))
+
+
+@pytest.fixture
+def converted(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    calls: List[str] = []
+
+    async def convert(name: str) -> Tuple[str, str]:
+        calls.append(name)
+        return "アンナ", "Anna"
+
+    monkeypatch.setattr(settings, "CHANNEL_ID", None)
+    monkeypatch.setattr(settings, "CHANNEL_USERNAME", None)
+    monkeypatch.setattr(settings, "INLINE_DEBOUNCE", 0.2)
+    monkeypatch.setattr(settings, "INLINE_MIN_QUERY_LENGTH", 2)
+    monkeypatch.setattr(inline, "convert_name_async", convert)
+    monkeypatch.setattr(inline, "peek_conversion", lambda name: None)
+    return calls
+
+
+async def _type(user_id: int, *keystrokes: str) -> List[FakeQuery]:
+    queries = [FakeQuery(user_id, text) for text in keystrokes]
+    tasks = []
+    for query in queries:
+        tasks.append(asyncio.create_task(inline.on_inline_query(query, None)))
+        await asyncio.sleep(0.01)  # faster than INLINE_DEBOUNCE
+    await asyncio.gather(*tasks)
+    return queries
+
+
+def test_only_the_last_keystroke_is_converted(converted: List[str]) -> None:
+    queries = asyncio.run(_type(1, "Ан", "Анн", "Анна"))
+    assert converted == ["Анна"]
+    assert [len(query.answers) for query in queries] == [0, 0, 1]
+    results, kwargs = queries[-1].answers[0]
+    assert results[0].title == "Анна — アンナ"
+    assert kwargs["cache_time"] == settings.INLINE_CACHE_TIME
+    assert inline._latest == {}
+
+
+def test_users_do_not_supersede_each_other(converted: List[str]) -> None:
+    async def scenario() -> List[List[FakeQuery]]:
+        return list(await asyncio.gather(_type(1, "Анна"), _type(2, "Иван")))
+
+    first, second = asyncio.run(scenario())
+    assert sorted(converted) == ["Анна", "Иван"]
+    assert len(first[0].answers) == len(second[0].answers) == 1
+
+
+def test_cached_name_is_answered_without_waiting(
+    converted: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "INLINE_DEBOUNCE", 10.0)
+    monkeypatch.setattr(inline, "peek_conversion", lambda name: ("アンナ", "Anna"))
+
+    async def scenario() -> List[FakeQuery]:
+        return await asyncio.wait_for(_type(1, "Анна"), 1.0)
+
+    (query,) = asyncio.run(scenario())
+    assert converted == []
+    assert query.answers[0][0][0].title == "Анна — アンナ"
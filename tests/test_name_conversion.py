@@ -0,0 +1,68 @@
+import pytest
+
+from japan_name_bot.services import name_conversion
+from japan_name_bot.services.name_conversion import (
+    _cache,
+    _convert_name_traced,
+    _token_cache,
+    convert_name,
+    get_engine,
+)
+
+
+def _convert(name: str) -> tuple[str, str]:
+    return _convert_name_traced(name)[0]
+
+
+@pytest.fixture
+def fresh_caches() -> None:
+    _cache.clear()
+    _token_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "spellings",
+    [("Иван", "иван"), ("Anna Maria", "ANNA MARIA")],
+)
+def test_case_does_not_change_the_result(
+    fresh_caches: None, spellings: tuple[str, str]
+) -> None:
+    first, second = spellings
+    uncached = {_convert(first), _convert(second)}
+    assert len(uncached) == 1
+
+    forward = [convert_name(first), convert_name(second)]
+    _cache.clear()
+    _token_cache.clear()
+    backward = [convert_name(second), convert_name(first)]
+    assert set(forward + backward) == uncached
+
+
+@pytest.mark.parametrize("spaced", ["Anna Maria", "Анна Мария", "Jean Luc"])
+def test_hyphenated_name_is_joined_like_separate_words(spaced: str) -> None:
+    katakana, romaji = _convert(spaced)
+    assert "・" in katakana
+    assert _convert(spaced.replace(" ", "-")) == (katakana, romaji.replace(" ", "-"))
+
+
+def test_hyphenated_name_on_the_heuristic_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = get_engine()
+    monkeypatch.setattr(engine, "jamdict_reading", lambda query: None)
+    monkeypatch.setattr(engine, "latin_to_katakana", lambda query: "")
+    monkeypatch.setattr(name_conversion, "_exceptions_lookup", lambda name: None)
+
+    (katakana, romaji), stage, _ = _convert_name_traced("Anna-Maria")
+
+    assert stage == "heuristic"
+    assert katakana.count("・") == 1 and " " not in katakana
+    first, second = romaji.split("-")
+    assert first[0].isupper() and second[0].isupper()
+
+
+def test_word_memo_is_shared_across_case(fresh_caches: None) -> None:
+    convert_name("Анна-Мария Петрова")
+    assert _token_cache.get("анна-мария") == _convert("Анна-Мария")
+
+    _cache.clear()
+    assert convert_name("анна-мария") == _convert("анна-мария")
+    assert convert_name("АННА-МАРИЯ") == _convert("Анна-Мария")
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from asyncpg.exceptions import StringDataRightTruncationError
+
+from japan_name_bot.services import name_requests
+from japan_name_bot.services.name_requests import NameRequestWriter
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.rows: List[tuple] = []
+        self.copy_error: Exception | None = None
+        self.insert_error: Exception | None = None
+        self.rejected: set[int] = set()
+
+    async def copy_rows(self, rows: List[tuple]) -> None:
+        if self.copy_error is not None:
+            raise self.copy_error
+        if any(row[0] in self.rejected for row in rows):
+            raise StringDataRightTruncationError("value too long")
+        self.rows.extend(rows)
+
+    async def insert_row(self, row: tuple) -> None:
+        if self.insert_error is not None:
+            raise self.insert_error
+        if row[0] in self.rejected:
+            raise StringDataRightTruncationError("value too long")
+        self.rows.append(row)
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> FakeDatabase:
+    fake = FakeDatabase()
+    monkeypatch.setattr(name_requests, "_copy_rows", fake.copy_rows)
+    monkeypatch.setattr(name_requests, "_insert_row", fake.insert_row)
+    return fake
+
+
+async def _add(writer: NameRequestWriter, user_id: int, name: str = "Анна") -> None:
+    await writer.add(
+        user_id, name, "アンナ", "Anna", "offline", datetime.now(timezone.utc)
+    )
+
+
+def test_long_input_is_truncated_before_buffering(db: FakeDatabase) -> None:
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=1, flush_interval=60)
+        await _add(writer, 1, "а" * 300)
+        assert writer.pending == 0
+
+    asyncio.run(scenario())
+    assert [len(row[1]) for row in db.rows] == [255]
+
+
+def test_rejected_row_is_dropped_and_the_rest_written(db: FakeDatabase) -> None:
+    db.rejected = {2}
+
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=100, flush_interval=60)
+        for user_id in (1, 2, 3):
+            await _add(writer, user_id)
+        await writer.close()
+        assert writer.pending == 0
+
+    asyncio.run(scenario())
+    assert [row[0] for row in db.rows] == [1, 3]
+
+
+def test_failed_inline_flush_keeps_rows_without_raising(db: FakeDatabase) -> None:
+    db.copy_error = db.insert_error = ConnectionError("database is down")
+
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=2, flush_interval=60, max_pending=3)
+        for user_id in range(1, 6):
+            await _add(writer, user_id)
+        assert [row[0] for row in writer._buffer] == [3, 4, 5]
+
+        db.copy_error = db.insert_error = None
+        await writer.close()
+        assert writer.pending == 0
+
+    asyncio.run(scenario())
+    assert [row[0] for row in db.rows] == [3, 4, 5]
+
+
+def test_flush_for_user_waits_for_the_batch_in_flight(
+    db: FakeDatabase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    committed = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_copy(rows: List[tuple]) -> None:
+        await release.wait()
+        await db.copy_rows(rows)
+        committed.set()
+
+    monkeypatch.setattr(name_requests, "_copy_rows", slow_copy)
+
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=100, flush_interval=60)
+        monkeypatch.setattr(name_requests, "_writer", writer)
+        await _add(writer, 1)
+        background = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0)
+        assert writer.pending == 0 and writer.has_pending(1)
+
+        waiter = asyncio.create_task(name_requests.flush_pending_requests(1))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        release.set()
+        await waiter
+        # A claim made now sees the row.
+        assert committed.is_set()
+        assert not writer.has_pending(1)
+        await background
+
+    asyncio.run(scenario())
+    assert [row[0] for row in db.rows] == [1]
+
+
+def test_mark_delivered_updates_a_buffered_row(db: FakeDatabase) -> None:
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=100, flush_interval=60)
+        created_at = datetime.now(timezone.utc)
+        await writer.add(1, "Анна", "アンナ", "Anna", "offline", created_at)
+        await _add(writer, 2)
+        assert await writer.mark_delivered(1, created_at)
+        assert not writer.has_pending(1) and writer.has_pending(2)
+        await writer.close()
+        # Written rows are left to the UPDATE.
+        assert not await writer.mark_delivered(1, created_at)
+
+    asyncio.run(scenario())
+    assert [(row[0], row[5]) for row in db.rows] == [(1, True), (2, False)]
+    assert db.rows[0][6] is not None
+
+
+def test_rows_carry_the_key_conversion_uses(db: FakeDatabase) -> None:
+    async def scenario() -> None:
+        writer = NameRequestWriter(batch_size=1, flush_interval=60)
+        await _add(writer, 1, "  АННА   Мария ")
+
+    asyncio.run(scenario())
+    assert db.rows[0][name_requests._COLUMNS.index("name_key")] == "анна мария"
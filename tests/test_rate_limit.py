@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from japan_name_bot.middlewares.rate_limit import (
+    HIGH_PRIORITY,
+    LOW_PRIORITY,
+    RateLimiter,
+    RateLimitMiddleware,
+    TokenBucket,
+)
+
+
+def test_token_bucket_refills_at_its_rate() -> None:
+    bucket = TokenBucket(rate=2.0, capacity=2.0)
+    now = bucket.updated
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.delay(now) == pytest.approx(0.5)
+    assert bucket.delay(now + 0.25) == pytest.approx(0.25)
+    assert bucket.delay(now + 0.5) == 0.0
+    assert not bucket.idle(now + 0.5)
+    assert bucket.idle(now + 1.0)
+
+
+def test_token_bucket_block_outlasts_tokens() -> None:
+    bucket = TokenBucket(rate=1.0, capacity=3.0)
+    now = bucket.updated
+    bucket.block(now, 5.0)
+    bucket.block(now, 1.0)  # never shortens an earlier block
+    assert bucket.delay(now) == pytest.approx(5.0)
+    assert bucket.delay(now + 5.0) == 0.0
+
+
+def test_high_priority_waiters_go_first() -> None:
+    order: List[str] = []
+
+    async def call(limiter: RateLimiter, label: str, priority: int) -> None:
+        await limiter.acquire(None, priority)
+        order.append(label)
+
+    async def scenario() -> None:
+        limiter = RateLimiter(global_rate=100.0)
+        await asyncio.gather(
+            call(limiter, "reaction 1", LOW_PRIORITY),
+            call(limiter, "result 1", HIGH_PRIORITY),
+            call(limiter, "reaction 2", LOW_PRIORITY),
+            call(limiter, "result 2", HIGH_PRIORITY),
+        )
+        assert limiter.stats().granted == 4
+        assert limiter.stats().queue_depth == 0
+
+    asyncio.run(scenario())
+    assert order == ["result 1", "result 2", "reaction 1", "reaction 2"]
+
+
+def test_busy_chat_does_not_hold_up_others() -> None:
+    order: List[str] = []
+    waited: Dict[str, float] = {}
+
+    async def call(limiter: RateLimiter, chat_id: int, label: str) -> None:
+        waited[label] = await limiter.acquire(chat_id)
+        order.append(label)
+
+    async def scenario() -> None:
+        limiter = RateLimiter(global_rate=100.0, chat_rate=20.0, chat_burst=1.0)
+        await asyncio.gather(
+            call(limiter, 1, "a1"), call(limiter, 1, "a2"), call(limiter, 2, "b1")
+        )
+
+    asyncio.run(scenario())
+    assert order == ["a1", "b1", "a2"]
+    # The chat's second call waits for its bucket to refill (1/20 s).
+    assert waited["a2"] >= 0.04
+    assert waited["b1"] < waited["a2"]
+
+
+def test_penalized_chat_waits_and_others_do_not() -> None:
+    async def scenario() -> None:
+        limiter = RateLimiter(global_rate=100.0)
+        limiter.penalize(1, 0.05)
+        waited = await asyncio.gather(limiter.acquire(1), limiter.acquire(2))
+        assert waited[0] >= 0.04
+        assert waited[1] < 0.03
+        assert limiter.stats().retry_after == 1
+
+    asyncio.run(scenario())
+
+
+def test_middleware_retries_after_flood_control() -> None:
+    method = SendMessage(chat_id=1, text="hi")
+    attempts: List[Any] = []
+
+    async def make_request(bot: Any, call: Any) -> Any:
+        attempts.append(call)
+        if len(attempts) < 3:
+            raise TelegramRetryAfter(call, "Too Many Requests", retry_after=0)
+        return "sent"
+
+    async def scenario() -> None:
+        limiter = RateLimiter(global_rate=100.0)
+        middleware = RateLimitMiddleware(limiter, max_retries=2, jitter=0.0)
+        assert await middleware(make_request, None, method) == "sent"  # type: ignore
+        assert limiter.stats().retry_after == 2
+
+        attempts.clear()
+        middleware.max_retries = 1
+        with pytest.raises(TelegramRetryAfter):
+            await middleware(make_request, None, method)  # type: ignore
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import pathlib
+
+import pytest
+
+from japan_name_bot.services.name_conversion.romaji import romaji_to_katakana
+
+# Outputs of the character-scanning mapper the trie replaced.
+GOLDEN = (
+    pathlib.Path(__file__).parent.parent / "benchmarks" / "data" / "romaji_golden.tsv"
+)
+
+
+def test_trie_matches_the_golden_corpus() -> None:
+    golden = [
+        line.split("\t")
+        for line in GOLDEN.read_text(encoding="utf-8").splitlines()
+        if line
+    ]
+    assert len(golden) > 1000
+    mismatches = [
+        (token, expected, romaji_to_katakana(token))
+        for token, expected in golden
+        if romaji_to_katakana(token) != expected
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize(
+    "token, katakana",
+    [
+        ("Kenta", "ケンタ"),
+        ("nikki", "ニッキ"),
+        ("shitta", "シッタ"),
+        ("kyoko", "キョコ"),
+        ("aaron", "アーロン"),
+        ("ooki", "オーキ"),
+        ("n", "ン"),
+        # The old scanner never returned on these.
+        ("uta", "ウタ"),
+        ("uuta", "ウータ"),
+        ("", ""),
+    ],
+)
+def test_marks_are_resolved_in_one_pass(token: str, katakana: str) -> None:
+    assert romaji_to_katakana(token) == katakana
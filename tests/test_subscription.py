@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+import pytest
+
+from japan_name_bot.config import settings
+from japan_name_bot.services import subscription
+from japan_name_bot.services.subscription import _SubscriptionCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    fake = Clock()
+    # Only this module's clock; asyncio keeps the real one.
+    monkeypatch.setattr(subscription, "time", SimpleNamespace(monotonic=fake))
+    monkeypatch.setattr(settings, "SUBSCRIPTION_CACHE_TTL", 3600)
+    monkeypatch.setattr(settings, "SUBSCRIPTION_NEGATIVE_CACHE_TTL", 300)
+    return fake
+
+
+def test_subscribed_users_are_remembered_longer(clock: Clock) -> None:
+    cache = _SubscriptionCache(maxsize=10)
+    cache.set(1, True)
+    cache.set(2, False)
+
+    clock.now += 300
+    assert cache.get(1) is True
+    assert cache.get(2) is False
+
+    clock.now += 1
+    assert cache.get(1) is True
+    assert cache.get(2) is None
+
+    clock.now += 3300
+    assert cache.get(1) is None
+
+
+def test_least_recently_used_user_is_evicted(clock: Clock) -> None:
+    cache = _SubscriptionCache(maxsize=2)
+    cache.set(1, True)
+    cache.set(2, True)
+    assert cache.get(1) is True
+    cache.set(3, False)
+    assert cache.get(2) is None
+    assert cache.get(1) is True and cache.get(3) is False
+
+
+class FakeBot:
+    def __init__(self, status: str) -> None:
+        self.status = status
+        self.calls = 0
+
+    async def get_chat_member(self, chat_id: Any, user_id: int) -> Any:
+        self.calls += 1
+        return type("Member", (), {"status": self.status})()
+
+
+def test_nowait_db_answers_from_telegram_then_from_cache(
+    clock: Clock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    recorded: List[Tuple[int, bool]] = []
+
+    async def record(user_id: int, subscribed: bool) -> None:
+        recorded.append((user_id, subscribed))
+
+    monkeypatch.setattr(subscription, "_cache", _SubscriptionCache(maxsize=10))
+    monkeypatch.setattr(subscription, "_resolve_channel", lambda: "@channel")
+    monkeypatch.setattr(subscription, "record_subscription", record)
+    bot = FakeBot("left")
+
+    async def scenario() -> None:
+        check = subscription.is_user_subscribed_nowait_db
+        assert await check(bot, 7) is False  # type: ignore[arg-type]
+        await asyncio.gather(*subscription._pending_records)
+        assert await check(bot, 7) is False  # type: ignore[arg-type]
+
+        # A negative answer expires sooner, and Telegram is asked again.
+        bot.status = "member"
+        clock.now += 301
+        assert await check(bot, 7) is True  # type: ignore[arg-type]
+        await asyncio.gather(*subscription._pending_records)
+
+    asyncio.run(scenario())
+    assert bot.calls == 2
+    assert recorded == [(7, False), (7, True)]
@@ -0,0 +1,80 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from japan_name_bot.services import users
+from japan_name_bot.services.users import _KnownUsers
+
+
+@pytest.fixture
+def upserts(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[int, str | None]]:
+    calls: List[Tuple[int, str | None]] = []
+
+    async def upsert(user_id: int, username: str | None) -> None:
+        calls.append((user_id, username))
+
+    monkeypatch.setattr(users, "upsert_user", upsert)
+    monkeypatch.setattr(users, "_known_users", _KnownUsers(maxsize=2))
+    return calls
+
+
+def test_repeat_user_is_written_once(upserts: List[Tuple[int, str | None]]) -> None:
+    async def scenario() -> None:
+        for _ in range(3):
+            await users.ensure_user(1, "anna")
+        await users.ensure_user(2, None)
+        await users.ensure_user(2, None)
+
+    asyncio.run(scenario())
+    assert upserts == [(1, "anna"), (2, None)]
+
+
+def test_changed_username_is_written_again(
+    upserts: List[Tuple[int, str | None]],
+) -> None:
+    async def scenario() -> None:
+        await users.ensure_user(1, "anna")
+        await users.ensure_user(1, "anna_k")
+        await users.ensure_user(1, None)
+        await users.ensure_user(1, None)
+
+    asyncio.run(scenario())
+    assert upserts == [(1, "anna"), (1, "anna_k"), (1, None)]
+
+
+def test_evicted_user_is_written_again(
+    upserts: List[Tuple[int, str | None]],
+) -> None:
+    async def scenario() -> None:
+        await users.ensure_user(1, "a")
+        await users.ensure_user(2, "b")
+        await users.ensure_user(1, "a")  # 2 is now the least recently used
+        await users.ensure_user(3, "c")
+        await users.ensure_user(1, "a")
+        await users.ensure_user(2, "b")
+
+    asyncio.run(scenario())
+    assert upserts == [(1, "a"), (2, "b"), (3, "c"), (2, "b")]
+
+
+def test_failed_upsert_is_not_remembered(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts: List[int] = []
+
+    async def upsert(user_id: int, username: str | None) -> None:
+        attempts.append(user_id)
+        if len(attempts) == 1:
+            raise ConnectionError("database is down")
+
+    monkeypatch.setattr(users, "upsert_user", upsert)
+    monkeypatch.setattr(users, "_known_users", _KnownUsers(maxsize=2))
+
+    async def scenario() -> None:
+        with pytest.raises(ConnectionError):
+            await users.ensure_user(1, "anna")
+        await users.ensure_user(1, "anna")
+
+    asyncio.run(scenario())
+    assert attempts == [1, 1]